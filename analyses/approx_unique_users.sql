@@ -0,0 +1,29 @@
+-- Monthly unique users per product, merged from the daily HyperLogLog sketches
+-- (no rescan of transactions), next to the exact count for comparison
+with monthly as (
+    {{ hll_merge(
+        ref('int_daily_product_sketches'),
+        'user_sketch',
+        group_by={'month': "date_trunc('month', transaction_date)", 'product': 'product'},
+        estimate_as='approx_unique_users'
+    ) }}
+),
+
+exact as (
+    select
+        date_trunc('month', transaction_date) as month,
+        product,
+        count(distinct user_id) as unique_users
+    from {{ ref('stg_transactions') }}
+    group by 1, 2
+)
+
+select
+    m.month,
+    m.product,
+    m.approx_unique_users,
+    e.unique_users,
+    round(100.0 * (m.approx_unique_users - e.unique_users) / e.unique_users, 2) as error_pct
+from monthly m
+join exact e on m.month = e.month and m.product = e.product
+order by m.month, m.product
@@ -0,0 +1,147 @@
+"""
+Micro-batching for single-row prediction requests.
+Coalesces concurrent requests into one feature matrix so each model call
+amortises its fixed overhead across many callers.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Queue single feature rows and score them together in small batches.
+
+    A batch is flushed as soon as it holds `max_batch_size` rows or
+    `max_wait_ms` has passed since its first row arrived, whichever comes
+    first. Scoring runs on `executor` (the loop's default thread pool when
+    None) so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        score_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 2.0,
+        executor=None
+    ):
+        self.name = name
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.batches = 0
+        self.rows = 0
+        self.last_batch_size = 0
+        self.max_seen_batch_size = 0
+        self.score_seconds = 0.0
+
+    def start(self):
+        """Start the background flush loop (call from a running event loop)"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name=f"microbatcher-{self.name}")
+
+    async def stop(self):
+        """Stop the flush loop and fail any requests still waiting in the queue"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+
+    async def submit(self, row: np.ndarray):
+        """Queue one feature row and wait for its own prediction"""
+        if self._task is None:
+            raise RuntimeError(f"{self.name} batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            await self._dispatch(batch)
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        """Wait for the first row, then gather more until the batch is full or the window closes"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if len(batch) >= self.max_batch_size:
+                break
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            # Cancelling a pending Queue.get never drops an item
+            getter = asyncio.ensure_future(self._queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+            if getter in done:
+                batch.append(getter.result())
+            else:
+                getter.cancel()
+                break
+
+        return batch
+
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        """Score a batch as one matrix and resolve each caller's future with its row"""
+        rows, futures = zip(*batch)
+        X = np.vstack(rows)
+
+        started = time.perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.score_fn, X
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.score_seconds += time.perf_counter() - started
+            self.batches += 1
+            self.rows += len(batch)
+            self.last_batch_size = len(batch)
+            self.max_seen_batch_size = max(self.max_seen_batch_size, len(batch))
+
+        for future, result in zip(futures, results):
+            # Callers that disconnected have already cancelled their future
+            if not future.done():
+                future.set_result(result)
+
+    def metrics(self) -> Dict:
+        """Queue depth and batch-size statistics for monitoring"""
+        return {
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'batches': self.batches,
+            'rows': self.rows,
+            'avg_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'last_batch_size': self.last_batch_size,
+            'max_batch_size_seen': self.max_seen_batch_size,
+            'avg_score_ms': 1000 * self.score_seconds / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000
+        }
@@ -0,0 +1,101 @@
+"""
+Prediction cache.
+LRU + TTL cache of per-row model outputs, keyed by model name, model version
+and the exact bytes of the feature row, so repeat requests for the same user
+or feature vector skip the model entirely.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class PredictionCache:
+    """Bounded map of (model, version, feature row) -> prediction.
+
+    Entries expire `ttl_seconds` after they were stored; once `max_size` is
+    reached the least recently used entry is evicted. Because the model
+    version is part of the key, a reloaded model can never be answered from
+    its predecessor's results, and `invalidate` frees those entries early.
+    """
+
+    def __init__(self, max_size: int = 100_000, ttl_seconds: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def keys(name: str, version: str, X: np.ndarray) -> List[Tuple[str, str, bytes]]:
+        """One key per row of X (the dict hashes the row's raw float64 bytes)"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        return [(name, version, row.tobytes()) for row in X]
+
+    def get_many(self, keys: List[Tuple]) -> Tuple[list, List[int]]:
+        """Cached values (None where missing) and the positions that missed"""
+        now = time.monotonic()
+        values, missing = [], []
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    values.append(None)
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[1])
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        return values, missing
+
+    def put_many(self, keys: List[Tuple], values):
+        """Store freshly scored values, evicting the least recently used entries if full"""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, name: str):
+        """Drop every entry of one model (called when it is reloaded)"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == name]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict:
+        """Hit rate, size and eviction counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations
+        }
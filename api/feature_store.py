@@ -0,0 +1,149 @@
+"""
+Online feature store.
+Keeps the feature table (FeatureSpec: customer_features_for_ml) in process
+memory as a NumPy feature matrix with a key -> row index, so requests can be
+scored by user_id without a DuckDB round trip. The table is read with the
+spec's own query, so its key and columns always match what training used. A background thread re-reads the table periodically and
+swaps in the new snapshot atomically.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from models_ml.features import FeatureSpec, source_version
+
+
+@dataclass(frozen=True)
+class FeatureSnapshot:
+    """One immutable copy of the feature table; replaced as a whole on refresh"""
+    matrix: np.ndarray
+    row_index: Dict[str, int]
+    source_version: str
+    loaded_at: float
+    load_seconds: float
+
+    def row(self, user_id: str) -> Optional[np.ndarray]:
+        """(1, n_features) view of a user's features, or None if unknown"""
+        i = self.row_index.get(user_id)
+        return None if i is None else self.matrix[i:i + 1]
+
+
+class FeatureStore:
+    """In-memory lookup of ML features by user_id, refreshed from DuckDB.
+
+    The table is read column by column into a C-contiguous float64 matrix in
+    the spec's column order, so a lookup is one dict probe plus a row slice
+    that can be handed straight to the scorers. Refreshes are skipped while
+    the database file is unchanged, and a failed refresh (e.g. dbt holding the
+    write lock) keeps the previous snapshot serving.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        spec: FeatureSpec,
+        refresh_interval: float = 300.0
+    ):
+        self.db_path = Path(db_path)
+        self.spec = spec
+        self.refresh_interval = refresh_interval
+
+        self._snapshot: Optional[FeatureSnapshot] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        """Load the table once, then keep refreshing it in a daemon thread"""
+        self.refresh()
+        if self.refresh_interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='feature-store-refresh', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the refresh thread (the current snapshot stays readable)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def refresh(self) -> bool:
+        """Reload the table if the database changed; True when a new snapshot was swapped in"""
+        try:
+            version = source_version(self.db_path)
+            if not version:
+                raise FileNotFoundError(f"{self.db_path} does not exist (run dbt first)")
+            if self._snapshot is not None and self._snapshot.source_version == version:
+                return False
+
+            self._snapshot = self._load(version)
+            self.refreshes += 1
+            self.last_error = None
+            print(f"🗂️  Feature store loaded {len(self._snapshot.row_index):,} users from {self.spec.table} "
+                  f"in {self._snapshot.load_seconds * 1000:.0f} ms")
+            return True
+        except Exception as e:
+            self.refresh_errors += 1
+            self.last_error = str(e)
+            print(f"⚠️  Feature store refresh failed, keeping previous snapshot: {e}")
+            return False
+
+    def _load(self, version: str) -> FeatureSnapshot:
+        # duckdb is only needed by deployments that serve from the feature store
+        import duckdb
+
+        started = time.perf_counter()
+        conn = duckdb.connect(str(self.db_path), read_only=True)
+        try:
+            columns = conn.execute(self.spec.query(order=False)).fetchnumpy()
+        finally:
+            conn.close()
+
+        user_ids = columns[self.spec.key]
+        matrix = np.empty((len(user_ids), len(self.spec.columns)), dtype=np.float64)
+        for j, col in enumerate(self.spec.columns):
+            # NULL features come back as masked entries
+            matrix[:, j] = np.ma.filled(np.ma.asarray(columns[col], dtype=np.float64), np.nan)
+
+        return FeatureSnapshot(
+            matrix=matrix,
+            row_index={str(user_id): i for i, user_id in enumerate(user_ids.tolist())},
+            source_version=version,
+            loaded_at=time.time(),
+            load_seconds=time.perf_counter() - started
+        )
+
+    def get(self, user_id: str) -> Optional[np.ndarray]:
+        """Feature row for a user from the current snapshot (None if unknown)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError(f"Feature store is not loaded: {self.last_error}")
+        return snapshot.row(user_id)
+
+    def report(self) -> Dict:
+        """Size, age and refresh statistics of the current snapshot"""
+        snapshot = self._snapshot
+        return {
+            'source': f"{self.db_path}:{self.spec.table}",
+            'loaded': snapshot is not None,
+            'users': len(snapshot.row_index) if snapshot else 0,
+            'matrix_bytes': snapshot.matrix.nbytes if snapshot else 0,
+            'loaded_at': snapshot.loaded_at if snapshot else None,
+            'load_ms': round(snapshot.load_seconds * 1000, 3) if snapshot else None,
+            'refresh_interval_seconds': self.refresh_interval,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,74 @@
+"""
+Dedicated inference executor.
+Runs model calls off the event loop and outside Starlette's shared threadpool,
+and pins model-internal threads so that
+
+    uvicorn workers x inference workers x model threads <= CPU cores
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict
+
+# 'thread' shares one copy of the models; 'process' preloads them in every worker
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'thread')
+
+# Number of uvicorn worker processes sharing this machine (uvicorn --workers)
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+
+def cores_per_web_worker() -> int:
+    """CPU cores available to a single uvicorn worker"""
+    return max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)
+
+
+def inference_workers() -> int:
+    """Concurrent model calls per uvicorn worker (INFERENCE_WORKERS, default: its core share)"""
+    return int(os.environ.get('INFERENCE_WORKERS', cores_per_web_worker()))
+
+
+def model_threads(n_workers: int) -> int:
+    """Threads each model call may use (MODEL_THREADS, default: core share / workers)"""
+    return int(os.environ.get('MODEL_THREADS', max(1, cores_per_web_worker() // n_workers)))
+
+
+def pin_model_threads(models: Dict, n_threads: int):
+    """Cap XGBoost / scikit-learn / OpenMP / BLAS threads used by the loaded models"""
+    for model in models.values():
+        params = model.get_params() if hasattr(model, 'get_params') else {}
+        # XGBClassifier forwards n_jobs to its booster's nthread;
+        # the saved RandomForestRegressor was trained with n_jobs=-1
+        if 'n_jobs' in params:
+            model.set_params(n_jobs=n_threads)
+
+    # KMeans, the scalers and the compiled NumPy scorers go through OpenMP / BLAS.
+    # threadpoolctl ships with scikit-learn; the compiled-only image may not have it.
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(limits=n_threads)
+
+
+def _init_process_worker(n_threads: int):
+    """Process-pool initializer: load every model once per worker and pin its threads"""
+    from api import main
+
+    main.REGISTRY.on_load = lambda name, loaded: pin_model_threads({name: loaded.model}, n_threads)
+    main.REGISTRY.preload()
+
+
+def create_executor(backend: str, n_workers: int, n_threads: int) -> Executor:
+    """Build the inference pool; in 'thread' mode the caller pins the shared models"""
+    if backend == 'thread':
+        return ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix='inference')
+    if backend == 'process':
+        # spawn, not fork: the parent already runs OpenMP and event-loop threads
+        return ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process_worker,
+            initargs=(n_threads,)
+        )
+    raise ValueError(f"Unknown INFERENCE_BACKEND: {backend!r} (expected 'thread' or 'process')")
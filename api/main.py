@@ -4,190 +4,557 @@ FastAPI endpoints for churn prediction, segmentation, and forecasting.
 """
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict
-import pickle
+from pydantic import BaseModel, Field, create_model
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache, partial
+from dataclasses import replace
+import asyncio
+import os
 import numpy as np
 from pathlib import Path
 
+from api.batching import MicroBatcher
+from api.cache import PredictionCache
+from api.feature_store import FeatureStore
+from api.registry import ModelRegistry, ModelSpec
+from models_ml.compiled import (
+    CHURN_ARTIFACT, CHURN_FOLDED, FORECAST_ARTIFACT, FORECAST_FOLDED,
+    SEGMENT_ARTIFACT, SEGMENT_FOLDED
+)
+from models_ml.features import FEATURES
+from api.inference import (
+    INFERENCE_BACKEND, WEB_CONCURRENCY, create_executor, inference_workers,
+    model_threads, pin_model_threads
+)
+
 app = FastAPI(
     title="SuperApp ML API",
     description="Production ML models for customer analytics",
     version="1.0.0"
 )
 
-# Load models on startup
-MODELS = {}
+# Full feature order accepted by the API (superset of every model's inputs)
+FEATURE_COLUMNS = FEATURES.columns
+
+# Where each model's artifacts live (pickled, compiled, scaler-free folded);
+# feature_names.txt in the same directory defines its input columns
+MODEL_SPECS = [
+    ModelSpec('churn', Path('models_ml/churn_prediction/outputs'),
+              'xgboost_churn_model.pkl', CHURN_ARTIFACT, CHURN_FOLDED),
+    ModelSpec('segment', Path('models_ml/segmentation/outputs'),
+              'kmeans_segmentation_model.pkl', SEGMENT_ARTIFACT, SEGMENT_FOLDED),
+    ModelSpec('forecast', Path('models_ml/forecasting/outputs'),
+              'rf_forecast_model.pkl', FORECAST_ARTIFACT, FORECAST_FOLDED)
+]
+
+# 'compiled' (NumPy scorer, no xgboost/sklearn needed), 'pickle', or 'auto'
+MODEL_FORMAT = os.environ.get('MODEL_FORMAT', 'auto')
+# Memory-map compiled artifacts so uvicorn workers share their pages
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '1') == '1'
+# Seconds between checks of outputs/ for retrained models (0 disables hot reload)
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 5.0))
+
+# Micro-batching of single-row requests: flush after this many rows or this many ms
+MICROBATCH_MAX_SIZE = int(os.environ.get('MICROBATCH_MAX_SIZE', 256))
+MICROBATCH_WAIT_MS = float(os.environ.get('MICROBATCH_WAIT_MS', 2.0))
+BATCHERS: Dict[str, MicroBatcher] = {}
+
+# Dedicated pool for model calls, sized so web x inference x model threads <= cores
+INFERENCE_WORKERS = inference_workers()
+MODEL_THREADS = model_threads(INFERENCE_WORKERS)
+EXECUTOR = None
+
+# Per-row prediction cache keyed by model version + feature bytes (size 0 disables it)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 100_000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+PREDICTION_CACHE = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+
+# Online feature store for scoring by user_id (FEATURE_STORE_DB='' disables it)
+FEATURE_STORE_DB = os.environ.get('FEATURE_STORE_DB', './dev.duckdb')
+FEATURE_STORE_TABLE = os.environ.get('FEATURE_STORE_TABLE', FEATURES.table)
+FEATURE_STORE_REFRESH = float(os.environ.get('FEATURE_STORE_REFRESH', 300))
+FEATURE_STORE: Optional[FeatureStore] = None
+
+# Upper bound on rows accepted by a single /batch request
+MAX_BATCH_SIZE = 10_000
+
+SEGMENT_NAMES = {
+    0: "Casual Users",
+    1: "Active Users",
+    2: "Low Engagement",
+    3: "Power Users"
+}
+
+@lru_cache(maxsize=None)
+def feature_index(model_columns: Tuple[str, ...]) -> Optional[np.ndarray]:
+    """Indices of a model's input columns within FEATURE_COLUMNS (None = all, in order)"""
+    return FEATURES.index(model_columns)
+
+def pin_loaded_model(name: str, loaded):
+    """Registry hook: cap the threads of every newly loaded model version and drop its cached predictions"""
+    pin_model_threads({name: loaded.model}, MODEL_THREADS)
+    if PREDICTION_CACHE is not None:
+        PREDICTION_CACHE.invalidate(name)
+
+# Models load lazily on first use and hot-reload when their outputs/ files change
+REGISTRY = ModelRegistry(
+    MODEL_SPECS,
+    model_format=MODEL_FORMAT,
+    mmap=MODEL_MMAP,
+    check_interval=MODEL_RELOAD_INTERVAL,
+    on_load=pin_loaded_model
+)
 
 @app.on_event("startup")
 async def load_models():
-    """Load all ML models into memory"""
-    print("Loading ML models...")
+    """Start the inference pool (models themselves load lazily on first use)"""
+    global EXECUTOR
+    EXECUTOR = create_executor(INFERENCE_BACKEND, INFERENCE_WORKERS, MODEL_THREADS)
     
-    # Churn prediction
-    with open('models_ml/churn_prediction/outputs/xgboost_churn_model.pkl', 'rb') as f:
-        MODELS['churn_model'] = pickle.load(f)
-    with open('models_ml/churn_prediction/outputs/scaler.pkl', 'rb') as f:
-        MODELS['churn_scaler'] = pickle.load(f)
+    print(f"✅ Model registry ready ({REGISTRY.resolve_format()} format, lazy loading)")
+    print(f"   Inference: {INFERENCE_BACKEND} pool, {INFERENCE_WORKERS} workers x {MODEL_THREADS} model threads")
     
-    # Segmentation
-    with open('models_ml/segmentation/outputs/kmeans_segmentation_model.pkl', 'rb') as f:
-        MODELS['segment_model'] = pickle.load(f)
-    with open('models_ml/segmentation/outputs/scaler.pkl', 'rb') as f:
-        MODELS['segment_scaler'] = pickle.load(f)
+    # Coalesce concurrent single-row requests per model
+    for name in OUTPUTS:
+        BATCHERS[name] = MicroBatcher(
+            name, partial(score_rows, name),
+            max_batch_size=MICROBATCH_MAX_SIZE,
+            max_wait_ms=MICROBATCH_WAIT_MS,
+            executor=EXECUTOR
+        )
+        BATCHERS[name].start()
+    
+    # Features by user_id for the GET /predict/*/{user_id} routes
+    global FEATURE_STORE
+    if FEATURE_STORE_DB:
+        spec = replace(FEATURES, table=FEATURE_STORE_TABLE)
+        FEATURE_STORE = FeatureStore(FEATURE_STORE_DB, spec, FEATURE_STORE_REFRESH)
+        FEATURE_STORE.start()
+
+@app.on_event("shutdown")
+async def stop_batchers():
+    """Flush loop shutdown; pending requests fail instead of hanging"""
+    global EXECUTOR, FEATURE_STORE
+    for batcher in BATCHERS.values():
+        await batcher.stop()
+    BATCHERS.clear()
     
-    # Forecasting
-    with open('models_ml/forecasting/outputs/rf_forecast_model.pkl', 'rb') as f:
-        MODELS['forecast_model'] = pickle.load(f)
-    with open('models_ml/forecasting/outputs/scaler.pkl', 'rb') as f:
-        MODELS['forecast_scaler'] = pickle.load(f)
+    if FEATURE_STORE is not None:
+        FEATURE_STORE.stop()
+        FEATURE_STORE = None
     
-    print("✅ All models loaded successfully!")
+    if EXECUTOR is not None:
+        EXECUTOR.shutdown(wait=True)
+        EXECUTOR = None
+
+async def run_inference(fn, *args):
+    """Run a scoring function on the dedicated inference pool"""
+    return await asyncio.get_running_loop().run_in_executor(EXECUTOR, fn, *args)
 
 # Request/Response models
-class UserFeatures(BaseModel):
-    total_events: int
-    events_last_30d: int
-    events_last_7d: int
-    unique_event_types: int
-    login_events: float
-    view_events: float
-    click_events: float
-    purchase_events: float
-    days_with_events: int
-    days_since_last_event: int
+# Request schema generated from the shared feature spec (same names, order and types)
+UserFeatures = create_model(
+    'UserFeatures',
+    **{feature.name: (feature.dtype, ...) for feature in FEATURES.features}
+)
 
 class ChurnPrediction(BaseModel):
-    user_id: str = None
+    user_id: Optional[str] = None
     churn_probability: float
     is_churned: bool
     risk_level: str
 
 class SegmentPrediction(BaseModel):
-    user_id: str = None
+    user_id: Optional[str] = None
     cluster_id: int
     segment_name: str
 
 class ForecastPrediction(BaseModel):
-    user_id: str = None
+    user_id: Optional[str] = None
+    predicted_events: float
+
+class BatchUserFeatures(UserFeatures):
+    user_id: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    users: List[BatchUserFeatures] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class BatchChurnResponse(BaseModel):
+    predictions: List[ChurnPrediction]
+
+class BatchSegmentResponse(BaseModel):
+    predictions: List[SegmentPrediction]
+
+class BatchForecastResponse(BaseModel):
+    predictions: List[ForecastPrediction]
+
+class ProfilePrediction(BaseModel):
+    user_id: Optional[str] = None
+    churn_probability: float
+    is_churned: bool
+    risk_level: str
+    cluster_id: int
+    segment_name: str
     predicted_events: float
 
+class BatchProfileResponse(BaseModel):
+    predictions: List[ProfilePrediction]
+
+# Shared scoring helpers (operate on a whole feature matrix at once)
+def build_matrix(rows: List[UserFeatures]) -> np.ndarray:
+    """Assemble one contiguous float64 matrix (FEATURE_COLUMNS order) from feature rows"""
+    return FEATURES.matrix(rows)
+
+def model_inputs(X: np.ndarray, loaded) -> np.ndarray:
+    """Select a model's columns from the shared feature matrix and apply its scaler (pickle format)"""
+    index = feature_index(loaded.feature_columns)
+    X = X if index is None else X[:, index]
+    return X if loaded.scaler is None else loaded.scaler.transform(X)
+
+def churn_outputs(loaded, X: np.ndarray) -> np.ndarray:
+    """Churn probability for every row of X"""
+    return loaded.model.predict_proba(model_inputs(X, loaded))[:, 1]
+
+def segment_outputs(loaded, X: np.ndarray) -> np.ndarray:
+    """Cluster id for every row of X"""
+    return loaded.model.predict(model_inputs(X, loaded))
+
+def forecast_outputs(loaded, X: np.ndarray) -> np.ndarray:
+    """Non-negative event forecast for every row of X"""
+    return np.maximum(loaded.model.predict(model_inputs(X, loaded)), 0)
+
+OUTPUTS = {'churn': churn_outputs, 'segment': segment_outputs, 'forecast': forecast_outputs}
+
+def score_churn(X: np.ndarray) -> np.ndarray:
+    """Churn probability for every row of X"""
+    return churn_outputs(REGISTRY.get('churn'), X)
+
+def score_segment(X: np.ndarray) -> np.ndarray:
+    """Cluster id for every row of X"""
+    return segment_outputs(REGISTRY.get('segment'), X)
+
+def score_forecast(X: np.ndarray) -> np.ndarray:
+    """Non-negative event forecast for every row of X"""
+    return forecast_outputs(REGISTRY.get('forecast'), X)
+
+def score_all(X: np.ndarray):
+    """Churn probabilities, cluster ids and forecasts for every row of X"""
+    return score_churn(X), score_segment(X), score_forecast(X)
+
+def score_versioned(names: Tuple[str, ...], X: np.ndarray) -> Tuple[List[np.ndarray], List[str]]:
+    """Each named model's outputs for X and the version that produced them.
+    Runs in the inference pool, so with the process backend the versions are
+    the worker's, not whatever the web process would load."""
+    loaded = [REGISTRY.get(name) for name in names]
+    return [OUTPUTS[name](model, X) for name, model in zip(names, loaded)], [model.version for model in loaded]
+
+def score_rows(name: str, X: np.ndarray) -> List[Tuple[float, str]]:
+    """(output, model version) per row of X; the micro-batchers' scoring function"""
+    (outputs,), (version,) = score_versioned((name,), X)
+    return [(value, version) for value in outputs.tolist()]
+
+async def submit_row(name: str, X: np.ndarray) -> Tuple[np.ndarray, str]:
+    """Score a single row through the model's micro-batcher"""
+    value, version = await BATCHERS[name].submit(X)
+    return np.atleast_1d(value), version
+
+def store(name: str, version: str, keys: List[Tuple], X: np.ndarray, missing: List[int], outputs: list):
+    """Cache freshly scored rows under the version that scored them (a pool worker may not
+    have reloaded yet, or may already have, when the lookup version was read)"""
+    if version != keys[missing[0]][1]:
+        keys = PREDICTION_CACHE.keys(name, version, X)
+    PREDICTION_CACHE.put_many([keys[i] for i in missing], outputs)
+
+async def predict_cached(name: str, X: np.ndarray, single: bool = False) -> np.ndarray:
+    """One model's outputs for every row of X, served from the cache where possible"""
+    async def score(rows):
+        if single:
+            return await submit_row(name, rows)
+        (outputs,), (version,) = await run_inference(score_versioned, (name,), rows)
+        return outputs, version
+    
+    if PREDICTION_CACHE is None:
+        return (await score(X))[0]
+    
+    # Fingerprint-only lookup: the web process never loads models it does not score with
+    keys = PREDICTION_CACHE.keys(name, REGISTRY.version(name), X)
+    values, missing = PREDICTION_CACHE.get_many(keys)
+    if missing:
+        scored, version = await score(X[missing])
+        scored = scored.tolist()
+        store(name, version, keys, X, missing, scored)
+        for i, value in zip(missing, scored):
+            values[i] = value
+    return np.array(values)
+
+async def predict_all_cached(X: np.ndarray):
+    """Churn, segment and forecast outputs for X; rows missing any model's entry are scored together"""
+    if PREDICTION_CACHE is None:
+        return await run_inference(score_all, X)
+    
+    names = tuple(OUTPUTS)
+    keys = {name: PREDICTION_CACHE.keys(name, REGISTRY.version(name), X) for name in names}
+    values, missing = {}, set()
+    for name in names:
+        values[name], model_missing = PREDICTION_CACHE.get_many(keys[name])
+        missing.update(model_missing)
+    
+    if missing:
+        missing = sorted(missing)
+        scored, versions = await run_inference(score_versioned, names, X[missing])
+        for name, outputs, version in zip(names, scored, versions):
+            outputs = outputs.tolist()
+            store(name, version, keys[name], X, missing, outputs)
+            for i, value in zip(missing, outputs):
+                values[name][i] = value
+    return tuple(np.array(values[name]) for name in names)
+
+def risk_levels(proba: np.ndarray) -> np.ndarray:
+    """Map churn probabilities to high / medium / low risk buckets"""
+    return np.where(proba > 0.7, "high", np.where(proba > 0.4, "medium", "low"))
+
 # Health check
 @app.get("/")
 def root():
     return {
         "service": "SuperApp ML API",
         "status": "healthy",
-        "models_loaded": len(MODELS) // 2,  # 3 models, each with scaler
-        "endpoints": ["/predict/churn", "/predict/segment", "/predict/forecast"]
+        "models_loaded": len(REGISTRY.loaded()),
+        "model_format": REGISTRY.resolve_format(),
+        "artifacts": {name: loaded.artifact for name, loaded in REGISTRY.loaded().items()},
+        "inference": {
+            "backend": INFERENCE_BACKEND,
+            "web_workers": WEB_CONCURRENCY,
+            "inference_workers": INFERENCE_WORKERS,
+            "model_threads": MODEL_THREADS
+        },
+        "endpoints": [
+            "/predict/churn", "/predict/segment", "/predict/forecast",
+            "/predict/churn/batch", "/predict/segment/batch", "/predict/forecast/batch",
+            "/predict/all", "/predict/all/batch",
+            "/predict/churn/{user_id}", "/predict/segment/{user_id}", "/predict/forecast/{user_id}",
+            "/metrics/batching", "/metrics/cache", "/models", "/features"
+        ]
     }
 
-# Churn prediction endpoint
+@app.get("/models")
+def model_report():
+    """Loaded model versions with their load time and memory footprint"""
+    return REGISTRY.report()
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    """Hit/miss/eviction counters of the prediction cache"""
+    if PREDICTION_CACHE is None:
+        return {'enabled': False}
+    return {'enabled': True, **PREDICTION_CACHE.metrics()}
+
+@app.get("/features")
+def feature_store_report():
+    """Size, age and refresh statistics of the online feature store"""
+    if FEATURE_STORE is None:
+        return {'loaded': False, 'detail': 'Feature store disabled (FEATURE_STORE_DB is empty)'}
+    return FEATURE_STORE.report()
+
+@app.get("/metrics/batching")
+def batching_metrics():
+    """Queue depth and batch-size statistics of the micro-batchers"""
+    return {name: batcher.metrics() for name, batcher in BATCHERS.items()}
+
+# Churn prediction endpoint (micro-batched with concurrent callers)
 @app.post("/predict/churn", response_model=ChurnPrediction)
-def predict_churn(features: UserFeatures):
+async def predict_churn(features: UserFeatures):
     """Predict customer churn probability"""
     try:
-        # Prepare features
-        X = np.array([[
-            features.total_events,
-            features.events_last_30d,
-            features.events_last_7d,
-            features.unique_event_types,
-            features.login_events,
-            features.view_events,
-            features.click_events,
-            features.purchase_events,
-            features.days_with_events,
-            features.days_since_last_event
-        ]])
-        
-        # Scale and predict
-        X_scaled = MODELS['churn_scaler'].transform(X)
-        proba = MODELS['churn_model'].predict_proba(X_scaled)[0][1]
-        is_churned = proba > 0.5
-        
-        # Risk level
-        if proba > 0.7:
-            risk_level = "high"
-        elif proba > 0.4:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
+        proba = float((await predict_cached('churn', build_matrix([features]), single=True))[0])
         
         return ChurnPrediction(
-            churn_probability=float(proba),
-            is_churned=bool(is_churned),
-            risk_level=risk_level
+            churn_probability=proba,
+            is_churned=proba > 0.5,
+            risk_level=str(risk_levels(np.array([proba]))[0])
         )
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Segmentation endpoint
+# Segmentation endpoint (micro-batched)
 @app.post("/predict/segment", response_model=SegmentPrediction)
-def predict_segment(features: UserFeatures):
+async def predict_segment(features: UserFeatures):
     """Predict customer segment"""
     try:
-        X = np.array([[
-            features.total_events,
-            features.events_last_30d,
-            features.events_last_7d,
-            features.unique_event_types,
-            features.login_events,
-            features.view_events,
-            features.click_events,
-            features.purchase_events,
-            features.days_with_events,
-            features.days_since_last_event
-        ]])
-        
-        X_scaled = MODELS['segment_scaler'].transform(X)
-        cluster_id = int(MODELS['segment_model'].predict(X_scaled)[0])
-        
-        # Map cluster to segment name
-        segment_names = {
-            0: "Casual Users",
-            1: "Active Users",
-            2: "Low Engagement",
-            3: "Power Users"
-        }
+        cluster_id = int((await predict_cached('segment', build_matrix([features]), single=True))[0])
         
         return SegmentPrediction(
             cluster_id=cluster_id,
-            segment_name=segment_names.get(cluster_id, "Unknown")
+            segment_name=SEGMENT_NAMES.get(cluster_id, "Unknown")
         )
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Forecasting endpoint
+# Forecasting endpoint (micro-batched)
 @app.post("/predict/forecast", response_model=ForecastPrediction)
-def predict_forecast(features: UserFeatures):
+async def predict_forecast(features: UserFeatures):
     """Forecast future event volume"""
     try:
-        # Use only forecasting features
-        X = np.array([[
-            features.events_last_30d,
-            features.events_last_7d,
-            features.unique_event_types,
-            features.login_events,
-            features.view_events,
-            features.click_events,
-            features.purchase_events,
-            features.days_with_events,
-            features.days_since_last_event
-        ]])
+        predicted_events = float((await predict_cached('forecast', build_matrix([features]), single=True))[0])
+        
+        return ForecastPrediction(predicted_events=predicted_events)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Batch endpoints: one matrix, one transform and one model call per request
+@app.post("/predict/churn/batch", response_model=BatchChurnResponse)
+async def predict_churn_batch(request: BatchRequest):
+    """Predict churn probability for many users in a single model call"""
+    try:
+        proba = await predict_cached('churn', build_matrix(request.users))
+        risk = risk_levels(proba)
+        
+        return BatchChurnResponse(predictions=[
+            ChurnPrediction(
+                user_id=user.user_id,
+                churn_probability=float(p),
+                is_churned=bool(p > 0.5),
+                risk_level=str(r)
+            )
+            for user, p, r in zip(request.users, proba, risk)
+        ])
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/segment/batch", response_model=BatchSegmentResponse)
+async def predict_segment_batch(request: BatchRequest):
+    """Predict customer segment for many users in a single model call"""
+    try:
+        clusters = await predict_cached('segment', build_matrix(request.users))
+        
+        return BatchSegmentResponse(predictions=[
+            SegmentPrediction(
+                user_id=user.user_id,
+                cluster_id=int(c),
+                segment_name=SEGMENT_NAMES.get(int(c), "Unknown")
+            )
+            for user, c in zip(request.users, clusters)
+        ])
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/forecast/batch", response_model=BatchForecastResponse)
+async def predict_forecast_batch(request: BatchRequest):
+    """Forecast event volume for many users in a single model call"""
+    try:
+        predicted = await predict_cached('forecast', build_matrix(request.users))
+        
+        return BatchForecastResponse(predictions=[
+            ForecastPrediction(user_id=user.user_id, predicted_events=float(y))
+            for user, y in zip(request.users, predicted)
+        ])
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Combined endpoints: one feature matrix shared by all three models
+async def score_profiles(users: List[UserFeatures], user_ids: List[Optional[str]]) -> List[ProfilePrediction]:
+    """Run churn, segment and forecast models over a single shared feature matrix"""
+    proba, clusters, predicted = await predict_all_cached(build_matrix(users))
+    risk = risk_levels(proba)
+    
+    return [
+        ProfilePrediction(
+            user_id=user_id,
+            churn_probability=float(p),
+            is_churned=bool(p > 0.5),
+            risk_level=str(r),
+            cluster_id=int(c),
+            segment_name=SEGMENT_NAMES.get(int(c), "Unknown"),
+            predicted_events=float(y)
+        )
+        for user_id, p, r, c, y in zip(user_ids, proba, risk, clusters, predicted)
+    ]
+
+@app.post("/predict/all", response_model=ProfilePrediction)
+async def predict_all(features: UserFeatures):
+    """Churn, segment and forecast for one user in a single call"""
+    try:
+        return (await score_profiles([features], [None]))[0]
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/all/batch", response_model=BatchProfileResponse)
+async def predict_all_batch(request: BatchRequest):
+    """Churn, segment and forecast for many users in a single call"""
+    try:
+        return BatchProfileResponse(predictions=await score_profiles(
+            request.users, [user.user_id for user in request.users]
+        ))
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Lookup endpoints: features come from the in-process feature store, not the caller
+def stored_features(user_id: str) -> np.ndarray:
+    """Feature row for a user_id, as a (1, n_features) matrix"""
+    if FEATURE_STORE is None:
+        raise HTTPException(status_code=503, detail="Feature store disabled (FEATURE_STORE_DB is empty)")
+    try:
+        X = FEATURE_STORE.get(user_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if X is None:
+        raise HTTPException(status_code=404, detail=f"Unknown user_id: {user_id}")
+    return X
+
+# Scored straight on the inference pool: no micro-batching window on the lookup path
+@app.get("/predict/churn/{user_id}", response_model=ChurnPrediction)
+async def predict_churn_by_user(user_id: str):
+    """Predict churn probability for a known user from stored features"""
+    X = stored_features(user_id)
+    try:
+        proba = float((await predict_cached('churn', X))[0])
         
-        X_scaled = MODELS['forecast_scaler'].transform(X)
-        predicted_events = float(MODELS['forecast_model'].predict(X_scaled)[0])
+        return ChurnPrediction(
+            user_id=user_id,
+            churn_probability=proba,
+            is_churned=proba > 0.5,
+            risk_level=str(risk_levels(np.array([proba]))[0])
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/predict/segment/{user_id}", response_model=SegmentPrediction)
+async def predict_segment_by_user(user_id: str):
+    """Predict customer segment for a known user from stored features"""
+    X = stored_features(user_id)
+    try:
+        cluster_id = int((await predict_cached('segment', X))[0])
         
-        return ForecastPrediction(
-            predicted_events=max(0, predicted_events)  # Ensure non-negative
+        return SegmentPrediction(
+            user_id=user_id,
+            cluster_id=cluster_id,
+            segment_name=SEGMENT_NAMES.get(cluster_id, "Unknown")
         )
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/predict/forecast/{user_id}", response_model=ForecastPrediction)
+async def predict_forecast_by_user(user_id: str):
+    """Forecast event volume for a known user from stored features"""
+    X = stored_features(user_id)
+    try:
+        predicted_events = float((await predict_cached('forecast', X))[0])
+        
+        return ForecastPrediction(user_id=user_id, predicted_events=predicted_events)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run("api.main:app", host="0.0.0.0", port=8000)
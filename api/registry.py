@@ -0,0 +1,250 @@
+"""
+Model registry.
+Loads each model lazily on first use, memory-maps compiled artifacts so
+worker processes share their pages, and hot-swaps a model when the files in
+its outputs/ directory change. Requests already holding the previous version
+finish with it; new requests pick up the new one.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models_ml.compiled import load_compiled
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Where a model lives and which files make up each of its formats"""
+    name: str
+    directory: Path
+    pickled: str
+    compiled: str
+    folded: str
+
+    def files(self) -> List[Path]:
+        """Every file whose change should trigger a reload"""
+        names = [self.pickled, 'scaler.pkl', self.compiled, self.folded, 'feature_names.txt', 'manifest.json']
+        return [self.directory / name for name in names]
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """One immutable loaded version; swapped as a whole on reload"""
+    model: object
+    scaler: Optional[object]
+    feature_columns: Tuple[str, ...]
+    artifact: str
+    version: str
+    loaded_at: float
+    load_seconds: float
+    rss_delta_bytes: Optional[int]
+    mapped_bytes: int
+
+
+def resident_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux /proc; None elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def fingerprint(spec: ModelSpec) -> str:
+    """Version id from the mtime and size of the model's files"""
+    digest = hashlib.sha1()
+    for path in spec.files():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        digest.update(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.hexdigest()[:12]
+
+
+class ModelRegistry:
+    """Lazily loaded, hot-reloadable models keyed by name.
+
+    `check_interval` seconds after the last check, the next `get` stats the
+    model's files; a changed fingerprint that is stable across two checks
+    (so half-written files are not picked up) triggers a reload. Readers
+    never wait on a reload: they keep the version they already hold.
+    """
+
+    def __init__(
+        self,
+        specs: List[ModelSpec],
+        model_format: str = 'auto',
+        mmap: bool = True,
+        check_interval: float = 5.0,
+        on_load: Optional[Callable[[str, LoadedModel], None]] = None
+    ):
+        self.specs = {spec.name: spec for spec in specs}
+        self.model_format = model_format
+        self.mmap = mmap
+        self.check_interval = check_interval
+        self.on_load = on_load
+
+        self._models: Dict[str, LoadedModel] = {}
+        self._load_locks = {name: threading.Lock() for name in self.specs}
+        self._last_check: Dict[str, float] = {}
+        self._pending: Dict[str, str] = {}
+        # Version whose last reload failed: not retried until the files change again
+        self._failed: Dict[str, str] = {}
+        # (checked at, fingerprint) for models this process has not loaded; see version()
+        self._fingerprints: Dict[str, Tuple[float, str]] = {}
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def resolve_format(self) -> str:
+        """'compiled' when every NumPy artifact exists (or model_format forces it), else 'pickle'"""
+        if self.model_format != 'auto':
+            return self.model_format
+        compiled = all((spec.directory / spec.compiled).exists() for spec in self.specs.values())
+        return 'compiled' if compiled else 'pickle'
+
+    def get(self, name: str) -> LoadedModel:
+        """Current version of a model, loading it on first use and reloading it if its files changed"""
+        loaded = self._models.get(name)
+        if loaded is None:
+            with self._load_locks[name]:
+                loaded = self._models.get(name)
+                if loaded is None:
+                    loaded = self._load(name)
+            return loaded
+
+        if self.check_interval > 0 and time.monotonic() - self._last_check.get(name, 0) >= self.check_interval:
+            self._maybe_reload(name)
+            loaded = self._models[name]
+        return loaded
+
+    def version(self, name: str) -> str:
+        """Version id of a model without loading it: the loaded version if this process
+        has one, else the fingerprint of its files (re-read every check_interval seconds)"""
+        loaded = self._models.get(name)
+        if loaded is not None:
+            return loaded.version
+        now = time.monotonic()
+        checked = self._fingerprints.get(name)
+        if checked is None or now - checked[0] >= self.check_interval:
+            checked = self._fingerprints[name] = (now, fingerprint(self.specs[name]))
+        return checked[1]
+
+    def preload(self):
+        """Load every model now (process-pool workers, benchmarks)"""
+        for name in self.specs:
+            self.get(name)
+
+    def _maybe_reload(self, name: str):
+        # Another thread is already checking or reloading: keep serving the current version
+        if not self._load_locks[name].acquire(blocking=False):
+            return
+        try:
+            self._last_check[name] = time.monotonic()
+            version = fingerprint(self.specs[name])
+            if version == self._models[name].version or version == self._failed.get(name):
+                self._pending.pop(name, None)
+                return
+            if self._pending.get(name) != version:
+                # First sighting: wait one more interval for writes to settle
+                self._pending[name] = version
+                return
+
+            self._pending.pop(name, None)
+            try:
+                self._load(name)
+                self._failed.pop(name, None)
+                self.reloads += 1
+                print(f"🔄 Reloaded {name} model ({self._models[name].artifact}, version {version})")
+            except Exception as e:
+                # Keep serving the previous version (and its version id); retry once the files change again
+                self.reload_errors += 1
+                self._failed[name] = version
+                print(f"⚠️  Reload of {name} model failed, keeping previous version: {e}")
+        finally:
+            self._load_locks[name].release()
+
+    def _load(self, name: str) -> LoadedModel:
+        """Load one model version; caller holds the model's load lock"""
+        spec = self.specs[name]
+        version = fingerprint(spec)
+        rss_before = resident_bytes()
+        started = time.perf_counter()
+
+        scaler = None
+        mapped_bytes = 0
+        if self.resolve_format() == 'compiled':
+            model, artifact = self._load_compiled(spec)
+            if self.mmap:
+                mapped_bytes = (spec.directory / artifact).stat().st_size
+        else:
+            artifact = spec.pickled
+            with open(spec.directory / spec.pickled, 'rb') as f:
+                model = pickle.load(f)
+            with open(spec.directory / 'scaler.pkl', 'rb') as f:
+                scaler = pickle.load(f)
+
+        rss_after = resident_bytes()
+        loaded = LoadedModel(
+            model=model,
+            scaler=scaler,
+            feature_columns=tuple((spec.directory / 'feature_names.txt').read_text().split()),
+            artifact=artifact,
+            version=version,
+            loaded_at=time.time(),
+            load_seconds=time.perf_counter() - started,
+            rss_delta_bytes=rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            mapped_bytes=mapped_bytes
+        )
+
+        # e.g. pin the new model's threads before it starts serving
+        if self.on_load is not None:
+            self.on_load(name, loaded)
+        # Atomic swap: readers see either the old or the new version, never a mix
+        self._models[name] = loaded
+        self._last_check[name] = time.monotonic()
+        return loaded
+
+    def _load_compiled(self, spec: ModelSpec):
+        """Prefer the folded (scaler-free) artifact if it was derived from the current
+        compiled artifact and still reproduces the original pipeline"""
+        if (spec.directory / spec.folded).exists():
+            model = load_compiled(spec.directory / spec.folded, mmap=self.mmap)
+            try:
+                model.verify(source=spec.directory / spec.compiled)
+                return model, spec.folded
+            except ValueError as e:
+                print(f"⚠️  {spec.folded} failed its load-time check, using {spec.compiled}: {e}")
+        return load_compiled(spec.directory / spec.compiled, mmap=self.mmap), spec.compiled
+
+    def loaded(self) -> Dict[str, LoadedModel]:
+        """Snapshot of the models loaded so far"""
+        return dict(self._models)
+
+    def report(self) -> Dict:
+        """Version, load time and memory per loaded model"""
+        return {
+            'format': self.resolve_format(),
+            'mmap': self.mmap,
+            'check_interval_seconds': self.check_interval,
+            'reloads': self.reloads,
+            'reload_errors': self.reload_errors,
+            'models': {
+                name: {
+                    'artifact': loaded.artifact,
+                    'version': loaded.version,
+                    'loaded_at': loaded.loaded_at,
+                    'load_ms': round(loaded.load_seconds * 1000, 3),
+                    'rss_delta_bytes': loaded.rss_delta_bytes,
+                    'mapped_bytes': loaded.mapped_bytes
+                }
+                for name, loaded in self._models.items()
+            }
+        }
+
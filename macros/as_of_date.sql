@@ -0,0 +1,26 @@
+{% macro as_of_date() %}
+    {#- Reference date for windows and recency. Set it to make a build
+        reproducible: --vars '{as_of_date: "2024-12-31"}'. Default: current_date. -#}
+    {%- if var('as_of_date', none) -%}
+        date '{{ var("as_of_date") }}'
+    {%- else -%}
+        current_date
+    {%- endif -%}
+{% endmacro %}
+
+
+{% macro as_of_dates() %}
+    {#- Relation with one as_of_date column: the dates a point-in-time build covers.
+        as_of_dates var: a list of dates, or {start, end, every_days} for a series.
+        Unset: the single as_of_date(). -#}
+    {%- set dates = var('as_of_dates', none) -%}
+    {%- if dates is mapping -%}
+        select cast(unnest(generate_series(
+            date '{{ dates.start }}', date '{{ dates.end }}', interval '{{ dates.get("every_days", 1) }} days'
+        )) as date) as as_of_date
+    {%- elif dates -%}
+        select unnest([{% for d in dates %}date '{{ d }}'{% if not loop.last %}, {% endif %}{% endfor %}]) as as_of_date
+    {%- else -%}
+        select {{ as_of_date() }} as as_of_date
+    {%- endif -%}
+{% endmacro %}
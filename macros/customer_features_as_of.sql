@@ -0,0 +1,82 @@
+{% macro customer_features_as_of(as_of_relation) %}
+    {#- One row of ML features per user per as_of_date in as_of_relation, using
+        only activity on or before that date. A single pass over the daily
+        rollup: each day is range-joined to every as-of date it precedes. -#}
+with daily as (
+    select * from {{ ref('int_user_daily_events') }}
+),
+
+as_of as (
+    {{ as_of_relation }}
+),
+
+-- First day each user was seen with each event type
+user_type_first_seen as (
+    select
+        user_id,
+        event_type,
+        min(event_date) as first_seen
+    from (
+        select user_id, event_date, unnest(event_types) as event_type
+        from daily
+    )
+    group by user_id, event_type
+),
+
+user_event_types as (
+    select
+        a.as_of_date,
+        f.user_id,
+        count(*) as unique_event_types
+    from user_type_first_seen f
+    inner join as_of a on f.first_seen <= a.as_of_date
+    group by a.as_of_date, f.user_id
+),
+
+user_activity as (
+    select
+        a.as_of_date,
+        d.user_id,
+        
+        -- Event counts
+        sum(d.event_count)::bigint as total_events,
+        coalesce(sum(d.event_count) filter (where d.event_date > a.as_of_date - 30), 0)::bigint as events_last_30d,
+        coalesce(sum(d.event_count) filter (where d.event_date > a.as_of_date - 7), 0)::bigint as events_last_7d,
+        
+        -- Event types
+        sum(d.login_events)::bigint as login_events,
+        sum(d.view_events)::bigint as view_events,
+        sum(d.click_events)::bigint as click_events,
+        sum(d.purchase_events)::bigint as purchase_events,
+        
+        -- Engagement metrics
+        count(*) as days_with_events,
+        datediff('day', max(d.event_date), a.as_of_date) as days_since_last_event
+        
+    from daily d
+    inner join as_of a on d.event_date <= a.as_of_date
+    group by a.as_of_date, d.user_id
+)
+
+select
+    u.as_of_date,
+    u.user_id,
+    u.total_events,
+    u.events_last_30d,
+    u.events_last_7d,
+    t.unique_event_types,
+    u.login_events,
+    u.view_events,
+    u.click_events,
+    u.purchase_events,
+    u.days_with_events,
+    u.days_since_last_event,
+    
+    -- Target (simple engagement-based)
+    case when u.days_since_last_event > 30 then 1 else 0 end as is_inactive
+    
+from user_activity u
+inner join user_event_types t
+    on u.user_id = t.user_id
+    and u.as_of_date = t.as_of_date
+{% endmacro %}
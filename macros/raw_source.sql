@@ -0,0 +1,22 @@
+{% macro raw_source(table) %}
+    {#- Raw files written by scripts/generate_superapp_data.py.
+        parquet (default): typed month=YYYY-MM partitions; DuckDB reads only the
+        projected columns and skips row groups via min/max statistics.
+        csv (--vars '{raw_format: csv}'): the same <table>/ partitions as CSV when
+        the generator streamed them (--chunk-size), else the flat
+        data/raw/<table>.csv file. -#}
+    {%- if var('raw_format', 'parquet') == 'csv' -%}
+        {%- set partitioned = false -%}
+        {%- if execute -%}
+            {%- set parts = run_query("select count(*) from glob('data/raw/" ~ table ~ "/**/*.csv')") -%}
+            {%- set partitioned = parts.columns[0].values()[0] > 0 -%}
+        {%- endif -%}
+        {%- if partitioned -%}
+        read_csv_auto('data/raw/{{ table }}/**/*.csv', header=true, hive_partitioning=true)
+        {%- else -%}
+        read_csv_auto('data/raw/{{ table }}.csv', header=true)
+        {%- endif -%}
+    {%- else -%}
+        read_parquet('data/raw/{{ table }}/**/*.parquet', hive_partitioning=true)
+    {%- endif -%}
+{% endmacro %}
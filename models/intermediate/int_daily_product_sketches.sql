@@ -0,0 +1,46 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['transaction_date', 'product'],
+        on_schema_change='append_new_columns',
+        tags=['fact', 'incremental', 'daily']
+    )
+}}
+
+-- One row per day and product: exact daily counts plus a HyperLogLog sketch of
+-- the day's users (macros/hll.sql). hll_merge() rolls the sketches up to week,
+-- month, product or overall unique users without rescanning transactions.
+-- Transactions need no sketch: each belongs to exactly one day and product, so
+-- the daily counts already add up to every coarser grain.
+-- Incremental runs rebuild the latest loaded day onwards.
+with transactions as (
+    select * from {{ ref('stg_transactions') }}
+
+    {% if is_incremental() %}
+    where transaction_date >= (select coalesce(max(transaction_date), '1900-01-01'::date) from {{ this }})
+    {% endif %}
+),
+
+registers as (
+    select
+        transaction_date,
+        product,
+        {{ hll_bucket('user_id') }} as bucket,
+        max({{ hll_rank('user_id') }}) as rank,
+        count(*) as transactions,
+        count(distinct user_id) as users
+    from transactions
+    group by 1, 2, 3
+)
+
+select
+    transaction_date,
+    product,
+    -- A user hashes to exactly one bucket, so per-bucket counts add up exactly
+    cast(sum(transactions) as bigint) as transactions,
+    cast(sum(users) as bigint) as users,
+    {{ hll_sketch('bucket', 'rank') }} as user_sketch,
+    current_timestamp as _updated_at
+
+from registers
+group by 1, 2
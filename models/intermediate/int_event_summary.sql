@@ -1,11 +1,27 @@
 {{
     config(
-        materialized='view'
+        materialized='incremental',
+        unique_key=['user_id', 'event_date', 'event_type'],
+        on_schema_change='append_new_columns'
     )
 }}
 
+-- One scan of stg_events: events are grouped once by user/date/type and the
+-- per-(user, event_type) totals are window aggregates over those daily rows
+-- (previously a second full aggregation of stg_events joined back in).
+-- Incremental runs scan only events from the latest loaded day onwards, then
+-- re-window the earlier days of each (user, event_type) that received new
+-- events, so their total_events / days_active are updated too.
+{% if is_incremental() %}
+    {% set since = "(select max(event_date) from " ~ this ~ ")" %}
+{% endif %}
+
 with events as (
     select * from {{ ref('stg_events') }}
+
+    {% if is_incremental() %}
+    where event_timestamp >= {{ since }}
+    {% endif %}
 ),
 
 user_daily_events as (
@@ -13,39 +29,51 @@ user_daily_events as (
         user_id,
         cast(event_timestamp as date) as event_date,
         event_type,
-        count(*) as event_count
+        count(*) as daily_event_count
     from events
-    group by 
+    group by
         user_id,
         cast(event_timestamp as date),
         event_type
 ),
 
-user_event_totals as (
+{% if is_incremental() %}
+-- Already loaded days of the (user, event_type) pairs that have new events
+earlier_days as (
     select
-        user_id,
-        event_type,
-        count(distinct cast(event_timestamp as date)) as days_active,
-        count(*) as total_events,
-        min(event_timestamp) as first_event,
-        max(event_timestamp) as last_event
-    from events
-    group by user_id, event_type
+        t.user_id,
+        t.event_date,
+        t.event_type,
+        t.daily_event_count
+    from {{ this }} t
+    inner join (select distinct user_id, event_type from user_daily_events) k
+        on t.user_id = k.user_id
+        and t.event_type = k.event_type
+    where t.event_date < {{ since }}
 ),
 
+all_days as (
+    select * from user_daily_events
+    union all
+    select * from earlier_days
+),
+{% else %}
+all_days as (
+    select * from user_daily_events
+),
+{% endif %}
+
 final as (
     select
-        ude.user_id,
-        ude.event_date,
-        ude.event_type,
-        ude.event_count as daily_event_count,
-        uet.total_events,
-        uet.days_active,
+        user_id,
+        event_date,
+        event_type,
+        daily_event_count,
+        cast(sum(daily_event_count) over user_type as bigint) as total_events,
+        count(*) over user_type as days_active,
         current_timestamp as _loaded_at
-    from user_daily_events ude
-    left join user_event_totals uet 
-        on ude.user_id = uet.user_id 
-        and ude.event_type = uet.event_type
+    from all_days
+    window user_type as (partition by user_id, event_type)
 )
 
 select * from final
@@ -0,0 +1,39 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['user_id', 'event_date'],
+        on_schema_change='append_new_columns',
+        tags=['ml', 'features', 'incremental']
+    )
+}}
+
+-- One row per user per active day: the compact rollup customer_features_for_ml
+-- derives its totals, 7/30-day windows and recency from.
+-- Incremental runs only scan events from the latest loaded day onwards; that day
+-- is rebuilt (delete+insert on user_id, event_date) so late events are not lost.
+with events as (
+    select * from {{ ref('stg_events') }}
+
+    {% if is_incremental() %}
+    where event_timestamp >= (select coalesce(max(event_date), '1900-01-01'::date) from {{ this }})
+    {% endif %}
+)
+
+select
+    user_id,
+    cast(event_timestamp as date) as event_date,
+
+    -- BIGINT counts (sum() of integers would store HUGEINT, which is slow to re-aggregate)
+    count(*) as event_count,
+    count(*) filter (where event_type = 'login') as login_events,
+    count(*) filter (where event_type = 'view') as view_events,
+    count(*) filter (where event_type = 'click') as click_events,
+    count(*) filter (where event_type = 'purchase') as purchase_events,
+
+    -- Distinct types seen that day; unioned across days for unique_event_types
+    list_sort(list(distinct event_type)) as event_types,
+
+    current_timestamp as _updated_at
+
+from events
+group by user_id, cast(event_timestamp as date)
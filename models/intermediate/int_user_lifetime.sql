@@ -0,0 +1,42 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='user_id',
+        on_schema_change='append_new_columns',
+        tags=['dimension', 'incremental', 'daily']
+    )
+}}
+
+-- Lifetime transaction metrics per user: the part of dim_users that only changes
+-- when the user transacts. Incremental runs recompute just the users with
+-- transactions on or after the latest loaded transaction date (delete+insert on
+-- user_id); everyone else's row is left untouched.
+-- Only transactions up to as_of_date() count; building for an earlier as_of_date
+-- than the table was built with needs --full-refresh.
+with transactions as (
+    select * from {{ ref('stg_transactions') }}
+    where transaction_date <= {{ as_of_date() }}
+)
+
+{% if is_incremental() %}
+, changed_users as (
+    select distinct user_id
+    from transactions
+    where transaction_date >= (select coalesce(max(last_transaction_date), '1900-01-01'::date) from {{ this }})
+)
+{% endif %}
+
+select
+    user_id,
+    min(transaction_date) as first_transaction_date,
+    max(transaction_date) as last_transaction_date,
+    count(distinct transaction_id) as lifetime_transactions,
+    count(distinct product) as products_used,
+    sum(case when status = 'completed' then amount else 0 end) as lifetime_gmv,
+    current_timestamp as _updated_at
+
+from transactions
+{% if is_incremental() %}
+where user_id in (select user_id from changed_users)
+{% endif %}
+group by user_id
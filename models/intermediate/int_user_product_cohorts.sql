@@ -0,0 +1,47 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['user_id', 'product'],
+        on_schema_change='append_new_columns',
+        tags=['fact', 'incremental', 'daily']
+    )
+}}
+
+-- One row per (user, product): the day and month of the user's first transaction
+-- in that product, i.e. the retention cohort. A pair's cohort never changes once
+-- recorded, so incremental runs only scan transactions from the latest first-use
+-- day onwards and only insert pairs that are not already in the table.
+with transactions as (
+    select * from {{ ref('stg_transactions') }}
+
+    {% if is_incremental() %}
+    where transaction_date >= (select coalesce(max(first_transaction_date), '1900-01-01'::date) from {{ this }})
+    {% endif %}
+),
+
+first_use as (
+    select
+        user_id,
+        product,
+        min(transaction_date) as first_transaction_date
+    from transactions
+    group by user_id, product
+)
+
+select
+    fu.user_id,
+    fu.product,
+    fu.first_transaction_date,
+    date_trunc('month', fu.first_transaction_date) as cohort_month,
+    current_timestamp as _updated_at
+
+from first_use fu
+{% if is_incremental() %}
+-- Pairs first seen on the rescanned day are rewritten unchanged; older pairs are kept
+where not exists (
+    select 1 from {{ this }} c
+    where c.user_id = fu.user_id
+      and c.product = fu.product
+      and c.first_transaction_date < fu.first_transaction_date
+)
+{% endif %}
@@ -1,25 +1,21 @@
 {{
     config(
-        materialized='table',
+        materialized='view',
         tags=['dimension', 'daily']
     )
 }}
 
+-- User attributes from stg_users joined to the incremental lifetime metrics in
+-- int_user_lifetime. Recency depends on the reference date, not on new
+-- transactions, so it is derived here at query time against as_of_date() (var
+-- as_of_date, default current_date) instead of being rewritten for every user
+-- on every build.
 with user_base as (
     select * from {{ ref('stg_users') }}
 ),
 
 user_metrics as (
-    select
-        user_id,
-        min(transaction_date) as first_transaction_date,
-        max(transaction_date) as last_transaction_date,
-        count(distinct transaction_id) as lifetime_transactions,
-        count(distinct product) as products_used,
-        sum(case when status = 'completed' then amount else 0 end) as lifetime_gmv,
-        datediff('day', max(transaction_date), current_timestamp::date) as days_since_last_transaction
-    from {{ ref('stg_transactions') }}
-    group by user_id
+    select * from {{ ref('int_user_lifetime') }}
 )
 
 select
@@ -33,8 +29,8 @@ select
     coalesce(um.lifetime_transactions, 0) as lifetime_transactions,
     coalesce(um.products_used, 0) as products_used,
     coalesce(um.lifetime_gmv, 0) as lifetime_gmv,
-    coalesce(um.days_since_last_transaction, 
-             datediff('day', ub.registration_date, current_timestamp::date)) as days_since_last_transaction,
+    coalesce(datediff('day', um.last_transaction_date, {{ as_of_date() }}),
+             datediff('day', ub.registration_date, {{ as_of_date() }})) as days_since_last_transaction,
     
     case 
         when um.first_transaction_date is not null 
@@ -46,12 +42,12 @@ select
     
     case
         when um.last_transaction_date is null then 'Never Transacted'
-        when um.days_since_last_transaction <= 30 then 'Active'
-        when um.days_since_last_transaction <= 90 then 'At Risk'
+        when datediff('day', um.last_transaction_date, {{ as_of_date() }}) <= 30 then 'Active'
+        when datediff('day', um.last_transaction_date, {{ as_of_date() }}) <= 90 then 'At Risk'
         else 'Churned'
     end as recency_status,
     
-    current_timestamp as _updated_at
+    um._updated_at
     
 from user_base ub
 left join user_metrics um on ub.user_id = um.user_id
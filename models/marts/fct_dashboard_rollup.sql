@@ -0,0 +1,38 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key=['month', 'product', 'country', 'status', 'adoption_rank'],
+        on_schema_change='append_new_columns',
+        tags=['fact', 'incremental', 'daily']
+    )
+}}
+
+-- Pre-aggregated cube behind scripts/create_dashboard.py: one row per
+-- month x product x country x status (x adoption_rank), with additive measures only.
+-- adoption_rank is the user's product_adoption_number on their first transaction in
+-- a product and 0 on every other transaction, so summing adopting_users where
+-- adoption_rank = n counts the users who adopted at least n products (n = 1: all
+-- transacting users). Incremental runs rebuild the latest month onwards.
+with transactions as (
+    select * from {{ ref('fct_transactions') }}
+
+    {% if is_incremental() %}
+    where transaction_date >= (select max(month) from {{ this }})
+    {% endif %}
+)
+
+select
+    cast(date_trunc('month', transaction_date) as date) as month,
+    product,
+    coalesce(country, 'Unknown') as country,
+    status,
+    coalesce(product_adoption_number, 0) as adoption_rank,
+
+    count(*) as transactions,
+    sum(amount) as amount,
+    count(*) filter (where product_adoption_number is not null) as adopting_users,
+
+    current_timestamp as _updated_at
+
+from transactions
+group by 1, 2, 3, 4, 5
@@ -1,10 +1,16 @@
 {{
     config(
-        materialized='table',
-        tags=['fact', 'daily']
+        materialized='incremental',
+        unique_key=['user_id', 'product', 'activity_month'],
+        on_schema_change='append_new_columns',
+        tags=['fact', 'incremental', 'daily']
     )
 }}
 
+-- Incremental runs only re-aggregate months touched by new transactions (the
+-- latest loaded month onwards, delete+insert on user_id, product, activity_month).
+-- cohort_month comes from the persistent int_user_product_cohorts table instead
+-- of a min() over every user's full history.
 with monthly_activity as (
     select
         user_id,
@@ -13,16 +19,14 @@ with monthly_activity as (
         sum(case when status = 'completed' then amount else 0 end) as monthly_gmv,
         count(distinct case when status = 'completed' then transaction_id end) as monthly_transactions
     from {{ ref('stg_transactions') }}
+    {% if is_incremental() %}
+    where transaction_date >= (select coalesce(max(activity_month), '1900-01-01'::date) from {{ this }})
+    {% endif %}
     group by user_id, product, date_trunc('month', transaction_date)
 ),
 
 first_activity as (
-    select
-        user_id,
-        product,
-        min(activity_month) as cohort_month
-    from monthly_activity
-    group by user_id, product
+    select * from {{ ref('int_user_product_cohorts') }}
 )
 
 select
@@ -28,6 +28,18 @@ transaction_sequences as (
             order by transaction_date
         ) as overall_transaction_number
     from transactions
+),
+
+-- A user's first transaction in each product, numbered in the order the products were adopted
+product_adoptions as (
+    select
+        transaction_id,
+        row_number() over (
+            partition by user_id
+            order by transaction_date, product
+        ) as product_adoption_number
+    from transaction_sequences
+    where product_transaction_number = 1
 )
 
 select
@@ -44,6 +56,7 @@ select
     
     ts.product_transaction_number,
     ts.overall_transaction_number,
+    pa.product_adoption_number,
     
     case 
         when ts.overall_transaction_number = 1 then 'First Transaction'
@@ -58,3 +71,4 @@ select
 from transactions t
 left join users u on t.user_id = u.user_id
 left join transaction_sequences ts on t.transaction_id = ts.transaction_id
+left join product_adoptions pa on t.transaction_id = pa.transaction_id
@@ -0,0 +1,12 @@
+{{
+    config(
+        materialized='table',
+        tags=['ml', 'features', 'backfill']
+    )
+}}
+
+-- Point-in-time training sets: customer_features_for_ml for many as-of dates in
+-- one build (one row per as_of_date per user active by then), e.g.
+--   dbt run -s customer_features_history --vars '{as_of_dates: {start: "2024-01-31", end: "2024-12-31", every_days: 30}}'
+--   dbt run -s customer_features_history --vars '{as_of_dates: ["2024-06-30", "2024-12-31"]}'
+{{ customer_features_as_of(as_of_dates()) }}
@@ -3,7 +3,7 @@
 ) }}
 
 WITH source AS (
-    SELECT * FROM read_csv_auto('data/raw/transactions.csv', header=true)
+    SELECT * FROM {{ raw_source('transactions') }}
 ),
 
 standardized AS (
@@ -3,18 +3,28 @@ Churn/Inactivity Prediction Model
 Predicts which users are likely to become inactive based on their engagement patterns.
 """
 
-import duckdb
+import argparse
+import tempfile
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
 import xgboost as xgb
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pickle
 from pathlib import Path
 
+from models_ml.compiled import CHURN_ARTIFACT, CHURN_FOLDED, export_xgboost_classifier, fold_scaler
+from models_ml.data import BATCH_SIZE, ExternalMemoryIter, partial_fit_scaler, peak_rss_mb, train_test_batches
+from models_ml.features import FEATURES, load_table
+from models_ml.training import fit_scaler, save_metrics, save_model, staged_outputs
+
+parser = argparse.ArgumentParser(description='Train the churn prediction model')
+parser.add_argument('--external-memory', action='store_true',
+                    help='Stream batches from DuckDB and train XGBoost from an on-disk cache (data larger than RAM)')
+parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per streamed Arrow batch')
+args = parser.parse_args()
+
 # Setup
 np.random.seed(42)
 output_dir = Path('models_ml/churn_prediction/outputs')
@@ -24,32 +34,20 @@ print("=" * 70)
 print("CHURN PREDICTION MODEL - XGBOOST")
 print("=" * 70)
 
-# 1. Load data
-print("\n📊 Loading data from DuckDB...")
-conn = duckdb.connect('./dev.duckdb', read_only=True)
-
-query = """
-SELECT 
-    user_id,
-    total_events,
-    events_last_30d,
-    events_last_7d,
-    unique_event_types,
-    login_events,
-    view_events,
-    click_events,
-    purchase_events,
-    days_with_events,
-    days_since_last_event,
-    is_inactive as target
-FROM main.customer_features_for_ml
-"""
+feature_cols = FEATURES.columns
 
-df = conn.execute(query).df()
-conn.close()
 
-print(f"✅ Loaded {len(df)} users")
-print(f"   Original churn rate: {df['target'].mean():.1%}")
+def engagement_score(total_events, days_with_events, days_since_last_event):
+    """Synthetic engagement score (the external-memory query computes the same expression in SQL)"""
+    return total_events * 0.3 + days_with_events * 0.3 + (100 - days_since_last_event) * 0.4
+
+
+# 1. Load data
+print("\n📊 Loading data from DuckDB...")
+if not args.external_memory:
+    table = load_table()
+    print(f"✅ Found {len(table)} users (from {table.source})")
+    print(f"   Original churn rate: {(table.column('days_since_last_event') > 30).mean():.1%}")
 
 # 2. Create synthetic variation for demonstration
 # In production, you'd use real historical data with both active and inactive users
@@ -57,46 +55,24 @@ print("\n🔧 Creating synthetic labels for demonstration...")
 print("   (In production, use real historical data with both classes)")
 
 # Create labels based on engagement patterns
-# Higher engagement = lower chance of churn
-df['engagement_score'] = (
-    df['total_events'] * 0.3 +
-    df['days_with_events'] * 0.3 +
-    (100 - df['days_since_last_event']) * 0.4
+# Higher engagement = lower chance of churn; label bottom 40% as churned, top 60% as active
+# External memory computes them in DuckDB so the whole table is never loaded
+query = f"""
+WITH features AS (
+    {FEATURES.query(order=False)}
+),
+scored AS (
+    SELECT *, total_events * 0.3 + days_with_events * 0.3 + (100 - days_since_last_event) * 0.4 AS engagement_score
+    FROM features
 )
+SELECT
+    *,
+    (engagement_score <= (SELECT quantile_cont(engagement_score, 0.40) FROM scored))::INTEGER AS target
+FROM scored
+"""
 
-# Label bottom 40% as churned, top 60% as active
-threshold = df['engagement_score'].quantile(0.40)
-df['target'] = (df['engagement_score'] <= threshold).astype(int)
-
-print(f"✅ Synthetic churn rate: {df['target'].mean():.1%}")
-print(f"   Active users: {(df['target'] == 0).sum()}")
-print(f"   Churned users: {(df['target'] == 1).sum()}")
-
-# 3. Prepare features
-print("\n🔧 Preparing features...")
-feature_cols = [col for col in df.columns if col not in ['user_id', 'target', 'engagement_score']]
-X = df[feature_cols]
-y = df['target']
-
-print(f"   Feature columns: {len(feature_cols)}")
-
-# 4. Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-print(f"\n📈 Train-test split:")
-print(f"   Training set: {len(X_train)} samples ({(y_train==1).sum()} churned)")
-print(f"   Test set: {len(X_test)} samples ({(y_test==1).sum()} churned)")
-
-# 5. Scale features
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-# 6. Train XGBoost model
-print("\n🤖 Training XGBoost model...")
-model = xgb.XGBClassifier(
+# 3-6. Prepare features, split, scale and train
+params = dict(
     max_depth=5,
     learning_rate=0.1,
     n_estimators=100,
@@ -105,18 +81,97 @@ model = xgb.XGBClassifier(
     eval_metric='logloss'
 )
 
-model.fit(
-    X_train_scaled, y_train,
-    eval_set=[(X_test_scaled, y_test)],
-    verbose=False
-)
+if args.external_memory:
+    # Deterministic hash split in SQL; batches are re-streamed on every pass
+    train_batches, test_batches = train_test_batches(
+        query, feature_cols + ['target'], key='user_id', batch_size=args.batch_size
+    )
+
+    print("\n🔧 Fitting scaler incrementally (partial_fit over streamed batches)...")
+    scaler = partial_fit_scaler(train_batches(), n_features=len(feature_cols))
+
+    print("\n🤖 Training XGBoost model (external memory)...")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        dtrain = xgb.DMatrix(ExternalMemoryIter(train_batches, scaler, cache_dir))
+        n_train = dtrain.num_row()
+        booster = xgb.train(
+            {'max_depth': params['max_depth'], 'eta': params['learning_rate'],
+             'objective': params['objective'], 'seed': params['random_state'],
+             'eval_metric': params['eval_metric'], 'tree_method': 'hist'},
+            dtrain,
+            num_boost_round=params['n_estimators']
+        )
+        del dtrain
+
+        # Same sklearn wrapper the in-memory path pickles, rebuilt from the booster's
+        # saved model through the public API (load_model restores n_classes_ etc.)
+        booster_json = Path(cache_dir) / 'booster.json'
+        booster.save_model(booster_json)
+        model = xgb.XGBClassifier(**params)
+        model.load_model(booster_json)
+
+    # Score the held-out users batch by batch
+    y_test, y_pred_proba, X_check = [], [], None
+    for block in test_batches():
+        if X_check is None:
+            X_check = block[:1000, :-1]
+        y_test.append(block[:, -1].astype(int))
+        y_pred_proba.append(model.predict_proba(scaler.transform(block[:, :-1]))[:, 1])
+    y_test = np.concatenate(y_test)
+    y_pred_proba = np.concatenate(y_pred_proba)
+    n_test = len(y_test)
+    # Estimated from the held-out users (the full label vector is never materialised)
+    churn_rate = float(y_test.mean())
+
+    print(f"\n📈 Hash split on user_id:")
+    print(f"   Training set: {n_train} samples")
+    print(f"   Test set: {n_test} samples ({(y_test==1).sum()} churned)")
+else:
+    X = table.matrix
+    score = engagement_score(
+        table.column('total_events').astype(np.float64),
+        table.column('days_with_events'),
+        table.column('days_since_last_event')
+    )
+    y = (score <= np.quantile(score, 0.40)).astype(int)
+    churn_rate = float(y.mean())
+
+    print(f"✅ Synthetic churn rate: {churn_rate:.1%}")
+    print(f"   Active users: {(y == 0).sum()}")
+    print(f"   Churned users: {(y == 1).sum()}")
+    print(f"   Feature columns: {len(feature_cols)} (float32, {X.nbytes / 1e6:.1f} MB)")
+
+    # 4. Train-test split
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    del X, score
+    n_train, n_test = len(X_train), len(X_test)
+
+    print(f"\n📈 Train-test split:")
+    print(f"   Training set: {n_train} samples ({(y_train==1).sum()} churned)")
+    print(f"   Test set: {n_test} samples ({(y_test==1).sum()} churned)")
+
+    # 5. Scale features (float32 in, float32 out)
+    scaler, X_train_scaled, X_test_scaled = fit_scaler(X_train, X_test)
+    X_check = X_test[:1000]
+    del X_train, X_test
+
+    # 6. Train XGBoost model
+    print("\n🤖 Training XGBoost model...")
+    model = xgb.XGBClassifier(**params)
+    model.fit(
+        X_train_scaled, y_train,
+        eval_set=[(X_test_scaled, y_test)],
+        verbose=False
+    )
+    y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
 
 print("✅ Model trained successfully!")
 
 # 7. Evaluate model
 print("\n📊 Model evaluation:")
-y_pred = model.predict(X_test_scaled)
-y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
+y_pred = (y_pred_proba > 0.5).astype(int)
 
 print("\nClassification Report:")
 print(classification_report(y_test, y_pred, target_names=['Active', 'Churned']))
@@ -145,41 +200,50 @@ print(feature_importance.head(10).to_string(index=False))
 # 9. Save artifacts
 print("\n💾 Saving model artifacts...")
 
-# Save model
-with open(output_dir / 'xgboost_churn_model.pkl', 'wb') as f:
-    pickle.dump(model, f)
+# Everything the API loads is published together, and only if the fold below succeeds
+with staged_outputs(output_dir, CHURN_FOLDED) as staging:
+    # Save model, scaler and feature names
+    save_model(staging, 'xgboost_churn_model.pkl', model, scaler, feature_cols)
 
-# Save scaler
-with open(output_dir / 'scaler.pkl', 'wb') as f:
-    pickle.dump(scaler, f)
+    # Save compiled inference artifact (NumPy-only scorer used by the API)
+    export_xgboost_classifier(
+        model, scaler, staging / CHURN_ARTIFACT,
+        booster_path=staging / 'xgboost_churn_model.json'
+    )
 
-# Save feature names
-with open(output_dir / 'feature_names.txt', 'w') as f:
-    f.write('\n'.join(feature_cols))
+    # Compile a scaler-free equivalent, checked against the float64 scaler + model pipeline the API runs
+    X_check = X_check.astype(np.float64)
+    fold_scaler(
+        staging / CHURN_ARTIFACT, staging / CHURN_FOLDED,
+        X_check, model.predict_proba(scaler.transform(X_check))[:, 1]
+    )
 
 # Save feature importance
 feature_importance.to_csv(output_dir / 'feature_importance.csv', index=False)
 
 # Save metrics
 metrics = {
-    'train_samples': len(X_train),
-    'test_samples': len(X_test),
-    'churn_rate': float(df['target'].mean()),
+    'train_samples': n_train,
+    'test_samples': n_test,
+    'churn_rate': churn_rate,
     'auc_roc': float(auc),
     'accuracy': float((y_pred == y_test).mean()),
+    'external_memory': args.external_memory,
     'note': 'Synthetic labels for demonstration - use real historical data in production'
 }
 
-import json
-with open(output_dir / 'metrics.json', 'w') as f:
-    json.dump(metrics, f, indent=2)
+save_metrics(output_dir, metrics)
 
 print(f"✅ Saved to {output_dir}/")
 print(f"   - xgboost_churn_model.pkl (model)")
 print(f"   - scaler.pkl (feature scaler)")
+print(f"   - xgboost_churn_model.json (native booster)")
+print(f"   - {CHURN_ARTIFACT} (compiled inference artifact)")
+print(f"   - {CHURN_FOLDED} (scaler folded into the trees)")
 print(f"   - feature_names.txt")
 print(f"   - feature_importance.csv")
 print(f"   - metrics.json")
+print(f"\n🧠 Peak RSS: {peak_rss_mb():,.0f} MB")
 
 print("\n" + "=" * 70)
 print("✅ CHURN PREDICTION MODEL COMPLETE!")
@@ -0,0 +1,296 @@
+"""
+Cohort Retention Engine
+Answers cohort questions from integer-encoded users instead of
+count(distinct user_id) over user-level rows. Every (product, cohort_month,
+months_since_activation) cell of fct_retention becomes a sorted int32 array of
+user codes, stored back to back in one array (CSR layout). A country or
+segment slice is a boolean mask over user codes. Any retention matrix or curve
+is then one gather plus np.add.reduceat over that array, which takes
+milliseconds.
+
+The structure is cached like the feature table: in this process, then as an
+.npz keyed by the database version. Repeated questions never re-run SQL.
+
+Usage (from the repo root):
+    python -m models_ml.cohorts --product bnpl
+    python -m models_ml.cohorts --product food_delivery --country UAE --segment vip
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from models_ml.features import CACHE_DIR, DB_PATH, source_version
+
+# User attributes a matrix can be sliced by
+ATTRIBUTES = ['country', 'user_segment']
+
+USERS_QUERY = f"""
+SELECT user_id, {', '.join(f"coalesce({name}, 'Unknown') AS {name}" for name in ATTRIBUTES)}
+FROM main_marts.dim_users
+ORDER BY user_id
+"""
+
+# One row per (user, product, activity month); users coded by their position in USERS_QUERY
+CELLS_QUERY = """
+WITH users AS (
+    SELECT user_id, row_number() OVER (ORDER BY user_id) - 1 AS code
+    FROM main_marts.dim_users
+)
+SELECT
+    dense_rank() OVER (ORDER BY r.product) - 1 AS product_code,
+    datediff('month', DATE '1970-01-01', r.cohort_month) AS cohort,
+    r.months_since_activation AS month_offset,
+    u.code
+FROM main_marts.fct_retention r
+JOIN users u ON r.user_id = u.user_id
+ORDER BY product_code, cohort, month_offset, u.code
+"""
+
+PRODUCTS_QUERY = "SELECT DISTINCT product FROM main_marts.fct_retention ORDER BY product"
+
+
+def to_months(values) -> np.ndarray:
+    """Months since 1970-01 of dates, month strings ('2024-03') or timestamps"""
+    months = pd.to_datetime(pd.Index(np.atleast_1d(values))).to_period('M')
+    return (months.year - 1970) * 12 + months.month - 1
+
+
+def from_months(months: np.ndarray) -> pd.DatetimeIndex:
+    """First day of each month, from months since 1970-01"""
+    return pd.DatetimeIndex(np.datetime64('1970-01', 'M') + months.astype('timedelta64[M]'))
+
+
+@dataclass(frozen=True)
+class CohortEngine:
+    """Retention cells of every product as sorted user-code arrays"""
+    user_ids: np.ndarray
+    # name -> (labels, label code of every user)
+    attributes: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    products: np.ndarray
+    # Per cell, sorted by (product, cohort, offset); cell i's users are members[indptr[i]:indptr[i + 1]]
+    cell_product: np.ndarray
+    cell_cohort: np.ndarray
+    cell_offset: np.ndarray
+    indptr: np.ndarray
+    members: np.ndarray
+    source: str
+
+    @property
+    def last_month(self) -> int:
+        """Latest activity month in the data (months since 1970-01)"""
+        return int((self.cell_cohort + self.cell_offset).max())
+
+    def mask(self, **filters) -> Optional[np.ndarray]:
+        """Boolean mask over user codes for attribute filters (one value or a list each); None = all users"""
+        mask = None
+        for name, values in filters.items():
+            if values is None:
+                continue
+            if name not in self.attributes:
+                raise ValueError(f"Unknown attribute: {name} (expected one of {ATTRIBUTES})")
+            labels, codes = self.attributes[name]
+            selected = np.isin(labels, np.atleast_1d(values))[codes]
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def _cells(self, product: str) -> Tuple[int, int]:
+        """Range of cells belonging to a product"""
+        matches = np.flatnonzero(self.products == product)
+        if len(matches) == 0:
+            raise ValueError(f"Unknown product: {product} (expected one of {list(self.products)})")
+        lo, hi = np.searchsorted(self.cell_product, [matches[0], matches[0] + 1])
+        return int(lo), int(hi)
+
+    def matrix(self, product: str, **filters) -> pd.DataFrame:
+        """Users per cohort_month (rows) x months_since_activation (columns); column 0 is the cohort size"""
+        lo, hi = self._cells(product)
+        mask = self.mask(**filters)
+        if mask is None:
+            counts = np.diff(self.indptr[lo:hi + 1])
+        else:
+            # Cells are never empty, so reduceat sums exactly each cell's slice
+            start, end = self.indptr[lo], self.indptr[hi]
+            counts = np.add.reduceat(mask[self.members[start:end]], self.indptr[lo:hi] - start, dtype=np.int64)
+
+        cohorts, row = np.unique(self.cell_cohort[lo:hi], return_inverse=True)
+        offsets = self.cell_offset[lo:hi]
+        grid = np.zeros((len(cohorts), offsets.max() + 1), dtype=np.int64)
+        grid[row, offsets] = counts
+        return pd.DataFrame(
+            grid,
+            index=from_months(cohorts).rename('cohort_month'),
+            columns=pd.RangeIndex(grid.shape[1], name='months_since_activation')
+        )
+
+    def retention(self, product: str, **filters) -> pd.DataFrame:
+        """Share of each cohort active k months after activation (NaN for empty cohorts and months not reached yet)"""
+        users = self.matrix(product, **filters)
+        rates = users.div(users[0].where(users[0] > 0), axis=0)
+        ages = self.last_month - to_months(users.index)
+        return rates.where(users.columns.values[None, :] <= ages.values[:, None])
+
+    def curve(self, product: str, cohorts: Optional[Sequence] = None, **filters) -> pd.Series:
+        """Retention by months_since_activation, pooled over the cohorts (default all) that have reached each month"""
+        users = self.matrix(product, **filters)
+        if cohorts is not None:
+            users = users[np.isin(to_months(users.index), to_months(cohorts))]
+        reached = users.columns.values[None, :] <= (self.last_month - to_months(users.index)).values[:, None]
+        sizes = (users[0].values[:, None] * reached).sum(axis=0)
+        retained = (users.values * reached).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.Series(retained / sizes, index=users.columns, name='retention')
+
+    def cell(self, product: str, cohort_month, months_since_activation: int, **filters) -> np.ndarray:
+        """Sorted codes of the users in one cell; combine cells with np.intersect1d / np.union1d (assume_unique=True)"""
+        lo, hi = self._cells(product)
+        key = (to_months(cohort_month)[0], months_since_activation)
+        found = np.flatnonzero((self.cell_cohort[lo:hi] == key[0]) & (self.cell_offset[lo:hi] == key[1]))
+        if len(found) == 0:
+            return np.empty(0, dtype=self.members.dtype)
+        i = lo + found[0]
+        codes = self.members[self.indptr[i]:self.indptr[i + 1]]
+        mask = self.mask(**filters)
+        return codes if mask is None else codes[mask[codes]]
+
+
+def build(db_path: str = DB_PATH) -> CohortEngine:
+    """Encode users and retention cells from DuckDB"""
+    with duckdb.connect(db_path, read_only=True) as conn:
+        users = conn.execute(USERS_QUERY).fetchnumpy()
+        cells = conn.execute(CELLS_QUERY).fetchnumpy()
+        products = np.array([row[0] for row in conn.execute(PRODUCTS_QUERY).fetchall()])
+
+    attributes = {}
+    for name in ATTRIBUTES:
+        labels, codes = np.unique(np.asarray(users[name], dtype=str), return_inverse=True)
+        attributes[name] = (labels, codes.astype(np.int32))
+
+    product = np.asarray(cells['product_code'], dtype=np.int16)
+    cohort = np.asarray(cells['cohort'], dtype=np.int32)
+    offset = np.asarray(cells['month_offset'], dtype=np.int32)
+    # A new cell starts wherever (product, cohort, offset) changes
+    starts = np.flatnonzero(np.r_[True, (np.diff(product) != 0) | (np.diff(cohort) != 0) | (np.diff(offset) != 0)])
+    return CohortEngine(
+        user_ids=np.asarray(users['user_id'], dtype=str),
+        attributes=attributes,
+        products=products,
+        cell_product=product[starts],
+        cell_cohort=cohort[starts],
+        cell_offset=offset[starts],
+        indptr=np.r_[starts, len(product)].astype(np.int64),
+        members=np.asarray(cells['code'], dtype=np.int32),
+        source='duckdb'
+    )
+
+
+_ENGINES: Dict[str, CohortEngine] = {}
+
+
+def load_engine(db_path: str = DB_PATH, cache_dir: Optional[Path] = CACHE_DIR) -> CohortEngine:
+    """Cohort engine for the current database version: from this process, the disk cache, or DuckDB"""
+    layout = hashlib.sha256((USERS_QUERY + CELLS_QUERY).encode()).hexdigest()[:12]
+    version = hashlib.sha256(source_version(Path(db_path)).encode()).hexdigest()[:12]
+    name = f"cohorts-{layout}-{version}.npz"
+
+    if name in _ENGINES:
+        return _ENGINES[name]
+
+    path = None if cache_dir is None else Path(cache_dir) / name
+    if path is not None and path.exists():
+        with np.load(path) as cached:
+            engine = CohortEngine(
+                user_ids=cached['user_ids'],
+                attributes={attr: (cached[f'{attr}_labels'], cached[f'{attr}_codes']) for attr in ATTRIBUTES},
+                products=cached['products'],
+                cell_product=cached['cell_product'],
+                cell_cohort=cached['cell_cohort'],
+                cell_offset=cached['cell_offset'],
+                indptr=cached['indptr'],
+                members=cached['members'],
+                source='cache'
+            )
+    else:
+        engine = build(db_path)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for stale in path.parent.glob('cohorts-*.npz'):
+                stale.unlink()
+            arrays = {f'{attr}_{part}': values
+                      for attr, pair in engine.attributes.items()
+                      for part, values in zip(('labels', 'codes'), pair)}
+            tmp = path.with_suffix('.tmp.npz')
+            np.savez(
+                tmp, user_ids=engine.user_ids, products=engine.products,
+                cell_product=engine.cell_product, cell_cohort=engine.cell_cohort,
+                cell_offset=engine.cell_offset, indptr=engine.indptr, members=engine.members,
+                **arrays
+            )
+            os.replace(tmp, path)
+
+    _ENGINES[name] = engine
+    return engine
+
+
+def best_ms(fn, runs: int) -> float:
+    """Best wall time of fn() in milliseconds"""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--product', default='bnpl')
+    parser.add_argument('--country', nargs='+', help='Only users from these countries')
+    parser.add_argument('--segment', nargs='+', help='Only users in these segments')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    filters = {'country': args.country, 'user_segment': args.segment}
+
+    print("=" * 70)
+    print("COHORT RETENTION ENGINE")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    engine = load_engine()
+    print(f"\n📦 {len(engine.user_ids):,} users, {len(engine.cell_cohort):,} cells, "
+          f"{len(engine.members):,} memberships (from {engine.source}, {time.perf_counter() - started:.2f}s)")
+
+    print(f"\n📈 Retention curve: {args.product}"
+          + ''.join(f", {name}={'/'.join(values)}" for name, values in filters.items() if values))
+    curve = engine.curve(args.product, **filters)
+    print(curve.head(13).map('{:.1%}'.format).to_string())
+
+    # The same matrix the SQL way: count(distinct user_id) per cell over user-level rows
+    where = [f"r.product = '{args.product}'"] + [
+        f"u.{name} IN ({', '.join(repr(value) for value in values)})" for name, values in filters.items() if values
+    ]
+    sql = f"""
+        SELECT r.cohort_month, r.months_since_activation, count(DISTINCT r.user_id) AS users
+        FROM main_marts.fct_retention r JOIN main_marts.dim_users u ON r.user_id = u.user_id
+        WHERE {' AND '.join(where)}
+        GROUP BY 1, 2
+    """
+    with duckdb.connect(DB_PATH, read_only=True) as conn:
+        sql_ms = best_ms(lambda: conn.execute(sql).fetchall(), args.runs)
+    engine_ms = best_ms(lambda: engine.matrix(args.product, **filters), args.runs)
+    curve_ms = best_ms(lambda: engine.curve(args.product, **filters), args.runs)
+
+    print(f"\n{'Query':<36} {'ms':>8}")
+    print(f"{'SQL count(distinct) matrix':<36} {sql_ms:>8.1f}")
+    print(f"{'engine matrix':<36} {engine_ms:>8.1f}")
+    print(f"{'engine pooled curve':<36} {curve_ms:>8.1f}")
+    print("\n" + "=" * 70)
@@ -0,0 +1,525 @@
+"""
+Compiled Inference Artifacts
+Exports trained models to plain NumPy arrays (.npz) and scores them with
+vectorized NumPy only, so the serving image needs neither xgboost nor
+scikit-learn and avoids their per-call Python overhead.
+
+Artifact layout (one .npz per model):
+    kind        'tree_classifier' | 'tree_regressor' | 'kmeans'
+    mean, scale StandardScaler statistics applied before the model
+    trees       left, right, feature, threshold, value, default_left
+                packed as (n_trees, max_nodes) arrays; leaves point to -1
+    kmeans      centroids (n_clusters, n_features)
+
+Folded artifacts (*_folded.npz) drop mean/scale: tree thresholds are mapped
+into raw feature space (x <= threshold goes left) and K-Means becomes an
+argmin over a linear map.
+They carry check_X / check_y rows scored by the original pipeline and the
+sha256 of the compiled artifact they were derived from (source_sha256).
+
+Usage (re-export the pickled models already in outputs/):
+    python -m models_ml.compiled
+"""
+
+import hashlib
+import json
+import os
+import struct
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+CHURN_ARTIFACT = 'xgboost_churn_model_compiled.npz'
+SEGMENT_ARTIFACT = 'kmeans_segmentation_model_compiled.npz'
+FORECAST_ARTIFACT = 'rf_forecast_model_compiled.npz'
+
+# Scaler-free variants (see fold_scaler); preferred by the API when they verify
+CHURN_FOLDED = 'xgboost_churn_model_folded.npz'
+SEGMENT_FOLDED = 'kmeans_segmentation_model_folded.npz'
+FORECAST_FOLDED = 'rf_forecast_model_folded.npz'
+
+
+# ---------------------------------------------------------------------------
+# Export (called from the training scripts)
+# ---------------------------------------------------------------------------
+
+def _pack_trees(trees):
+    """Pad per-tree node arrays into rectangular (n_trees, max_nodes) arrays"""
+    n_trees = len(trees)
+    max_nodes = max(len(tree['left']) for tree in trees)
+
+    packed = {
+        'left': np.full((n_trees, max_nodes), -1, dtype=np.int32),
+        'right': np.full((n_trees, max_nodes), -1, dtype=np.int32),
+        'feature': np.zeros((n_trees, max_nodes), dtype=np.int32),
+        'threshold': np.zeros((n_trees, max_nodes), dtype=trees[0]['threshold'].dtype),
+        'value': np.zeros((n_trees, max_nodes), dtype=np.float64),
+        'default_left': np.zeros((n_trees, max_nodes), dtype=bool)
+    }
+    for i, tree in enumerate(trees):
+        n = len(tree['left'])
+        for key in packed:
+            packed[key][i, :n] = tree[key]
+
+    packed['max_depth'] = np.int32(_max_depth(packed['left'], packed['right']))
+    return packed
+
+
+def _max_depth(left, right):
+    """Longest root-to-leaf path over all packed trees"""
+    depth = 0
+    frontier = [(t, 0) for t in range(left.shape[0])]
+    level = 0
+    while frontier:
+        nxt = []
+        for t, node in frontier:
+            if left[t, node] >= 0:
+                nxt.append((t, left[t, node]))
+                nxt.append((t, right[t, node]))
+        if nxt:
+            level += 1
+        depth = max(depth, level)
+        frontier = nxt
+    return depth
+
+
+def export_xgboost_classifier(model, scaler, path, booster_path=None):
+    """Save an XGBClassifier (binary:logistic) as a packed .npz (and optionally its native JSON booster)"""
+    booster = model.get_booster()
+    if booster_path is not None:
+        booster.save_model(str(booster_path))
+    dump = json.loads(booster.save_raw('json'))
+
+    learner = dump['learner']
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Only binary:logistic boosters can be compiled, got {objective}")
+
+    trees = []
+    for tree in learner['gradient_booster']['model']['trees']:
+        left = np.array(tree['left_children'], dtype=np.int32)
+        split_conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        is_leaf = left < 0
+        trees.append({
+            'left': left,
+            'right': np.array(tree['right_children'], dtype=np.int32),
+            'feature': np.where(is_leaf, 0, np.array(tree['split_indices'], dtype=np.int32)),
+            # XGBoost compares float32 features with float32 thresholds
+            'threshold': np.where(is_leaf, 0, split_conditions).astype(np.float32),
+            # For leaves, split_conditions holds the leaf weight
+            'value': np.where(is_leaf, split_conditions, 0).astype(np.float64),
+            'default_left': np.array(tree['default_left'], dtype=bool)
+        })
+
+    # base_score is stored as a probability; trees add to its log-odds
+    base_score = float(learner['learner_model_param']['base_score'])
+
+    np.savez(
+        path,
+        kind=np.array('tree_classifier'),
+        mean=scaler.mean_,
+        scale=scaler.scale_,
+        base_margin=np.float64(np.log(base_score / (1 - base_score))),
+        **_pack_trees(trees)
+    )
+
+
+def export_random_forest(model, scaler, path):
+    """Save a single-output RandomForestRegressor as a packed .npz"""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int32)
+        is_leaf = left < 0
+        missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+        trees.append({
+            'left': left,
+            'right': tree.children_right.astype(np.int32),
+            'feature': np.where(is_leaf, 0, tree.feature).astype(np.int32),
+            # scikit-learn compares float32 features with float64 thresholds
+            'threshold': np.where(is_leaf, 0, tree.threshold).astype(np.float64),
+            'value': tree.value[:, 0, 0].astype(np.float64),
+            'default_left': missing_left.astype(bool)
+        })
+
+    np.savez(
+        path,
+        kind=np.array('tree_regressor'),
+        mean=scaler.mean_,
+        scale=scaler.scale_,
+        **_pack_trees(trees)
+    )
+
+
+def export_kmeans(model, scaler, path):
+    """Save a fitted KMeans as its centroids plus scaler statistics"""
+    np.savez(
+        path,
+        kind=np.array('kmeans'),
+        mean=scaler.mean_,
+        scale=scaler.scale_,
+        centroids=model.cluster_centers_.astype(np.float64)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Scoring (NumPy only)
+# ---------------------------------------------------------------------------
+
+class CompiledModel:
+    """Common loader: scaler statistics (or a folded flag) and reference check rows"""
+
+    def __init__(self, arrays):
+        # Folded artifacts have the scaler baked into thresholds / centroids
+        self.folded = bool(arrays.get('folded', False))
+        self.mean = arrays.get('mean')
+        self.scale = arrays.get('scale')
+        self.check_X = arrays.get('check_X')
+        self.check_y = arrays.get('check_y')
+        self.source_sha256 = arrays.get('source_sha256')
+
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return X if self.folded else (X - self.mean) / self.scale
+
+    def reference_output(self, X: np.ndarray) -> np.ndarray:
+        """The output compared against check_y (probability, prediction or cluster id)"""
+        raise NotImplementedError
+
+    def verify(self, rtol: float = 1e-5, atol: float = 1e-6, source=None):
+        """Raise ValueError if outputs on the stored check rows differ from the original pipeline,
+        or if this folded artifact was not derived from the compiled artifact at `source`"""
+        if source is not None and (self.source_sha256 is None or str(self.source_sha256) != artifact_digest(source)):
+            raise ValueError(f"{type(self).__name__} was not folded from the current {Path(source).name}")
+        if self.check_X is None:
+            return
+        got = self.reference_output(self.check_X)
+        if not np.allclose(got, self.check_y, rtol=rtol, atol=atol):
+            worst = np.abs(got - self.check_y).max()
+            raise ValueError(f"{type(self).__name__} does not match the original pipeline (max diff {worst:.3g})")
+
+
+def to_ordered(x: np.ndarray) -> np.ndarray:
+    """int64 keys that sort like the float64 values (adjacent floats get adjacent keys)"""
+    bits = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits >= 0, bits, -(bits & np.int64(0x7FFFFFFFFFFFFFFF)))
+
+
+def from_ordered(keys: np.ndarray) -> np.ndarray:
+    """Inverse of to_ordered"""
+    keys = np.asarray(keys, dtype=np.int64)
+    bits = np.where(keys >= 0, keys, (-keys) | np.int64(-0x8000000000000000))
+    return bits.view(np.float64)
+
+
+class CompiledTreeEnsemble(CompiledModel):
+    """Evaluates every tree for every row at once, one tree level per step"""
+
+    def __init__(self, arrays):
+        super().__init__(arrays)
+        self.kind = str(arrays['kind'])
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.default_left = arrays['default_left']
+        self.max_depth = int(arrays['max_depth'])
+        # XGBoost sends x < threshold left, scikit-learn sends x <= threshold left;
+        # folded thresholds are the last raw value that goes left (x <= threshold)
+        self.strict = self.kind == 'tree_classifier' and not self.folded
+        self._trees = np.arange(self.left.shape[0])
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, n_trees) leaf value reached by each row in each tree"""
+        X = self._scale(X)
+        if not self.folded:
+            # Both libraries evaluate splits on float32 features
+            X = X.astype(np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        trees = self._trees
+        node = np.zeros((X.shape[0], len(trees)), dtype=np.int32)
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[trees, node]]
+            threshold = self.threshold[trees, node]
+            go_left = x < threshold if self.strict else x <= threshold
+            go_left = np.where(np.isnan(x), self.default_left[trees, node], go_left)
+            child = np.where(go_left, self.left[trees, node], self.right[trees, node])
+            # Rows already at a leaf (child == -1) stay where they are
+            node = np.where(child >= 0, child, node)
+
+        return self.value[trees, node]
+
+    def fold(self) -> dict:
+        """Arrays of an equivalent scaler-free ensemble with thresholds in raw feature space.
+
+        A split sends a row left when float32((x - mean) / scale) is at most
+        `upper`, the largest float32 value on the left side. That is monotone
+        in x, so it equals x <= X* for the last raw value X* that still goes
+        left. X* is found exactly by bisecting over the ordered float64 bit
+        patterns, which halves the candidate range every step whatever the
+        feature's scale.
+        """
+        is_leaf = self.left < 0
+        mean = self.mean[self.feature]
+        scale = self.scale[self.feature]
+
+        threshold32 = self.threshold.astype(np.float32)
+        if self.strict:
+            upper = np.nextafter(threshold32, np.float32(-np.inf))
+        else:
+            upper = np.where(threshold32 > self.threshold, np.nextafter(threshold32, np.float32(-np.inf)), threshold32)
+
+        def goes_left(x):
+            with np.errstate(over='ignore', invalid='ignore'):
+                return ((x - mean) / scale).astype(np.float32) <= upper
+
+        # Bracket: the most negative finite float64 goes left, the largest goes right
+        lo = np.full(self.threshold.shape, to_ordered(np.float64(-np.finfo(np.float64).max)))
+        hi = np.full(self.threshold.shape, to_ordered(np.float64(np.finfo(np.float64).max)))
+        active = ~is_leaf
+        # Each step halves a range of at most 2^64 ordered values
+        for _ in range(66):
+            mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+            if not (active & (mid != lo)).any():
+                break
+            left = goes_left(from_ordered(mid))
+            lo = np.where(active & left, mid, lo)
+            hi = np.where(active & ~left, mid, hi)
+        raw = from_ordered(lo)
+
+        return {
+            'kind': np.array(self.kind),
+            'folded': np.bool_(True),
+            'left': self.left,
+            'right': self.right,
+            'feature': self.feature,
+            'threshold': np.where(is_leaf, 0, raw),
+            'value': self.value,
+            'default_left': self.default_left,
+            'max_depth': np.int32(self.max_depth)
+        }
+
+
+class CompiledXGBClassifier(CompiledTreeEnsemble):
+    """Binary logistic gradient-boosted trees"""
+
+    def __init__(self, arrays):
+        super().__init__(arrays)
+        self.base_margin = float(arrays['base_margin'])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        margin = self.base_margin + self.leaf_values(X).sum(axis=1)
+        proba = 1 / (1 + np.exp(-margin))
+        return np.column_stack([1 - proba, proba])
+
+    def reference_output(self, X: np.ndarray) -> np.ndarray:
+        return self.predict_proba(X)[:, 1]
+
+    def fold(self) -> dict:
+        return {**super().fold(), 'base_margin': np.float64(self.base_margin)}
+
+
+class CompiledRandomForestRegressor(CompiledTreeEnsemble):
+    """Mean of the leaf values over all trees"""
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.leaf_values(X).mean(axis=1)
+
+    def reference_output(self, X: np.ndarray) -> np.ndarray:
+        return self.predict(X)
+
+
+class CompiledKMeans(CompiledModel):
+    """Nearest-centroid assignment"""
+
+    def __init__(self, arrays):
+        super().__init__(arrays)
+        if self.folded:
+            self.coef = arrays['coef']
+            self.intercept = arrays['intercept']
+        else:
+            self.centroids = arrays['centroids']
+            # argmin ||x - c||^2 == argmin (||c||^2 - 2 x.c); ||x||^2 is constant per row
+            self.coef = -2 * self.centroids.T
+            self.intercept = (self.centroids ** 2).sum(axis=1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.argmin(self._scale(X) @ self.coef + self.intercept, axis=1)
+
+    def reference_output(self, X: np.ndarray) -> np.ndarray:
+        return self.predict(X)
+
+    def fold(self) -> dict:
+        """Arrays of an equivalent scaler-free argmin over raw features.
+
+        With raw centroids r = mean + scale * c and weights w = 1 / scale^2,
+        ||(x - mean) / scale - c||^2 = sum(w x^2) - 2 x.(w r) + sum(w r^2),
+        and the first term is the same for every cluster.
+        """
+        raw = self.mean + self.scale * self.centroids
+        weights = 1 / self.scale ** 2
+        return {
+            'kind': np.array('kmeans'),
+            'folded': np.bool_(True),
+            'coef': -2 * (weights * raw).T,
+            'intercept': (weights * raw ** 2).sum(axis=1)
+        }
+
+
+COMPILED_KINDS = {
+    'tree_classifier': CompiledXGBClassifier,
+    'tree_regressor': CompiledRandomForestRegressor,
+    'kmeans': CompiledKMeans
+}
+
+
+NPY_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0
+}
+
+
+def mmap_npz(path) -> dict:
+    """Memory-map the arrays of an uncompressed .npz (np.load ignores mmap_mode for archives).
+
+    np.savez stores each array as an uncompressed .npy member, so its data
+    sits at a fixed offset in the file and can be mapped read-only in place.
+    Processes mapping the same artifact share those pages in the OS page cache.
+    """
+    arrays = {}
+    with open(path, 'rb') as f, zipfile.ZipFile(f) as archive:
+        for info in archive.infolist():
+            key = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[key] = np.load(archive.open(info), allow_pickle=False)
+                continue
+
+            # Local file header: 30 fixed bytes, then the name and extra field
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            read_header = NPY_HEADER_READERS.get(version)
+            shape, fortran_order, dtype = read_header(f) if read_header else ((), False, None)
+            if dtype is not None and dtype.hasobject:
+                raise ValueError(f"{path}: object arrays cannot be memory-mapped")
+            if dtype is None or len(shape) == 0 or 0 in shape:
+                # Scalars, empty arrays and unknown .npy versions: read normally
+                arrays[key] = np.load(archive.open(info), allow_pickle=False)
+                continue
+
+            arrays[key] = np.memmap(
+                path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                order='F' if fortran_order else 'C'
+            )
+    return arrays
+
+
+def artifact_digest(path) -> str:
+    """sha256 of an artifact file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_compiled(path, mmap: bool = False) -> CompiledModel:
+    """Load a compiled .npz artifact into its NumPy scorer (optionally memory-mapped)"""
+    if mmap:
+        arrays = mmap_npz(path)
+    else:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+    return COMPILED_KINDS[str(arrays['kind'])](arrays)
+
+
+def fold_scaler(compiled_path, folded_path, X_check, y_check):
+    """Write a scaler-free equivalent of a compiled artifact and verify it.
+
+    `X_check` are raw feature rows and `y_check` the original pipeline's
+    output for them (churn probability, forecast or cluster id); both are
+    stored in the folded artifact so the API can re-check it at load time,
+    along with the compiled artifact's digest so a folded file left over
+    from an earlier build is never preferred over a newer compiled one.
+    Any existing folded artifact is removed first; the new one is written to
+    a temporary file and only renamed into place once it verifies.
+    """
+    folded_path = Path(folded_path)
+    folded_path.unlink(missing_ok=True)
+    tmp = folded_path.with_suffix('.tmp.npz')
+    try:
+        np.savez(
+            tmp,
+            check_X=np.asarray(X_check, dtype=np.float64),
+            check_y=np.asarray(y_check, dtype=np.float64),
+            source_sha256=np.array(artifact_digest(compiled_path)),
+            **load_compiled(compiled_path).fold()
+        )
+        load_compiled(tmp).verify(source=compiled_path)
+        os.replace(tmp, folded_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    import pickle
+
+    from models_ml.training import staged_outputs
+
+    def _load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _check_rows(model_dir, n_rows=512, seed=42):
+        """Training data is not at hand here: draw Poisson rows around the saved cluster profiles"""
+        profiles_path = Path('models_ml/segmentation/outputs/cluster_profiles.csv')
+        header = profiles_path.read_text().splitlines()[0].split(',')[1:]
+        profiles = np.loadtxt(profiles_path, delimiter=',', skiprows=1)[:, 1:]
+        columns = [header.index(col) for col in (model_dir / 'feature_names.txt').read_text().split()]
+        rng = np.random.default_rng(seed)
+        return rng.poisson(profiles[rng.integers(0, len(profiles), n_rows)][:, columns]).astype(np.float64)
+
+    print("🔧 Compiling saved models to NumPy artifacts...")
+
+    # Each model's artifacts are written to a staging directory and renamed over
+    # the live ones, never truncated in place: a running API may have them mapped
+    churn_dir = Path('models_ml/churn_prediction/outputs')
+    model, scaler = _load(churn_dir / 'xgboost_churn_model.pkl'), _load(churn_dir / 'scaler.pkl')
+    X_check = _check_rows(churn_dir)
+    with staged_outputs(churn_dir, CHURN_FOLDED) as staging:
+        export_xgboost_classifier(
+            model, scaler, staging / CHURN_ARTIFACT,
+            booster_path=staging / 'xgboost_churn_model.json'
+        )
+        fold_scaler(
+            staging / CHURN_ARTIFACT, staging / CHURN_FOLDED,
+            X_check, model.predict_proba(scaler.transform(X_check))[:, 1]
+        )
+
+    segment_dir = Path('models_ml/segmentation/outputs')
+    model, scaler = _load(segment_dir / 'kmeans_segmentation_model.pkl'), _load(segment_dir / 'scaler.pkl')
+    X_check = _check_rows(segment_dir)
+    with staged_outputs(segment_dir, SEGMENT_FOLDED) as staging:
+        export_kmeans(model, scaler, staging / SEGMENT_ARTIFACT)
+        fold_scaler(
+            staging / SEGMENT_ARTIFACT, staging / SEGMENT_FOLDED,
+            X_check, model.predict(scaler.transform(X_check))
+        )
+
+    forecast_dir = Path('models_ml/forecasting/outputs')
+    model, scaler = _load(forecast_dir / 'rf_forecast_model.pkl'), _load(forecast_dir / 'scaler.pkl')
+    X_check = _check_rows(forecast_dir)
+    with staged_outputs(forecast_dir, FORECAST_FOLDED) as staging:
+        export_random_forest(model, scaler, staging / FORECAST_ARTIFACT)
+        fold_scaler(
+            staging / FORECAST_ARTIFACT, staging / FORECAST_FOLDED,
+            X_check, model.predict(scaler.transform(X_check))
+        )
+
+    print("✅ Saved compiled and scaler-free (folded) artifacts for churn, segmentation and forecasting")
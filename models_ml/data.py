@@ -0,0 +1,139 @@
+"""
+Streaming Feature Loading
+Reads training data from DuckDB as Arrow record batches and copies each
+batch straight into preallocated float32 arrays, so the training scripts
+never hold a pandas DataFrame plus its float64 copies of the same table.
+
+For data larger than RAM the same batches feed StandardScaler.partial_fit
+and an XGBoost external-memory DMatrix, which pages its quantized training
+data to disk instead of memory.
+"""
+
+import os
+import resource
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import duckdb
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+from models_ml.features import DB_PATH
+
+# Rows per Arrow record batch (bounds the memory of one in-flight batch)
+BATCH_SIZE = 100_000
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far (ru_maxrss is KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def count_rows(query: str, db_path: str = DB_PATH) -> int:
+    """Number of rows a query returns (used to preallocate)"""
+    with duckdb.connect(db_path, read_only=True) as conn:
+        return conn.execute(f"SELECT count(*) FROM ({query})").fetchone()[0]
+
+
+def record_batches(query: str, db_path: str = DB_PATH, batch_size: int = BATCH_SIZE) -> Iterator:
+    """Arrow record batches of a query, at most batch_size rows each"""
+    with duckdb.connect(db_path, read_only=True) as conn:
+        yield from conn.execute(query).fetch_record_batch(batch_size)
+
+
+def to_float32(batch, columns: List[str]) -> np.ndarray:
+    """float32 (rows, len(columns)) block copied column by column from a record batch"""
+    block = np.empty((batch.num_rows, len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        block[:, j] = batch.column(col).to_numpy(zero_copy_only=False)
+    return block
+
+
+def stream_batches(
+    query: str,
+    columns: List[str],
+    db_path: str = DB_PATH,
+    batch_size: int = BATCH_SIZE
+) -> Iterator[np.ndarray]:
+    """float32 (rows, len(columns)) blocks of a query, one Arrow record batch at a time"""
+    for batch in record_batches(query, db_path, batch_size):
+        yield to_float32(batch, columns)
+
+
+def load_keyed_matrix(
+    query: str,
+    key: str,
+    columns: List[str],
+    db_path: str = DB_PATH,
+    batch_size: int = BATCH_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(keys, float32 matrix) of a query in one streaming pass; keys keep the key column's type"""
+    n_rows = count_rows(query, db_path)
+    X = np.empty((n_rows, len(columns)), dtype=np.float32)
+    keys = []
+    start = 0
+    for batch in record_batches(query, db_path, batch_size):
+        X[start:start + batch.num_rows] = to_float32(batch, columns)
+        keys.append(batch.column(key).to_numpy(zero_copy_only=False))
+        start += batch.num_rows
+    return (np.concatenate(keys) if keys else np.empty(0, dtype=object)), X[:start]
+
+
+def partial_fit_scaler(batches: Iterator[np.ndarray], n_features: Optional[int] = None) -> StandardScaler:
+    """StandardScaler fitted incrementally over streamed blocks (first n_features columns)"""
+    scaler = StandardScaler()
+    for block in batches:
+        scaler.partial_fit(block if n_features is None else block[:, :n_features])
+    return scaler
+
+
+class ExternalMemoryIter(xgb.DataIter):
+    """Feeds streamed, scaled (features, label) blocks to an external-memory DMatrix.
+
+    `make_batches` is called once per pass over the data (XGBoost re-iterates
+    while building its on-disk cache); the last column of each block is the label.
+    """
+
+    def __init__(
+        self,
+        make_batches: Callable[[], Iterator[np.ndarray]],
+        scaler: StandardScaler,
+        cache_dir: str
+    ):
+        self.make_batches = make_batches
+        self.scaler = scaler
+        self._batches = None
+        super().__init__(cache_prefix=os.path.join(cache_dir, 'xgb-cache'))
+
+    def next(self, input_data) -> bool:
+        if self._batches is None:
+            self._batches = self.make_batches()
+        block = next(self._batches, None)
+        if block is None:
+            return False
+        input_data(data=self.scaler.transform(block[:, :-1]), label=block[:, -1])
+        return True
+
+    def reset(self):
+        self._batches = None
+
+
+def train_test_batches(
+    query: str,
+    columns: List[str],
+    key: str,
+    test_fraction: float = 0.2,
+    db_path: str = DB_PATH,
+    batch_size: int = BATCH_SIZE
+) -> Tuple[Callable[[], Iterator[np.ndarray]], Callable[[], Iterator[np.ndarray]]]:
+    """Batch factories for a deterministic hash split of a query on `key` (no shuffling in memory)"""
+    buckets = round(test_fraction * 100)
+    split = f"SELECT * FROM ({query}) WHERE hash({key}) % 100 {{op}} {buckets}"
+
+    def train():
+        return stream_batches(split.format(op='>='), columns, db_path, batch_size)
+
+    def test():
+        return stream_batches(split.format(op='<'), columns, db_path, batch_size)
+
+    return train, test
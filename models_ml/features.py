@@ -0,0 +1,166 @@
+"""
+Feature Specification
+Single source of truth for the model input columns: their order, dtypes and
+source table. The training scripts build their DuckDB query from it, the API
+builds its request schema and feature vectors from it, and load_table()
+caches the shared feature table so a run that trains every model reads
+DuckDB once instead of once per model.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DB_PATH = './dev.duckdb'
+# On-disk copies of the feature table, one per (spec, database version)
+CACHE_DIR = Path(os.environ.get('FEATURE_CACHE_DIR', 'models_ml/.cache'))
+
+
+@dataclass(frozen=True)
+class Feature:
+    """One model input column"""
+    name: str
+    dtype: type = int
+
+    @property
+    def sql_type(self) -> str:
+        return 'DOUBLE' if self.dtype is float else 'BIGINT'
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Ordered input columns of a feature table, keyed by one id column"""
+    table: str
+    key: str
+    features: Tuple[Feature, ...]
+
+    @property
+    def columns(self) -> List[str]:
+        return [feature.name for feature in self.features]
+
+    def query(self, order: bool = True) -> str:
+        """SELECT of the key and every feature (cast to its declared type), ordered by key"""
+        casts = ',\n    '.join(f"CAST({f.name} AS {f.sql_type}) AS {f.name}" for f in self.features)
+        sql = f"SELECT\n    {self.key},\n    {casts}\nFROM {self.table}"
+        return f"{sql}\nORDER BY {self.key}" if order else sql
+
+    def index(self, columns: Sequence[str]) -> Optional[np.ndarray]:
+        """Positions of `columns` within the spec's column order (None = all, in order)"""
+        if list(columns) == self.columns:
+            return None
+        missing = [col for col in columns if col not in self.columns]
+        if missing:
+            raise ValueError(f"Unknown feature columns: {missing}")
+        return np.array([self.columns.index(col) for col in columns])
+
+    def matrix(self, rows) -> np.ndarray:
+        """Contiguous float64 matrix (spec column order) from objects with one attribute per feature"""
+        columns = self.columns
+        X = np.empty((len(rows), len(columns)), dtype=np.float64)
+        for i, row in enumerate(rows):
+            X[i] = [getattr(row, col) for col in columns]
+        return X
+
+    def fingerprint(self) -> str:
+        """Short hash of the table, key, column order and dtypes"""
+        layout = ';'.join([self.table, self.key] + [f"{f.name}:{f.sql_type}" for f in self.features])
+        return hashlib.sha256(layout.encode()).hexdigest()[:12]
+
+
+# Inputs shared by the churn, segmentation and forecasting models (and the API)
+FEATURES = FeatureSpec(
+    table='main.customer_features_for_ml',
+    key='user_id',
+    features=(
+        Feature('total_events'),
+        Feature('events_last_30d'),
+        Feature('events_last_7d'),
+        Feature('unique_event_types'),
+        Feature('login_events', float),
+        Feature('view_events', float),
+        Feature('click_events', float),
+        Feature('purchase_events', float),
+        Feature('days_with_events'),
+        Feature('days_since_last_event')
+    )
+)
+
+
+@dataclass(frozen=True)
+class FeatureTable:
+    """The feature table as one float32 matrix plus its key column, in key order"""
+    spec: FeatureSpec
+    keys: np.ndarray
+    matrix: np.ndarray
+    source: str
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def select(self, columns: Sequence[str]) -> np.ndarray:
+        """(rows, len(columns)) float32 matrix of a model's inputs"""
+        index = self.spec.index(columns)
+        return self.matrix if index is None else self.matrix[:, index]
+
+    def column(self, name: str) -> np.ndarray:
+        """One feature as a 1-D float32 view"""
+        return self.matrix[:, self.spec.columns.index(name)]
+
+
+def source_version(db_path: Path) -> str:
+    """Version id from the mtime and size of the database and its write-ahead log"""
+    parts = []
+    for path in (db_path, db_path.with_name(db_path.name + '.wal')):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        parts.append(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return ';'.join(parts)
+
+
+_TABLES: Dict[str, FeatureTable] = {}
+
+
+def load_table(
+    spec: FeatureSpec = FEATURES,
+    db_path: str = DB_PATH,
+    cache_dir: Optional[Path] = CACHE_DIR
+) -> FeatureTable:
+    """Feature table for the current database version: from this process, the disk cache, or DuckDB.
+
+    The cache key covers the spec and the database file's mtime/size, so a
+    dbt rebuild or a column change reads DuckDB again. cache_dir=None skips
+    the disk cache.
+    """
+    version = hashlib.sha256(source_version(Path(db_path)).encode()).hexdigest()[:12]
+    name = f"{spec.table.split('.')[-1]}-{spec.fingerprint()}-{version}.npz"
+
+    # Training-only dependencies; the API imports this module for the spec alone
+    from models_ml.data import load_keyed_matrix
+
+    if name in _TABLES:
+        return FeatureTable(spec, _TABLES[name].keys, _TABLES[name].matrix, 'memory')
+
+    path = None if cache_dir is None else Path(cache_dir) / name
+    if path is not None and path.exists():
+        with np.load(path) as cached:
+            table = FeatureTable(spec, cached['keys'], cached['matrix'], 'cache')
+    else:
+        keys, matrix = load_keyed_matrix(spec.query(), spec.key, spec.columns, db_path)
+        table = FeatureTable(spec, keys.astype(str), matrix, 'duckdb')
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Older versions of the same table are never read again
+            for stale in path.parent.glob(f"{name.rsplit('-', 1)[0]}-*.npz"):
+                stale.unlink()
+            tmp = path.with_suffix('.tmp.npz')
+            np.savez(tmp, keys=table.keys, matrix=table.matrix)
+            os.replace(tmp, path)
+
+    _TABLES[name] = table
+    return table
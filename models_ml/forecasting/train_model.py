@@ -3,16 +3,18 @@ Event Forecasting Model
 Predicts future event volumes using historical patterns.
 """
 
-import duckdb
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import pickle
 from pathlib import Path
 
+from models_ml.compiled import FORECAST_ARTIFACT, FORECAST_FOLDED, export_random_forest, fold_scaler
+from models_ml.data import peak_rss_mb
+from models_ml.features import FEATURES, load_table
+from models_ml.training import fit_scaler, save_metrics, save_model, staged_outputs
+
 # Setup
 np.random.seed(42)
 output_dir = Path('models_ml/forecasting/outputs')
@@ -24,43 +26,18 @@ print("=" * 70)
 
 # 1. Load data
 print("\n📊 Loading data from DuckDB...")
-conn = duckdb.connect('./dev.duckdb', read_only=True)
-
-# Get user-level aggregated features
-query = """
-SELECT 
-    user_id,
-    total_events,
-    events_last_30d,
-    events_last_7d,
-    unique_event_types,
-    login_events,
-    view_events,
-    click_events,
-    purchase_events,
-    days_with_events,
-    days_since_last_event
-FROM main.customer_features_for_ml
-"""
-
-df = conn.execute(query).df()
-conn.close()
-
-print(f"✅ Loaded {len(df)} users")
+table = load_table()
+print(f"✅ Loaded {len(table)} users (from {table.source})")
 
 # 2. Create forecasting features and target
 print("\n🔧 Creating forecasting features...")
 
 # Target: predict total_events (future activity indicator)
-# Features: recent activity patterns
-feature_cols = [
-    'events_last_30d', 'events_last_7d', 'unique_event_types',
-    'login_events', 'view_events', 'click_events', 'purchase_events',
-    'days_with_events', 'days_since_last_event'
-]
+# Features: recent activity patterns (every shared feature except the target)
+feature_cols = [col for col in FEATURES.columns if col != 'total_events']
 
-X = df[feature_cols]
-y = df['total_events']  # Predict lifetime events based on recent patterns
+X = table.select(feature_cols)
+y = table.column('total_events')  # Predict lifetime events based on recent patterns
 
 print(f"   Features: {len(feature_cols)}")
 print(f"   Target: total_events (range: {y.min():.0f} to {y.max():.0f})")
@@ -75,9 +52,7 @@ print(f"   Training set: {len(X_train)} samples")
 print(f"   Test set: {len(X_test)} samples")
 
 # 4. Scale features
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+scaler, X_train_scaled, X_test_scaled = fit_scaler(X_train, X_test)
 
 # 5. Train Random Forest model
 print("\n🤖 Training Random Forest Regressor...")
@@ -121,7 +96,7 @@ print(f"   R²:   {test_r2:.4f}")
 print("\n🔍 Sample predictions (first 5 test samples):")
 print(f"{'Actual':>8} {'Predicted':>10} {'Error':>8}")
 for i in range(min(5, len(y_test))):
-    actual = y_test.iloc[i]
+    actual = y_test[i]
     predicted = y_pred_test[i]
     error = actual - predicted
     print(f"{actual:8.1f} {predicted:10.1f} {error:8.1f}")
@@ -138,17 +113,20 @@ print(feature_importance.to_string(index=False))
 # 8. Save artifacts
 print("\n💾 Saving model artifacts...")
 
-# Save model
-with open(output_dir / 'rf_forecast_model.pkl', 'wb') as f:
-    pickle.dump(model, f)
+# Everything the API loads is published together, and only if the fold below succeeds
+with staged_outputs(output_dir, FORECAST_FOLDED) as staging:
+    # Save model, scaler and feature names
+    save_model(staging, 'rf_forecast_model.pkl', model, scaler, feature_cols)
 
-# Save scaler
-with open(output_dir / 'scaler.pkl', 'wb') as f:
-    pickle.dump(scaler, f)
+    # Save compiled inference artifact (NumPy-only scorer used by the API)
+    export_random_forest(model, scaler, staging / FORECAST_ARTIFACT)
 
-# Save feature names
-with open(output_dir / 'feature_names.txt', 'w') as f:
-    f.write('\n'.join(feature_cols))
+    # Compile a scaler-free equivalent, checked against the float64 scaler + model pipeline the API runs
+    X_check = X_test[:1000].astype(np.float64)
+    fold_scaler(
+        staging / FORECAST_ARTIFACT, staging / FORECAST_FOLDED,
+        X_check, model.predict(scaler.transform(X_check))
+    )
 
 # Save feature importance
 feature_importance.to_csv(output_dir / 'feature_importance.csv', index=False)
@@ -165,17 +143,17 @@ metrics = {
     'test_r2': float(test_r2),
     'target_range': {'min': float(y.min()), 'max': float(y.max())}
 }
-
-import json
-with open(output_dir / 'metrics.json', 'w') as f:
-    json.dump(metrics, f, indent=2)
+save_metrics(output_dir, metrics)
 
 print(f"✅ Saved to {output_dir}/")
 print(f"   - rf_forecast_model.pkl")
 print(f"   - scaler.pkl")
+print(f"   - {FORECAST_ARTIFACT}")
+print(f"   - {FORECAST_FOLDED}")
 print(f"   - feature_names.txt")
 print(f"   - feature_importance.csv")
 print(f"   - metrics.json")
+print(f"\n🧠 Peak RSS: {peak_rss_mb():,.0f} MB")
 
 print("\n" + "=" * 70)
 print("✅ EVENT FORECASTING MODEL COMPLETE!")
@@ -0,0 +1,230 @@
+"""
+Training Pipeline
+Retrains every model in one run, skipping work whose inputs have not changed:
+
+    extract   feature table from DuckDB (shared, cached by load_table)
+    model     per model: scale -> train -> evaluate -> export (its train_model script)
+
+Each model's input hash covers the feature table contents, the model's
+training code, the shared models_ml modules and its arguments. A model is
+skipped when that hash matches the manifest.json in its outputs/ directory
+and every artifact listed there still has its recorded hash. The models that
+do need retraining run concurrently, one process each.
+
+Usage (from the repo root):
+    python -m models_ml.pipeline
+    python -m models_ml.pipeline --force --only churn segment
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MODELS_ML = Path(__file__).parent
+# Modules every training script depends on
+SHARED_SOURCES = ['features.py', 'data.py', 'training.py', 'compiled.py']
+PIPELINE_MANIFEST = Path('models_ml/pipeline_manifest.json')
+# Written by the pipeline itself, so never part of a model's artifacts
+NOT_ARTIFACTS = {'manifest.json', 'train.log'}
+
+
+@dataclass(frozen=True)
+class ModelStage:
+    """One model's training script and where it writes its artifacts"""
+    name: str
+    module: str
+    args: Tuple[str, ...] = ()
+
+    @property
+    def package_dir(self) -> Path:
+        return MODELS_ML / self.module.split('.')[1]
+
+    @property
+    def output_dir(self) -> Path:
+        return Path('models_ml') / self.module.split('.')[1] / 'outputs'
+
+    def sources(self) -> List[Path]:
+        """Code whose change should retrain this model"""
+        own = sorted(self.package_dir.glob('*.py'))
+        return own + [MODELS_ML / name for name in SHARED_SOURCES]
+
+
+STAGES = [
+    ModelStage('churn', 'models_ml.churn_prediction.train_model'),
+    ModelStage('segment', 'models_ml.segmentation.train_model'),
+    ModelStage('forecast', 'models_ml.forecasting.train_model')
+]
+
+
+def file_hash(path: Path) -> str:
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract() -> Tuple[str, str, float]:
+    """(content hash of the feature table, where it came from, seconds)"""
+    from models_ml.features import load_table
+
+    started = time.perf_counter()
+    table = load_table()
+    digest = hashlib.sha256(table.spec.fingerprint().encode())
+    digest.update(table.keys.tobytes())
+    digest.update(table.matrix.tobytes())
+    return digest.hexdigest(), table.source, time.perf_counter() - started
+
+
+def input_hash(stage: ModelStage, feature_hash: str) -> str:
+    """Hash of everything a model's artifacts are derived from"""
+    digest = hashlib.sha256(feature_hash.encode())
+    for path in stage.sources():
+        digest.update(f"{path.name}:{file_hash(path)};".encode())
+    digest.update(' '.join(stage.args).encode())
+    return digest.hexdigest()
+
+
+def read_manifest(stage: ModelStage) -> Optional[dict]:
+    """The model's manifest.json from its last pipeline run (None if missing or unreadable)"""
+    try:
+        with open(stage.output_dir / 'manifest.json') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_fresh(stage: ModelStage, inputs: str) -> bool:
+    """Same inputs as the last successful run, and its artifacts untouched since"""
+    manifest = read_manifest(stage)
+    if manifest is None or manifest.get('input_hash') != inputs:
+        return False
+    for name, recorded in manifest['artifacts'].items():
+        path = stage.output_dir / name
+        if not path.exists() or file_hash(path) != recorded:
+            return False
+    return True
+
+
+def artifact_hashes(stage: ModelStage) -> Dict[str, str]:
+    """sha256 of every file the training script left in outputs/"""
+    return {
+        path.name: file_hash(path)
+        for path in sorted(stage.output_dir.iterdir())
+        if path.is_file() and path.name not in NOT_ARTIFACTS
+    }
+
+
+def train(stage: ModelStage, inputs: str, feature_hash: str, threads: int) -> dict:
+    """Run one training script in its own process and record its manifest"""
+    stage.output_dir.mkdir(parents=True, exist_ok=True)
+    # Cap each process's OpenMP / BLAS / joblib threads so concurrent models share the cores
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads), LOKY_MAX_CPU_COUNT=str(threads))
+
+    started = time.perf_counter()
+    with open(stage.output_dir / 'train.log', 'w') as log:
+        result = subprocess.run(
+            [sys.executable, '-m', stage.module, *stage.args],
+            stdout=log, stderr=subprocess.STDOUT, env=env
+        )
+    seconds = time.perf_counter() - started
+
+    if result.returncode != 0:
+        return {'name': stage.name, 'status': 'failed', 'seconds': round(seconds, 3),
+                'log': str(stage.output_dir / 'train.log')}
+
+    manifest = {
+        'model': stage.name,
+        'input_hash': inputs,
+        'feature_hash': feature_hash,
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seconds': round(seconds, 3),
+        'artifacts': artifact_hashes(stage)
+    }
+    # Written last: the API registry treats a new manifest.json as a new model version
+    with open(stage.output_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return {'name': stage.name, 'status': 'trained', 'seconds': round(seconds, 3),
+            'input_hash': inputs, 'artifacts': manifest['artifacts']}
+
+
+def run(stages: List[ModelStage], force: bool = False, jobs: int = -1) -> dict:
+    """Extract features once, then retrain the stale models concurrently"""
+    started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+    run_started = time.perf_counter()
+
+    print("\n📊 Extracting features...")
+    feature_hash, source, extract_seconds = extract()
+    print(f"   {source}, {extract_seconds:.2f}s, hash {feature_hash[:12]}")
+
+    results, stale = [], []
+    for stage in stages:
+        inputs = input_hash(stage, feature_hash)
+        if not force and is_fresh(stage, inputs):
+            print(f"   ⏭️  {stage.name}: inputs unchanged, skipping")
+            results.append({'name': stage.name, 'status': 'cached', 'seconds': 0.0,
+                            'input_hash': inputs, 'artifacts': read_manifest(stage)['artifacts']})
+        else:
+            stale.append((stage, inputs))
+
+    if stale:
+        cores = os.cpu_count() or 1
+        workers = min(len(stale), cores if jobs == -1 else jobs)
+        threads = max(1, cores // workers)
+        print(f"\n🤖 Training {', '.join(stage.name for stage, _ in stale)} "
+              f"({workers} concurrent, {threads} threads each)...")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(train, stage, inputs, feature_hash, threads) for stage, inputs in stale]
+            for future in futures:
+                result = future.result()
+                icon = '✅' if result['status'] == 'trained' else '❌'
+                print(f"   {icon} {result['name']}: {result['status']} in {result['seconds']:.1f}s")
+                results.append(result)
+
+    order = {stage.name: i for i, stage in enumerate(stages)}
+    return {
+        'started_at': started_at,
+        'wall_seconds': round(time.perf_counter() - run_started, 3),
+        'extract': {'source': source, 'seconds': round(extract_seconds, 3), 'feature_hash': feature_hash},
+        'models': sorted(results, key=lambda result: order[result['name']])
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=[stage.name for stage in STAGES],
+                        help='Models to consider (default: all)')
+    parser.add_argument('--force', action='store_true', help='Retrain even when inputs are unchanged')
+    parser.add_argument('--jobs', type=int, default=-1, help='Models trained concurrently (-1 = one per core)')
+    parser.add_argument('--manifest', default=str(PIPELINE_MANIFEST), help='Where to write the run manifest')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("TRAINING PIPELINE")
+    print("=" * 70)
+
+    stages = [stage for stage in STAGES if args.only is None or stage.name in args.only]
+    manifest = run(stages, force=args.force, jobs=args.jobs)
+
+    with open(args.manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    failed = [result['name'] for result in manifest['models'] if result['status'] == 'failed']
+    print(f"\n⏱️  Wall time: {manifest['wall_seconds']:.1f}s")
+    print(f"📝 Manifest: {args.manifest}")
+    print("\n" + "=" * 70)
+    if failed:
+        print(f"❌ FAILED: {', '.join(failed)} (see outputs/train.log)")
+        print("=" * 70)
+        sys.exit(1)
+    print("✅ PIPELINE COMPLETE!")
+    print("=" * 70)
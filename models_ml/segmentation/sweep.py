@@ -0,0 +1,126 @@
+"""
+Parallel K-Means parameter sweep.
+Fits every candidate K in its own worker process and scores it with a
+sampled silhouette, so choosing K stays tractable for millions of users:
+the exact silhouette is O(n^2) in time, the sampled one O(sample_size^2).
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+from joblib import Parallel, delayed, parallel_config
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+# 'auto' switches to MiniBatchKMeans from this many rows
+MINIBATCH_THRESHOLD = 200_000
+# Rows drawn for the silhouette estimate (None = exact, all rows)
+SILHOUETTE_SAMPLE = 10_000
+
+
+@dataclass
+class SweepResult:
+    """One fitted K with its quality metrics and timings"""
+    k: int
+    algorithm: str
+    model: object
+    inertia: float
+    silhouette: float
+    fit_seconds: float
+    silhouette_seconds: float
+
+    @property
+    def wall_seconds(self) -> float:
+        return self.fit_seconds + self.silhouette_seconds
+
+    def summary(self) -> dict:
+        """JSON-serialisable metrics (no model)"""
+        return {
+            'k': self.k,
+            'algorithm': self.algorithm,
+            'inertia': float(self.inertia),
+            'silhouette': float(self.silhouette),
+            'fit_seconds': round(self.fit_seconds, 3),
+            'silhouette_seconds': round(self.silhouette_seconds, 3),
+            'wall_seconds': round(self.wall_seconds, 3)
+        }
+
+
+def resolve_algorithm(algorithm: str, n_samples: int) -> str:
+    """'kmeans' or 'minibatch'; 'auto' picks MiniBatchKMeans for large n"""
+    if algorithm == 'auto':
+        return 'minibatch' if n_samples >= MINIBATCH_THRESHOLD else 'kmeans'
+    if algorithm not in ('kmeans', 'minibatch'):
+        raise ValueError(f"Unknown algorithm: {algorithm!r} (expected 'auto', 'kmeans' or 'minibatch')")
+    return algorithm
+
+
+def make_model(k: int, algorithm: str, random_state: int = 42):
+    """Unfitted estimator for one K (same settings as the original training script for 'kmeans')"""
+    if algorithm == 'minibatch':
+        return MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3, batch_size=4096)
+    return KMeans(n_clusters=k, random_state=random_state, n_init=10)
+
+
+def sampled_silhouette(X: np.ndarray, labels: np.ndarray, sample_size: Optional[int], random_state: int = 42) -> float:
+    """Silhouette on a random sample of rows (exact when the data fits in the sample)"""
+    if sample_size is not None and len(X) <= sample_size:
+        sample_size = None
+    return float(silhouette_score(X, labels, sample_size=sample_size, random_state=random_state))
+
+
+def fit_k(
+    X: np.ndarray,
+    k: int,
+    algorithm: str,
+    silhouette_sample: Optional[int],
+    random_state: int = 42
+) -> SweepResult:
+    """Fit and score a single K (runs inside a worker process)"""
+    started = time.perf_counter()
+    model = make_model(k, algorithm, random_state).fit(X)
+    fitted = time.perf_counter()
+    silhouette = sampled_silhouette(X, model.labels_, silhouette_sample, random_state)
+
+    return SweepResult(
+        k=k,
+        algorithm=algorithm,
+        model=model,
+        inertia=model.inertia_,
+        silhouette=silhouette,
+        fit_seconds=fitted - started,
+        silhouette_seconds=time.perf_counter() - fitted
+    )
+
+
+def run_sweep(
+    X: np.ndarray,
+    k_values: Iterable[int],
+    n_jobs: int = -1,
+    algorithm: str = 'auto',
+    silhouette_sample: Optional[int] = SILHOUETTE_SAMPLE,
+    random_state: int = 42
+) -> List[SweepResult]:
+    """Fit every K in parallel worker processes; results come back in k_values order.
+
+    X is memory-mapped into the workers rather than copied, and each worker's
+    OpenMP / BLAS threads are capped so workers x threads <= CPU cores.
+    """
+    k_values = list(k_values)
+    algorithm = resolve_algorithm(algorithm, len(X))
+    cores = os.cpu_count() or 1
+    n_workers = min(len(k_values), cores if n_jobs == -1 else n_jobs)
+    threads = max(1, cores // n_workers)
+
+    with parallel_config(backend='loky', inner_max_num_threads=threads):
+        # Largest K first: it is the slowest fit, so it should not start last
+        ordered = sorted(k_values, reverse=True)
+        results = Parallel(n_jobs=n_workers)(
+            delayed(fit_k)(X, k, algorithm, silhouette_sample, random_state) for k in ordered
+        )
+
+    by_k = {result.k: result for result in results}
+    return [by_k[k] for k in k_values]
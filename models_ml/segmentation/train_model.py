@@ -3,17 +3,30 @@ Customer Segmentation Model
 Groups customers into behavioral segments using K-Means clustering.
 """
 
-import duckdb
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score, davies_bouldin_score
+from sklearn.metrics import davies_bouldin_score
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pickle
+import time
 from pathlib import Path
 
+from models_ml.compiled import SEGMENT_ARTIFACT, SEGMENT_FOLDED, export_kmeans, fold_scaler
+from models_ml.data import peak_rss_mb
+from models_ml.features import FEATURES, load_table
+from models_ml.segmentation.sweep import SILHOUETTE_SAMPLE, fit_k, run_sweep
+from models_ml.training import fit_scaler, save_metrics, save_model, staged_outputs
+
+parser = argparse.ArgumentParser(description='Train the customer segmentation model')
+parser.add_argument('--n-jobs', type=int, default=-1, help='Worker processes for the K sweep (-1 = all cores)')
+parser.add_argument('--algorithm', choices=['auto', 'kmeans', 'minibatch'], default='auto',
+                    help='auto = MiniBatchKMeans from 200K users, KMeans below')
+parser.add_argument('--silhouette-sample', type=int, default=SILHOUETTE_SAMPLE,
+                    help='Rows sampled for silhouette scores (0 = exact, O(n^2))')
+args = parser.parse_args()
+silhouette_sample = args.silhouette_sample or None
+
 # Setup
 np.random.seed(42)
 output_dir = Path('models_ml/segmentation/outputs')
@@ -25,60 +38,51 @@ print("=" * 70)
 
 # 1. Load data
 print("\n📊 Loading data from DuckDB...")
-conn = duckdb.connect('./dev.duckdb', read_only=True)
-
-query = """
-SELECT 
-    user_id,
-    total_events,
-    events_last_30d,
-    events_last_7d,
-    unique_event_types,
-    login_events,
-    view_events,
-    click_events,
-    purchase_events,
-    days_with_events,
-    days_since_last_event
-FROM main.customer_features_for_ml
-"""
 
-df = conn.execute(query).df()
-conn.close()
+table = load_table()
+feature_cols = FEATURES.columns
 
-print(f"✅ Loaded {len(df)} users")
-print(f"   Features: {len(df.columns) - 1}")
+# The frame wraps the shared float32 matrix without copying it
+X = table.matrix
+df = pd.DataFrame(X, columns=feature_cols, copy=False)
+df.insert(0, 'user_id', table.keys)
+
+print(f"✅ Loaded {len(df)} users (from {table.source}, {X.nbytes / 1e6:.1f} MB as float32)")
+print(f"   Features: {len(feature_cols)}")
 
 # 2. Prepare features
 print("\n🔧 Preparing features for clustering...")
-feature_cols = [col for col in df.columns if col != 'user_id']
-X = df[feature_cols].values
 
 # 3. Scale features
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+# float64 for clustering: K-Means keeps its input dtype and the API scores in float64
+scaler, X_scaled = fit_scaler(X)
+X_scaled = X_scaled.astype(np.float64)
 
-# 4. Find optimal number of clusters
+# 4. Find optimal number of clusters (every K fitted in parallel)
 print("\n🔍 Finding optimal number of clusters...")
-inertias = []
-silhouette_scores = []
 K_range = range(2, 8)
+sweep_started = time.perf_counter()
+sweep = run_sweep(X_scaled, K_range, n_jobs=args.n_jobs, algorithm=args.algorithm,
+                  silhouette_sample=silhouette_sample)
+sweep_seconds = time.perf_counter() - sweep_started
 
-for k in K_range:
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    kmeans.fit(X_scaled)
-    inertias.append(kmeans.inertia_)
-    silhouette_scores.append(silhouette_score(X_scaled, kmeans.labels_))
-    print(f"   K={k}: Silhouette={silhouette_scores[-1]:.3f}")
+for result in sweep:
+    print(f"   K={result.k}: Silhouette={result.silhouette:.3f} "
+          f"(fit {result.fit_seconds:.1f}s + silhouette {result.silhouette_seconds:.1f}s)")
+print(f"   Sweep wall time: {sweep_seconds:.1f}s ({sweep[0].algorithm}, "
+      f"silhouette on {silhouette_sample or 'all'} rows)")
 
 # Choose k=4 as a good balance
 optimal_k = 4
 print(f"\n✅ Selected K={optimal_k} clusters")
 
-# 5. Train final model
+# 5. Final model: reuse the sweep's fit for the chosen K (same seed and settings)
 print(f"\n🤖 Training K-Means with {optimal_k} clusters...")
-kmeans = KMeans(n_clusters=optimal_k, random_state=42, n_init=10)
-clusters = kmeans.fit_predict(X_scaled)
+final = next((result for result in sweep if result.k == optimal_k), None)
+if final is None:
+    final = fit_k(X_scaled, optimal_k, sweep[0].algorithm, silhouette_sample)
+kmeans = final.model
+clusters = kmeans.labels_
 
 df['cluster'] = clusters
 
@@ -126,7 +130,7 @@ for cluster_id, name in segment_names.items():
     print(f"   Cluster {cluster_id}: {name} ({size} users)")
 
 # 8. Model metrics
-silhouette = silhouette_score(X_scaled, clusters)
+silhouette = final.silhouette
 davies_bouldin = davies_bouldin_score(X_scaled, clusters)
 
 print(f"\n📈 Clustering Metrics:")
@@ -136,17 +140,20 @@ print(f"   Davies-Bouldin Index: {davies_bouldin:.4f} (lower is better)")
 # 9. Save artifacts
 print("\n💾 Saving model artifacts...")
 
-# Save model
-with open(output_dir / 'kmeans_segmentation_model.pkl', 'wb') as f:
-    pickle.dump(kmeans, f)
+# Everything the API loads is published together, and only if the fold below succeeds
+with staged_outputs(output_dir, SEGMENT_FOLDED) as staging:
+    # Save model, scaler and feature names
+    save_model(staging, 'kmeans_segmentation_model.pkl', kmeans, scaler, feature_cols)
 
-# Save scaler
-with open(output_dir / 'scaler.pkl', 'wb') as f:
-    pickle.dump(scaler, f)
+    # Save compiled inference artifact (NumPy-only scorer used by the API)
+    export_kmeans(kmeans, scaler, staging / SEGMENT_ARTIFACT)
 
-# Save feature names
-with open(output_dir / 'feature_names.txt', 'w') as f:
-    f.write('\n'.join(feature_cols))
+    # Compile a scaler-free equivalent, checked against the float64 scaler + model pipeline the API runs
+    X_check = X[:1000].astype(np.float64)
+    fold_scaler(
+        staging / SEGMENT_ARTIFACT, staging / SEGMENT_FOLDED,
+        X_check, kmeans.predict(scaler.transform(X_check))
+    )
 
 # Save cluster profiles
 cluster_profiles.to_csv(output_dir / 'cluster_profiles.csv')
@@ -164,22 +171,25 @@ metrics = {
     'n_clusters': optimal_k,
     'total_users': len(df),
     'silhouette_score': float(silhouette),
+    'silhouette_sample_size': silhouette_sample,
     'davies_bouldin_score': float(davies_bouldin),
-    'cluster_sizes': cluster_sizes.to_dict()
+    'cluster_sizes': cluster_sizes.to_dict(),
+    'k_sweep': [result.summary() for result in sweep],
+    'k_sweep_wall_seconds': round(sweep_seconds, 3)
 }
-
-import json
-with open(output_dir / 'metrics.json', 'w') as f:
-    json.dump(metrics, f, indent=2)
+save_metrics(output_dir, metrics)
 
 print(f"✅ Saved to {output_dir}/")
 print(f"   - kmeans_segmentation_model.pkl")
 print(f"   - scaler.pkl")
+print(f"   - {SEGMENT_ARTIFACT}")
+print(f"   - {SEGMENT_FOLDED}")
 print(f"   - feature_names.txt")
 print(f"   - cluster_profiles.csv")
 print(f"   - segment_names.csv")
 print(f"   - user_segments.csv")
 print(f"   - metrics.json")
+print(f"\n🧠 Peak RSS: {peak_rss_mb():,.0f} MB")
 
 print("\n" + "=" * 70)
 print("✅ CUSTOMER SEGMENTATION MODEL COMPLETE!")
@@ -0,0 +1,69 @@
+"""
+Shared Training Steps
+Feature scaling and the artifact dump every training script ends with, so
+the files the API registry loads (pickled model and scaler,
+feature_names.txt, metrics.json) are written the same way for each model.
+A model's artifacts are written into a staging directory and moved into
+outputs/ only once all of them (including the folded artifact) succeeded.
+"""
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from models_ml.data import peak_rss_mb
+
+
+def fit_scaler(X_train: np.ndarray, *others: np.ndarray) -> Tuple:
+    """StandardScaler fitted on X_train; returns (scaler, X_train scaled, *others scaled)"""
+    scaler = StandardScaler()
+    return (scaler, scaler.fit_transform(X_train)) + tuple(scaler.transform(X) for X in others)
+
+
+@contextmanager
+def staged_outputs(output_dir: Path, *stale: str):
+    """Staging directory whose files replace output_dir's only if the block succeeds.
+
+    `stale` names files derived from the ones being replaced (folded
+    artifacts); they are removed up front so a failed run cannot leave one
+    behind next to the artifacts it no longer matches.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in stale:
+        (output_dir / name).unlink(missing_ok=True)
+
+    staging = Path(tempfile.mkdtemp(prefix='.staging-', dir=output_dir))
+    try:
+        yield staging
+        # Same filesystem: each rename is atomic, and derived (folded) files land last
+        for path in sorted(staging.iterdir(), key=lambda p: p.name in stale):
+            os.replace(path, output_dir / path.name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def save_model(output_dir: Path, model_file: str, model, scaler: StandardScaler, feature_columns: List[str]):
+    """Pickled model and scaler plus feature_names.txt (the registry's input column order)"""
+    with open(output_dir / model_file, 'wb') as f:
+        pickle.dump(model, f)
+
+    with open(output_dir / 'scaler.pkl', 'wb') as f:
+        pickle.dump(scaler, f)
+
+    with open(output_dir / 'feature_names.txt', 'w') as f:
+        f.write('\n'.join(feature_columns))
+
+
+def save_metrics(output_dir: Path, metrics: dict):
+    """metrics.json, with the run's peak RSS added"""
+    metrics = {**metrics, 'peak_rss_mb': round(peak_rss_mb(), 1)}
+    with open(output_dir / 'metrics.json', 'w') as f:
+        json.dump(metrics, f, indent=2)
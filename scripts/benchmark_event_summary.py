@@ -0,0 +1,134 @@
+"""
+int_event_summary benchmark: two-pass view vs single-pass incremental table.
+Times, in an in-memory DuckDB over the raw Parquet files:
+  - the previous view (events aggregated twice and joined back together),
+  - a full build of models/intermediate/int_event_summary.sql (one pass plus
+    window aggregates),
+  - an incremental build that adds the last --new-days days of events to a
+    table holding everything before them,
+and checks that the incremental result equals a full rebuild.
+
+Usage (from the repo root):
+    python scripts/benchmark_event_summary.py --runs 3 --new-days 1
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import duckdb
+from jinja2 import Template
+
+from benchmark_raw_formats import RAW_DIR, render_staging
+
+MODEL = Path('models/intermediate/int_event_summary.sql')
+
+# models/intermediate/int_event_summary.sql before it became a single pass
+TWO_PASS_SQL = """
+with events as (
+    select * from stg_events
+),
+user_daily_events as (
+    select user_id, cast(event_timestamp as date) as event_date, event_type, count(*) as event_count
+    from events
+    group by user_id, cast(event_timestamp as date), event_type
+),
+user_event_totals as (
+    select
+        user_id,
+        event_type,
+        count(distinct cast(event_timestamp as date)) as days_active,
+        count(*) as total_events,
+        min(event_timestamp) as first_event,
+        max(event_timestamp) as last_event
+    from events
+    group by user_id, event_type
+)
+select
+    ude.user_id, ude.event_date, ude.event_type, ude.event_count as daily_event_count,
+    uet.total_events, uet.days_active, current_timestamp as _loaded_at
+from user_daily_events ude
+left join user_event_totals uet on ude.user_id = uet.user_id and ude.event_type = uet.event_type
+"""
+
+
+def render_model(incremental: bool, events: str = 'stg_events', this: str = 'int_event_summary') -> str:
+    """The dbt model's SQL with config() dropped and ref() / this / is_incremental() resolved"""
+    return Template(MODEL.read_text()).render(
+        config=lambda **kwargs: '',
+        ref=lambda name: events,
+        this=this,
+        is_incremental=lambda: incremental
+    )
+
+
+def best_of(conn: duckdb.DuckDBPyConnection, sql: str, runs: int) -> float:
+    """Best wall time of materializing a query"""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(f"create or replace temp table bench_result as {sql}")
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--raw-dir', default=str(RAW_DIR))
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--new-days', type=int, default=1, help='Days of events the incremental build adds')
+    args = parser.parse_args()
+
+    conn = duckdb.connect()
+    # The staging view over the Parquet files, as dbt builds it: every scan reads the files
+    conn.execute(f"create view stg_events as {render_staging('stg_events', 'parquet', Path(args.raw_dir))}")
+    last_day = conn.execute("select max(cast(event_timestamp as date)) from stg_events").fetchone()[0]
+    conn.execute(f"""
+        create view old_events as
+        select * from stg_events where cast(event_timestamp as date) <= date '{last_day}' - {args.new_days}
+    """)
+    n_events, n_new = conn.execute(f"""
+        select count(*), count(*) filter (where cast(event_timestamp as date) > date '{last_day}' - {args.new_days})
+        from stg_events
+    """).fetchone()
+
+    print("=" * 70)
+    print("INT_EVENT_SUMMARY BENCHMARK")
+    print("=" * 70)
+    print(f"\n📦 {n_events:,} events, incremental step adds {n_new:,} ({args.new_days} day(s) up to {last_day})")
+
+    two_pass = best_of(conn, TWO_PASS_SQL, args.runs)
+    single_pass = best_of(conn, render_model(incremental=False), args.runs)
+
+    # Incremental: table holds everything before the new days, then one dbt-style delete+insert
+    base = f"create or replace table int_event_summary as {render_model(incremental=False, events='old_events')}"
+    increment = render_model(incremental=True)
+    incremental = None
+    for _ in range(args.runs):
+        conn.execute(base)
+        started = time.perf_counter()
+        conn.execute(f"create or replace temp table batch as {increment}")
+        conn.execute("""
+            delete from int_event_summary t using batch b
+            where t.user_id = b.user_id and t.event_date = b.event_date and t.event_type = b.event_type
+        """)
+        conn.execute("insert into int_event_summary select * from batch")
+        elapsed = time.perf_counter() - started
+        incremental = elapsed if incremental is None else min(incremental, elapsed)
+
+    columns = "user_id, event_date, event_type, daily_event_count, total_events, days_active"
+    conn.execute(f"create or replace temp table full_build as {render_model(incremental=False)}")
+    mismatched = conn.execute(f"""
+        select count(*) from (
+            (select {columns} from int_event_summary except select {columns} from full_build)
+            union all
+            (select {columns} from full_build except select {columns} from int_event_summary)
+        )
+    """).fetchone()[0]
+
+    print(f"\n{'Build':<32} {'ms':>9} {'Speedup':>8}")
+    print(f"{'two-pass view (before)':<32} {two_pass * 1000:>9,.1f} {1.0:>7.1f}x")
+    print(f"{'single pass, full build':<32} {single_pass * 1000:>9,.1f} {two_pass / single_pass:>7.1f}x")
+    print(f"{'single pass, incremental':<32} {incremental * 1000:>9,.1f} {two_pass / incremental:>7.1f}x")
+    print(f"\n{'✅' if mismatched == 0 else '❌'} Incremental result vs full rebuild: {mismatched} mismatched rows")
@@ -0,0 +1,97 @@
+"""
+HyperLogLog rollup benchmark: exact count(distinct user_id) vs merged daily sketches.
+Generates a synthetic transactions table in an in-memory DuckDB, builds
+models/intermediate/int_daily_product_sketches.sql over it, and then times,
+for monthly-by-product and overall unique users:
+  - count(distinct user_id) over the transaction rows,
+  - hll_merge() of the daily sketches (macros/hll.sql),
+and reports the estimates' relative error against the exact counts.
+
+Usage (from the repo root):
+    python scripts/benchmark_hll.py --rows 20000000 --users 2000000 --days 90
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import duckdb
+from jinja2 import Template
+
+MODEL = Path('models/intermediate/int_daily_product_sketches.sql')
+MACROS = Path('macros/hll.sql')
+
+
+def render(sql: str, precision: int) -> str:
+    """SQL with the hll macros available, config() dropped and ref() pointing at the synthetic table"""
+    return Template(MACROS.read_text() + sql).render(
+        config=lambda **kwargs: '',
+        ref=lambda name: 'transactions',
+        is_incremental=lambda: False,
+        var=lambda name, default=None: precision if name == 'hll_precision' else default
+    )
+
+
+def best_of(conn: duckdb.DuckDBPyConnection, sql: str, runs: int) -> tuple:
+    """(best wall time, rows) of a query"""
+    best, rows = None, None
+    for _ in range(runs):
+        started = time.perf_counter()
+        rows = conn.execute(sql).fetchall()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000_000)
+    parser.add_argument('--users', type=int, default=2_000_000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--precision', type=int, default=12)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    conn = duckdb.connect()
+    conn.execute(f"""
+        create table transactions as
+        select
+            'USER_' || lpad(cast(hash(i) % {args.users} as varchar), 8, '0') as user_id,
+            (['bnpl', 'food_delivery', 'ride_sharing', 'gaming'])[cast(i // {args.days} % 4 as integer) + 1] as product,
+            date '2024-01-01' + cast(i % {args.days} as integer) as transaction_date
+        from range({args.rows}) t(i)
+    """)
+
+    started = time.perf_counter()
+    conn.execute(f"create table int_daily_product_sketches as {render(MODEL.read_text(), args.precision)}")
+    build = time.perf_counter() - started
+    cells, registers = conn.execute(
+        "select count(*), sum(len(user_sketch)) from int_daily_product_sketches"
+    ).fetchone()
+
+    print("=" * 70)
+    print("HYPERLOGLOG ROLLUP BENCHMARK")
+    print("=" * 70)
+    print(f"\n📦 {args.rows:,} transactions, {args.users:,} users, {args.days} days")
+    print(f"   {cells:,} daily sketches, {registers:,} registers (built in {build:.2f}s), "
+          f"precision {args.precision}: {1.04 / (2 ** args.precision) ** 0.5:.2%} standard error")
+
+    month = "date_trunc('month', transaction_date)"
+    grains = {
+        'month x product': (
+            f"select {month} as month, product, count(distinct user_id) from transactions group by 1, 2 order by 1, 2",
+            "{{ hll_merge('int_daily_product_sketches', 'user_sketch', group_by={'month': \"" + month
+            + "\", 'product': 'product'}, estimate_as='users') }}"
+        ),
+        'overall': (
+            "select count(distinct user_id) from transactions",
+            "{{ hll_merge('int_daily_product_sketches', 'user_sketch', estimate_as='users') }}"
+        )
+    }
+
+    print(f"\n{'Unique users':<18} {'exact ms':>10} {'sketch ms':>10} {'Speedup':>8} {'max error':>10}")
+    for grain, (exact_sql, merge_sql) in grains.items():
+        exact, exact_rows = best_of(conn, exact_sql, args.runs)
+        merged, merged_rows = best_of(conn, f"select * exclude (user_sketch) from ({render(merge_sql, args.precision)}) order by all", args.runs)
+        errors = [abs(m[-1] - e[-1]) / e[-1] for e, m in zip(exact_rows, merged_rows)]
+        print(f"{grain:<18} {exact * 1000:>10,.1f} {merged * 1000:>10,.1f} {exact / merged:>7.1f}x {max(errors):>10.2%}")
@@ -0,0 +1,80 @@
+"""
+Inference throughput benchmark.
+Scores synthetic feature batches through the API's inference executor at
+several worker counts and reports rows/second, so INFERENCE_WORKERS,
+MODEL_THREADS and uvicorn --workers can be sized for the host.
+
+Usage (from the repo root):
+    python -m scripts.benchmark_inference --workers 1 2 4 --backend thread process
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+
+from api import main
+from api.inference import create_executor, pin_model_threads
+
+# Per-cluster feature means (FEATURE_COLUMNS order) written by the segmentation training run
+PROFILES_PATH = 'models_ml/segmentation/outputs/cluster_profiles.csv'
+
+
+def synthetic_features(n_rows: int, seed: int = 42) -> np.ndarray:
+    """Poisson feature rows drawn around the saved segmentation cluster profiles"""
+    profiles = np.loadtxt(PROFILES_PATH, delimiter=',', skiprows=1)[:, 1:]
+    rng = np.random.default_rng(seed)
+    return rng.poisson(profiles[rng.integers(0, len(profiles), n_rows)]).astype(np.float64)
+
+
+def run(backend: str, n_workers: int, batches: list) -> float:
+    """Rows per second scoring every batch through an executor of n_workers"""
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    if backend == 'thread':
+        pin_model_threads({name: loaded.model for name, loaded in main.REGISTRY.loaded().items()}, n_threads)
+
+    executor = create_executor(backend, n_workers, n_threads)
+    try:
+        # Warm-up: start every worker (and load models in process mode)
+        list(executor.map(main.score_all, batches[:n_workers]))
+
+        started = time.perf_counter()
+        list(executor.map(main.score_all, batches))
+        elapsed = time.perf_counter() - started
+    finally:
+        executor.shutdown(wait=True)
+
+    return sum(len(X) for X in batches) / elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--backend', nargs='+', default=['thread'], choices=['thread', 'process'])
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--batches', type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    main.REGISTRY.preload()
+
+    X = synthetic_features(args.batch_size * args.batches)
+    batches = np.array_split(X, args.batches)
+
+    print("=" * 70)
+    print("INFERENCE THROUGHPUT BENCHMARK")
+    print("=" * 70)
+    print(f"   CPU cores: {os.cpu_count()}")
+    print(f"   Workload: {args.batches} batches x {args.batch_size} rows (churn + segment + forecast)")
+
+    for backend in args.backend:
+        print(f"\n⚡ {backend} pool")
+        print(f"{'Workers':>8} {'Threads/model':>14} {'Rows/sec':>12} {'Speedup':>8}")
+        baseline = None
+        for n_workers in args.workers:
+            rows_per_sec = run(backend, n_workers, batches)
+            baseline = baseline or rows_per_sec
+            n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+            print(f"{n_workers:>8} {n_threads:>14} {rows_per_sec:>12,.0f} {rows_per_sec / baseline:>7.2f}x")
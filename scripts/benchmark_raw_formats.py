@@ -0,0 +1,119 @@
+"""
+Raw storage benchmark: CSV vs partitioned Parquet.
+Builds the staging views (models/staging/stg_*.sql) over both raw formats in
+an in-memory DuckDB and times full scans, single-column scans and a
+one-month date filter, reporting wall time and bytes read from disk.
+
+Generate both layouts first (the generator keeps only one format per
+output directory, so the CSV copy goes to its own):
+    python scripts/generate_superapp_data.py --format csv --output-dir data/raw_csv
+    python scripts/generate_superapp_data.py --format parquet
+
+Usage (from the repo root):
+    python scripts/benchmark_raw_formats.py --runs 3
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+import duckdb
+
+STAGING_DIR = Path('models/staging')
+RAW_DIR = Path('data/raw')
+CSV_DIR = Path('data/raw_csv')
+
+# Mirrors macros/raw_source.sql for each value of the raw_format var
+RAW_READERS = {
+    'csv': "read_csv_auto('{raw}/{table}.csv', header=true)",
+    'parquet': "read_parquet('{raw}/{table}/**/*.parquet', hive_partitioning=true)"
+}
+
+# (label, query) per staging model; {view} is the format-specific view name
+QUERIES = {
+    'stg_events': [
+        ('all columns', "select count(*) from {view} where event_id is not null and user_id is not null "
+                        "and event_type is not null and event_timestamp is not null"),
+        ('user_id only', "select count(distinct user_id) from {view}"),
+        ('one month', "select count(*) from {view} where event_timestamp >= timestamp '2024-12-01'"),
+    ],
+    'stg_transactions': [
+        ('all columns', "select count(*) from {view} where transaction_id is not null and user_id is not null "
+                        "and transaction_date is not null and amount is not null and currency is not null "
+                        "and status is not null and payment_method is not null and product is not null"),
+        ('amount only', "select sum(amount) from {view}"),
+        ('one month', "select sum(amount) from {view} where transaction_date >= date '2024-12-01'"),
+    ],
+    'stg_users': [
+        ('all columns', "select count(*) from {view} where user_id is not null and user_name is not null "
+                        "and age is not null and country is not null and gender is not null"),
+        ('country only', "select count(distinct country) from {view}"),
+    ],
+}
+
+
+def render_staging(model: str, file_format: str, raw_dir: Path) -> str:
+    """Staging model SQL with its dbt config block removed and raw_source() expanded"""
+    sql = (STAGING_DIR / f'{model}.sql').read_text()
+    sql = re.sub(r"\{\{\s*config\(.*?\)\s*\}\}", '', sql, flags=re.S)
+    return re.sub(
+        r"\{\{\s*raw_source\('(\w+)'\)\s*\}\}",
+        lambda m: RAW_READERS[file_format].format(raw=raw_dir, table=m.group(1)),
+        sql
+    )
+
+
+def bytes_read() -> int:
+    """Bytes this process has read through read() / pread() so far (Linux /proc)"""
+    with open('/proc/self/io') as f:
+        return int(next(line for line in f if line.startswith('rchar:')).split()[1])
+
+
+def storage_bytes(table: str, file_format: str, raw_dir: Path) -> int:
+    """On-disk size of one raw table in one format"""
+    if file_format == 'csv':
+        return (raw_dir / f'{table}.csv').stat().st_size
+    return sum(path.stat().st_size for path in (raw_dir / table).rglob('*.parquet'))
+
+
+def run(conn: duckdb.DuckDBPyConnection, query: str, runs: int):
+    """Best wall time and bytes read of that run"""
+    best = None
+    for _ in range(runs):
+        read_before = bytes_read()
+        started = time.perf_counter()
+        conn.execute(query).fetchall()
+        elapsed = time.perf_counter() - started
+        result = (elapsed, bytes_read() - read_before)
+        best = result if best is None or result[0] < best[0] else best
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--raw-dir', default=str(RAW_DIR), help='Parquet output of the generator')
+    parser.add_argument('--csv-dir', default=str(CSV_DIR), help='--format csv output of the generator')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    raw_dirs = {'csv': Path(args.csv_dir), 'parquet': Path(args.raw_dir)}
+
+    conn = duckdb.connect()
+    for model in QUERIES:
+        for file_format in RAW_READERS:
+            conn.execute(f"create view {model}_{file_format} as {render_staging(model, file_format, raw_dirs[file_format])}")
+
+    print("=" * 70)
+    print("RAW STORAGE BENCHMARK: CSV vs PARQUET")
+    print("=" * 70)
+
+    for model, queries in QUERIES.items():
+        table = model.removeprefix('stg_')
+        sizes = {fmt: storage_bytes(table, fmt, raw_dirs[fmt]) for fmt in RAW_READERS}
+        print(f"\n📦 {model}  (csv {sizes['csv'] / 1e6:,.1f} MB, parquet {sizes['parquet'] / 1e6:,.1f} MB on disk)")
+        print(f"{'Query':<14} {'CSV ms':>9} {'CSV MB read':>12} {'Parquet ms':>11} {'Parquet MB read':>16} {'Speedup':>8}")
+        for label, query in queries:
+            csv_s, csv_bytes = run(conn, query.format(view=f'{model}_csv'), args.runs)
+            pq_s, pq_bytes = run(conn, query.format(view=f'{model}_parquet'), args.runs)
+            print(f"{label:<14} {csv_s * 1000:>9,.1f} {csv_bytes / 1e6:>12,.1f} "
+                  f"{pq_s * 1000:>11,.1f} {pq_bytes / 1e6:>16,.1f} {csv_s / pq_s:>7.1f}x")
@@ -1,143 +1,275 @@
+"""
+SuperApp Analytics Dashboard
+Renders docs/dashboard.html from main_marts.fct_dashboard_rollup (plus the
+registered-user count from main_marts.dim_users). Each panel's
+data is cached as compact JSON in docs/dashboard_data.json next to a
+fingerprint (row count, max _updated_at) of the tables it was computed from.
+Panels whose tables are unchanged are not re-queried, and the HTML is only
+rewritten when some panel's data changed. DuckDB is opened read-only, so a
+concurrent dbt build is not blocked; if dbt holds the write lock, the cached
+panel data is used.
+
+Usage (from the repo root):
+    python scripts/create_dashboard.py
+    python scripts/create_dashboard.py --force
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List
+
 import duckdb
+import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-print("📊 Generating SuperApp Analytics Dashboard...")
-
-conn = duckdb.connect('dev.duckdb')
-
-# Get data
-gmv_trend = conn.execute("""
-    SELECT 
-        DATE_TRUNC('month', transaction_date) as month,
-        product,
-        SUM(CASE WHEN status = 'Completed' THEN amount ELSE 0 END) as gmv
-    FROM main_marts.fct_transactions
-    GROUP BY 1, 2
-    ORDER BY 1, 2
-""").fetchdf()
-
-activation = conn.execute("""
-    SELECT 
-        products_used,
-        COUNT(*) as user_count
-    FROM main_marts.dim_users
-    GROUP BY 1
-    ORDER BY 1
-""").fetchdf()
-
-activation['label'] = activation['products_used'].astype(str) + ' Product' + activation['products_used'].apply(lambda x: 's' if x != 1 else '')
-
-geo_performance = conn.execute("""
-    SELECT 
-        country,
-        SUM(CASE WHEN status = 'Completed' THEN amount ELSE 0 END) as gmv
-    FROM main_marts.fct_transactions
-    GROUP BY 1
-    ORDER BY gmv DESC
-    LIMIT 5
-""").fetchdf()
-
-metrics = conn.execute("""
-    SELECT 
-        COUNT(DISTINCT user_id) as users,
-        COUNT(*) as transactions,
-        SUM(CASE WHEN status = 'Completed' THEN amount ELSE 0 END) as gmv
-    FROM main_marts.fct_transactions
-""").fetchdf()
-
-# Create dashboard with proper spacing
-dashboard = make_subplots(
-    rows=3, cols=2,
-    specs=[
-        [{"type": "indicator"}, {"type": "indicator"}],
-        [{"type": "scatter"}, {"type": "funnel"}],
-        [{"type": "bar", "colspan": 2}, None]
-    ],
-    row_heights=[0.20, 0.45, 0.35],
-    vertical_spacing=0.12,
-    horizontal_spacing=0.15,
-    subplot_titles=('', '', 'GMV Trend by Product', 'Product Adoption Funnel', 'Top 5 Countries by GMV', '')
-)
-
-# Row 1: Two separate indicators (no overlap)
-dashboard.add_trace(go.Indicator(
-    mode="number",
-    value=metrics['gmv'][0],
-    number={'prefix': "$", 'valueformat': ",.0f", 'font': {'size': 48}},
-    title={'text': "Total GMV", 'font': {'size': 18}}
-), row=1, col=1)
-
-dashboard.add_trace(go.Indicator(
-    mode="number+delta",
-    value=metrics['users'][0],
-    number={'valueformat': ",", 'font': {'size': 40}},
-    title={'text': f"{metrics['transactions'][0]:,} Transactions", 'font': {'size': 14}},
-    delta={'reference': 45000, 'relative': False}
-), row=1, col=2)
-
-# Row 2: GMV Trend
-colors = {'bnpl': '#1f77b4', 'food_delivery': '#ff7f0e', 'ride_sharing': '#2ca02c', 'gaming': '#d62728'}
-for product in gmv_trend['product'].unique():
-    df = gmv_trend[gmv_trend['product'] == product]
+DB_PATH = 'dev.duckdb'
+HTML_PATH = Path('docs/dashboard.html')
+DATA_PATH = Path('docs/dashboard_data.json')
+ROLLUP = 'main_marts.fct_dashboard_rollup'
+USERS = 'main_marts.dim_users'
+
+# Tables are read in full unless a narrower query is given here
+QUERIES = {USERS: f"SELECT COUNT(*) AS registered_users FROM {USERS}"}
+
+
+def gmv_trend(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Completed GMV per month and product"""
+    completed = tables[ROLLUP][tables[ROLLUP]['status'] == 'Completed']
+    return (
+        completed.groupby(['month', 'product'], as_index=False)['amount'].sum()
+        .rename(columns={'amount': 'gmv'})
+        .sort_values(['month', 'product'])
+    )
+
+
+def activation(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Registered users by number of products used (0 = never transacted)"""
+    cube = tables[ROLLUP]
+    # Users who adopted at least n products, then exactly n products
+    adopted = cube[cube['adoption_rank'] > 0].groupby('adoption_rank')['adopting_users'].sum().sort_index()
+    counts = (adopted - adopted.shift(-1, fill_value=0)).rename('user_count').reset_index()
+    # The cube only sees transacting users; the rest of the registered users used no product
+    registered = int(tables[USERS]['registered_users'].iloc[0])
+    never = pd.DataFrame({'adoption_rank': [0], 'user_count': [max(registered - int(adopted.get(1, 0)), 0)]})
+    return pd.concat([never, counts], ignore_index=True).rename(columns={'adoption_rank': 'products_used'})
+
+
+def geo_performance(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Top 5 countries by completed GMV"""
+    completed = tables[ROLLUP][tables[ROLLUP]['status'] == 'Completed']
+    return (
+        completed.groupby('country', as_index=False)['amount'].sum()
+        .rename(columns={'amount': 'gmv'})
+        .nlargest(5, 'gmv')
+    )
+
+
+def metrics(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Headline totals: users, transactions, completed GMV"""
+    cube = tables[ROLLUP]
+    return pd.DataFrame({
+        # Every transacting user has exactly one first adoption
+        'users': [int(cube.loc[cube['adoption_rank'] == 1, 'adopting_users'].sum())],
+        'transactions': [int(cube['transactions'].sum())],
+        'gmv': [float(cube.loc[cube['status'] == 'Completed', 'amount'].sum())]
+    })
+
+
+# Panel -> (tables it reads, how its data is computed from them)
+PANELS = {
+    'metrics': ([ROLLUP], metrics),
+    'gmv_trend': ([ROLLUP], gmv_trend),
+    'activation': ([ROLLUP, USERS], activation),
+    'geo_performance': ([ROLLUP], geo_performance)
+}
+
+
+def fingerprint(conn: duckdb.DuckDBPyConnection, table: str) -> List:
+    """[row count, max _updated_at] of a table; changes whenever dbt rebuilds it"""
+    rows, updated_at = conn.execute(f"SELECT COUNT(*), MAX(_updated_at) FROM {table}").fetchone()
+    return [rows, str(updated_at)]
+
+
+def read_cache() -> dict:
+    """Panel data and table fingerprints from the last run (empty if missing or unreadable)"""
+    try:
+        with open(DATA_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def panel_data(force: bool = False) -> dict:
+    """Every panel's data, re-querying only panels whose tables changed since the cache was written"""
+    cache = read_cache()
+    cached = cache.get('panels', {})
+    try:
+        conn = duckdb.connect(DB_PATH, read_only=True)
+    except duckdb.IOException as e:
+        # dbt is holding the write lock; fall back to the last good data
+        if not force and set(cached) == set(PANELS):
+            print(f"⚠️  {DB_PATH} is locked ({e}); using cached panel data")
+            return cache
+        raise
+
+    try:
+        tables = sorted({table for sources, _ in PANELS.values() for table in sources})
+        fingerprints = {table: fingerprint(conn, table) for table in tables}
+        stale = [
+            name for name, (sources, _) in PANELS.items()
+            if force or name not in cached
+            or any(cached[name]['tables'].get(table) != fingerprints[table] for table in sources)
+        ]
+        # Each table a stale panel needs is read once
+        frames = {
+            table: conn.execute(QUERIES.get(table, f"SELECT * FROM {table}")).fetchdf()
+            for table in sorted({table for name in stale for table in PANELS[name][0]})
+        }
+    finally:
+        conn.close()
+
+    panels = {}
+    for name, (sources, build) in PANELS.items():
+        if name not in stale:
+            panels[name] = cached[name]
+            continue
+        df = build(frames)
+        panels[name] = {
+            'tables': {table: fingerprints[table] for table in sources},
+            'columns': list(df.columns),
+            'data': json.loads(df.to_json(orient='values', date_format='iso'))
+        }
+    print(f"   Re-queried: {', '.join(stale) if stale else 'nothing (all panels cached)'}")
+    return {'panels': panels, 'html_digest': cache.get('html_digest')}
+
+
+def frame(panels: dict, name: str) -> pd.DataFrame:
+    """One panel's cached data as a DataFrame"""
+    return pd.DataFrame(panels[name]['data'], columns=panels[name]['columns'])
+
+
+def render(panels: dict) -> go.Figure:
+    """The dashboard figure from cached panel data"""
+    metrics = frame(panels, 'metrics')
+    gmv_trend = frame(panels, 'gmv_trend')
+    activation = frame(panels, 'activation')
+    geo_performance = frame(panels, 'geo_performance')
+
+    activation['label'] = activation['products_used'].astype(str) + ' Product' + activation['products_used'].apply(lambda x: 's' if x != 1 else '')
+
+    # Create dashboard with proper spacing
+    dashboard = make_subplots(
+        rows=3, cols=2,
+        specs=[
+            [{"type": "indicator"}, {"type": "indicator"}],
+            [{"type": "scatter"}, {"type": "funnel"}],
+            [{"type": "bar", "colspan": 2}, None]
+        ],
+        row_heights=[0.20, 0.45, 0.35],
+        vertical_spacing=0.12,
+        horizontal_spacing=0.15,
+        subplot_titles=('', '', 'GMV Trend by Product', 'Product Adoption Funnel', 'Top 5 Countries by GMV', '')
+    )
+
+    # Row 1: Two separate indicators (no overlap)
+    dashboard.add_trace(go.Indicator(
+        mode="number",
+        value=metrics['gmv'][0],
+        number={'prefix': "$", 'valueformat': ",.0f", 'font': {'size': 48}},
+        title={'text': "Total GMV", 'font': {'size': 18}}
+    ), row=1, col=1)
+
+    dashboard.add_trace(go.Indicator(
+        mode="number+delta",
+        value=metrics['users'][0],
+        number={'valueformat': ",", 'font': {'size': 40}},
+        title={'text': f"{metrics['transactions'][0]:,} Transactions", 'font': {'size': 14}},
+        delta={'reference': 45000, 'relative': False}
+    ), row=1, col=2)
+
+    # Row 2: GMV Trend
+    colors = {'bnpl': '#1f77b4', 'food_delivery': '#ff7f0e', 'ride_sharing': '#2ca02c', 'gaming': '#d62728'}
+    for product in gmv_trend['product'].unique():
+        df = gmv_trend[gmv_trend['product'] == product]
+        dashboard.add_trace(
+            go.Scatter(
+                x=df['month'], 
+                y=df['gmv'], 
+                name=product.replace('_', ' ').title(),
+                mode='lines+markers',
+                line=dict(width=2, color=colors.get(product))
+            ),
+            row=2, col=1
+        )
+
+    # Row 2: Funnel
     dashboard.add_trace(
-        go.Scatter(
-            x=df['month'], 
-            y=df['gmv'], 
-            name=product.replace('_', ' ').title(),
-            mode='lines+markers',
-            line=dict(width=2, color=colors.get(product))
+        go.Funnel(
+            y=activation['label'],
+            x=activation['user_count'],
+            textinfo="value+percent initial",
+            marker=dict(color=["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A"])
         ),
-        row=2, col=1
+        row=2, col=2
     )
 
-# Row 2: Funnel
-dashboard.add_trace(
-    go.Funnel(
-        y=activation['label'],
-        x=activation['user_count'],
-        textinfo="value+percent initial",
-        marker=dict(color=["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A"])
-    ),
-    row=2, col=2
-)
-
-# Row 3: Geographic bars
-dashboard.add_trace(
-    go.Bar(
-        x=geo_performance['country'], 
-        y=geo_performance['gmv'],
-        text=geo_performance['gmv'].apply(lambda x: f'${x/1e6:.1f}M'),
-        textposition='outside',
-        marker_color='#1f77b4',
-        showlegend=False
-    ),
-    row=3, col=1
-)
-
-# Update layout
-dashboard.update_layout(
-    title={
-        'text': "SuperApp Lifecycle Analytics Dashboard",
-        'font': {'size': 24},
-        'x': 0.5,
-        'xanchor': 'center',
-        'y': 0.98
-    },
-    height=1200,
-    showlegend=True,
-    legend=dict(x=0.02, y=0.6, font=dict(size=11)),
-    font=dict(family="Arial", size=11),
-    plot_bgcolor='#f8f9fa',
-    paper_bgcolor='white'
-)
-
-dashboard.update_xaxes(title_text="Month", row=2, col=1)
-dashboard.update_yaxes(title_text="GMV ($)", row=2, col=1)
-dashboard.update_xaxes(title_text="Country", row=3, col=1)
-dashboard.update_yaxes(title_text="GMV ($)", row=3, col=1)
-
-dashboard.write_html('docs/dashboard.html')
-print("✅ Dashboard saved!")
-
-conn.close()
+    # Row 3: Geographic bars
+    dashboard.add_trace(
+        go.Bar(
+            x=geo_performance['country'], 
+            y=geo_performance['gmv'],
+            text=geo_performance['gmv'].apply(lambda x: f'${x/1e6:.1f}M'),
+            textposition='outside',
+            marker_color='#1f77b4',
+            showlegend=False
+        ),
+        row=3, col=1
+    )
+
+    # Update layout
+    dashboard.update_layout(
+        title={
+            'text': "SuperApp Lifecycle Analytics Dashboard",
+            'font': {'size': 24},
+            'x': 0.5,
+            'xanchor': 'center',
+            'y': 0.98
+        },
+        height=1200,
+        showlegend=True,
+        legend=dict(x=0.02, y=0.6, font=dict(size=11)),
+        font=dict(family="Arial", size=11),
+        plot_bgcolor='#f8f9fa',
+        paper_bgcolor='white'
+    )
+
+    dashboard.update_xaxes(title_text="Month", row=2, col=1)
+    dashboard.update_yaxes(title_text="GMV ($)", row=2, col=1)
+    dashboard.update_xaxes(title_text="Country", row=3, col=1)
+    dashboard.update_yaxes(title_text="GMV ($)", row=3, col=1)
+
+    return dashboard
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--force', action='store_true', help='Re-query every panel and rewrite the HTML')
+    args = parser.parse_args()
+
+    print("📊 Generating SuperApp Analytics Dashboard...")
+    data = panel_data(force=args.force)
+
+    digest = hashlib.sha256(json.dumps(data['panels'], sort_keys=True).encode()).hexdigest()
+    if not args.force and HTML_PATH.exists() and data.get('html_digest') == digest:
+        print(f"✅ {HTML_PATH} is up to date")
+    else:
+        render(data['panels']).write_html(HTML_PATH)
+        print("✅ Dashboard saved!")
+
+    data['html_digest'] = digest
+    DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(DATA_PATH, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
@@ -1,13 +1,48 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import random
+"""
+SuperApp synthetic data generator.
+Draws users, transactions and events as whole NumPy arrays (no per-row
+Python loops) and writes them with DuckDB, so production-scale volumes
+(10M+ transactions) generate in seconds. The same --seed (and --chunk-size)
+always produces byte-identical files.
+
+Output is typed, zstd-compressed Parquet partitioned by month
+(transactions/month=YYYY-MM/part-NNNNN.parquet, likewise events, plus
+users/), which the staging models read with partition pruning and column
+projection. --format csv writes the flat users/transactions/events.csv
+files instead, or the same partitioned layout as CSV with --chunk-size
+(either is read by dbt with --vars '{raw_format: csv}').
+
+--chunk-size switches to streaming mode: transactions and their events are
+generated and written one fixed-size chunk at a time into monthly
+partitions, so peak memory stays flat however large the run. Completed GMV
+is still calibrated to the target, either exactly (two passes) or from the
+analytic expected amount (one pass).
+
+Files are written into a staging directory under --output-dir and swapped
+in once the run completes, replacing the previous run's users/,
+transactions/ and events/ (so no stale parts or month= partitions are left
+for the staging models' globs to pick up). The other format's output is
+removed as well (the flat CSVs after a Parquet run and vice versa), so
+--output-dir only ever holds the current run's data.
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+Usage (from the repo root):
+    python scripts/generate_superapp_data.py
+    python scripts/generate_superapp_data.py --users 2000000 --transactions 10000000 --seed 7
+    python scripts/generate_superapp_data.py --transactions 100000000 --chunk-size 1000000
+"""
 
-print("🚀 Generating SuperApp synthetic data...")
+import argparse
+import math
+import os
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
 
 # Configuration to match README metrics
 TARGET_GMV = 68_200_000  # $68.2M
@@ -23,116 +58,358 @@ PRODUCTS = {
 }
 
 COUNTRIES = ['UAE', 'KSA', 'EGY', 'KWT', 'PAK', 'IND', 'NGA', 'USA', 'UK']
-STATUSES = ['completed', 'pending', 'failed', 'cancelled']
+COUNTRY_WEIGHTS = [0.25, 0.20, 0.15, 0.10, 0.10, 0.08, 0.07, 0.03, 0.02]
+GENDERS = ['Male', 'Female', 'Other']
+GENDER_WEIGHTS = [0.48, 0.50, 0.02]
+# Status distribution: 85% completed, 10% pending, 3% failed, 2% cancelled
+STATUSES = ['Completed', 'Pending', 'Failed', 'Cancelled']
+STATUS_WEIGHTS = [0.85, 0.10, 0.03, 0.02]
+PAYMENT_METHODS = ['Credit Card', 'PayPal', 'Bank Transfer', 'Digital Wallet']
+PAYMENT_WEIGHTS = [0.45, 0.25, 0.20, 0.10]
 EVENT_TYPES = ['login', 'view', 'click', 'purchase', 'logout', 'signup', 'search']
+# Raw tables, each written as <table>.csv (flat CSV) or <table>/ (parts / month= partitions)
+RAW_TABLES = ['users', 'transactions', 'events']
 
-# Generate Users
-print("📊 Generating users...")
-users = pd.DataFrame({
-    'user_id': range(1, NUM_USERS + 1),
-    'name': [f'User_{i}' for i in range(1, NUM_USERS + 1)],
-    'age': np.random.randint(18, 65, NUM_USERS),
-    'country': np.random.choice(COUNTRIES, NUM_USERS, p=[0.25, 0.20, 0.15, 0.10, 0.10, 0.08, 0.07, 0.03, 0.02]),
-    'gender': np.random.choice(['Male', 'Female', 'Other'], NUM_USERS, p=[0.48, 0.50, 0.02])
-})
-
-# Generate Transactions
-print("💳 Generating transactions...")
-transactions = []
-transaction_id = 1
-
-# Calculate transactions per product to match target
-product_list = list(PRODUCTS.keys())
-product_weights = [PRODUCTS[p]['weight'] for p in product_list]
-
-for _ in range(TARGET_TRANSACTIONS):
-    product = np.random.choice(product_list, p=product_weights)
-    
-    # Generate amount with some outliers for realism
-    if random.random() < 0.05:  # 5% high-value transactions
-        amount = np.random.gamma(4, PRODUCTS[product]['avg_amount'] * 2)
-    else:
-        amount = max(1, np.random.normal(
-            PRODUCTS[product]['avg_amount'],
-            PRODUCTS[product]['std']
-        ))
-    
-    # Status distribution: 85% completed, 10% pending, 3% failed, 2% cancelled
-    status = np.random.choice(
-        STATUSES,
-        p=[0.85, 0.10, 0.03, 0.02]
-    )
-    
+START_DATE = np.datetime64('2023-01-01')
+DATE_RANGE_DAYS = 730  # 2 years of data
+
+# COPY options per output format; Parquet keeps native types (ids, DATE, TIMESTAMP, DOUBLE)
+COPY_OPTIONS = {
+    'csv': "(HEADER, DELIMITER ',')",
+    'parquet': "(FORMAT parquet, COMPRESSION zstd)"
+}
+
+# Output formatting shared by both modes ({table} is the registered batch)
+USERS_SQL = """
+    select user_id, 'User_' || user_id as name, age, country, gender
+    from {table}
+"""
+TRANSACTIONS_SQL = """
+    select Transaction_ID, Customer_ID, Date::date as Date, Amount, 'USD' as Currency,
+           Status, Payment_Method, Product
+    from {table}
+"""
+EVENTS_SQL = """
+    select printf('EVT%06d', event_id) as event_id, printf('USER%04d', user_id) as user_id,
+           event_type, event_timestamp
+    from {table}
+"""
+
+
+def categorical(codes: np.ndarray, labels: list) -> pd.Categorical:
+    """Integer codes as a zero-copy categorical (read by DuckDB as an ENUM)"""
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+def generate_users(rng: np.random.Generator, n_users: int) -> pd.DataFrame:
+    """One row per user: id, age, country and gender"""
+    return pd.DataFrame({
+        'user_id': np.arange(1, n_users + 1),
+        'age': rng.integers(18, 65, n_users),
+        'country': categorical(rng.choice(len(COUNTRIES), n_users, p=COUNTRY_WEIGHTS), COUNTRIES),
+        'gender': categorical(rng.choice(len(GENDERS), n_users, p=GENDER_WEIGHTS), GENDERS)
+    })
+
+
+def draw_amounts(rng: np.random.Generator, n_transactions: int):
+    """Product, pre-calibration amount and status codes (the first draws of every transaction batch)"""
+    names = list(PRODUCTS)
+    weights = np.array([PRODUCTS[p]['weight'] for p in names])
+    avg_amount = np.array([PRODUCTS[p]['avg_amount'] for p in names], dtype=np.float64)
+    std = np.array([PRODUCTS[p]['std'] for p in names], dtype=np.float64)
+
+    product = rng.choice(len(names), n_transactions, p=weights)
+
+    # 5% high-value transactions for realism, the rest normal around the product average
+    high_value = rng.random(n_transactions) < 0.05
+    amount = np.maximum(1, rng.normal(avg_amount[product], std[product]))
+    amount[high_value] = rng.gamma(4, avg_amount[product[high_value]] * 2)
+
+    status = rng.choice(len(STATUSES), n_transactions, p=STATUS_WEIGHTS)
     # Only completed transactions contribute to GMV
-    if status != 'completed':
-        amount = amount * 0.3  # Reduce failed/pending amounts
-    
-    transactions.append({
-        'Transaction_ID': transaction_id,
-        'Customer_ID': np.random.randint(1, NUM_USERS + 1),
-        'Date': datetime(2023, 1, 1) + timedelta(
-            days=random.randint(0, 730)  # 2 years of data
-        ),
-        'Amount': round(amount, 2),
-        'Currency': 'USD',
-        'Status': status.capitalize(),
-        'Payment_Method': np.random.choice(
-            ['Credit Card', 'PayPal', 'Bank Transfer', 'Digital Wallet'],
-            p=[0.45, 0.25, 0.20, 0.10]
-        ),
-        'Product': product
+    amount[status != 0] *= 0.3
+    return product, np.round(amount, 2), status
+
+
+def expected_completed_amount() -> float:
+    """Analytic mean of the pre-calibration completed amount per transaction"""
+    total = 0.0
+    for spec in PRODUCTS.values():
+        mu, sigma = spec['avg_amount'], spec['std']
+        # E[max(1, X)] for X ~ N(mu, sigma)
+        a = (1 - mu) / sigma
+        cdf = 0.5 * (1 + math.erf(a / math.sqrt(2)))
+        pdf = math.exp(-a * a / 2) / math.sqrt(2 * math.pi)
+        clipped_normal = cdf + mu * (1 - cdf) + sigma * pdf
+        # Gamma(4, 2 * mu) has mean 8 * mu
+        total += spec['weight'] * (0.95 * clipped_normal + 0.05 * 8 * mu)
+    return STATUS_WEIGHTS[0] * total
+
+
+def generate_transactions(
+    rng: np.random.Generator,
+    n_transactions: int,
+    n_users: int,
+    target_gmv: float = None,
+    scaling_factor: float = None,
+    first_id: int = 1
+) -> pd.DataFrame:
+    """Transactions with per-product amount distributions.
+
+    Amounts are scaled so this batch's completed GMV hits target_gmv, or by a
+    scaling_factor computed up front across all chunks (streaming mode).
+    """
+    product, amount, status = draw_amounts(rng, n_transactions)
+
+    # Adjust to hit exact GMV target
+    if scaling_factor is None:
+        scaling_factor = target_gmv / amount[status == 0].sum()
+    amount = np.round(amount * scaling_factor, 2)
+
+    return pd.DataFrame({
+        'Transaction_ID': np.arange(first_id, first_id + n_transactions),
+        'Customer_ID': rng.integers(1, n_users + 1, n_transactions),
+        'Date': START_DATE + rng.integers(0, DATE_RANGE_DAYS + 1, n_transactions).astype('timedelta64[D]'),
+        'Amount': amount,
+        'Status': categorical(status, STATUSES),
+        'Payment_Method': categorical(rng.choice(len(PAYMENT_METHODS), n_transactions, p=PAYMENT_WEIGHTS), PAYMENT_METHODS),
+        'Product': categorical(product, list(PRODUCTS))
     })
-    transaction_id += 1
-
-transactions_df = pd.DataFrame(transactions)
-
-# Adjust to hit exact GMV target
-current_gmv = transactions_df[transactions_df['Status'] == 'Completed']['Amount'].sum()
-scaling_factor = TARGET_GMV / current_gmv
-transactions_df['Amount'] = transactions_df['Amount'] * scaling_factor
-transactions_df['Amount'] = transactions_df['Amount'].round(2)
-
-# Generate Events (3-5 events per transaction)
-print("📱 Generating user events...")
-events = []
-event_id = 1
-
-for _, txn in transactions_df.iterrows():
-    num_events = random.randint(3, 5)
-    txn_date = txn['Date']
-    
-    for i in range(num_events):
-        event_time = txn_date - timedelta(
-            hours=random.randint(0, 24),
-            minutes=random.randint(0, 59)
+
+
+def generate_events(rng: np.random.Generator, transactions: pd.DataFrame, first_id: int = 1) -> pd.DataFrame:
+    """3-5 events per transaction, each up to 24h59m before it"""
+    n_transactions = len(transactions)
+    fan_out = rng.integers(3, 6, n_transactions)
+    source = np.repeat(np.arange(n_transactions), fan_out)
+    n_events = len(source)
+
+    offset = rng.integers(0, 25, n_events) * 60 + rng.integers(0, 60, n_events)
+    timestamp = (
+        transactions['Date'].to_numpy().astype('datetime64[m]')[source]
+        - offset.astype('timedelta64[m]')
+    )
+
+    return pd.DataFrame({
+        'event_id': np.arange(first_id, first_id + n_events),
+        'user_id': transactions['Customer_ID'].to_numpy()[source],
+        'event_type': categorical(rng.choice(len(EVENT_TYPES), n_events), EVENT_TYPES),
+        'event_timestamp': timestamp.astype('datetime64[s]')
+    })
+
+
+def write_file(conn: duckdb.DuckDBPyConnection, sql: str, df: pd.DataFrame, path: Path, file_format: str):
+    """Format a frame with one of the *_SQL queries and write it as CSV or Parquet (row order preserved)"""
+    conn.register('batch', df)
+    try:
+        conn.execute(f"COPY ({sql.format(table='batch')}) TO '{path}' {COPY_OPTIONS[file_format]}")
+    finally:
+        conn.unregister('batch')
+
+
+def write_monthly(
+    conn: duckdb.DuckDBPyConnection,
+    sql: str,
+    df: pd.DataFrame,
+    months: np.ndarray,
+    directory: Path,
+    part: int,
+    file_format: str
+):
+    """Append one chunk to month=YYYY-MM/part-NNNNN.* partitions, keeping row order within each"""
+    order = np.argsort(months, kind='stable')
+    months = months[order]
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(months)]):
+        partition = directory / f"month={np.datetime_as_string(months[start], unit='M')}"
+        partition.mkdir(parents=True, exist_ok=True)
+        write_file(conn, sql, df.iloc[order[start:end]], partition / f'part-{part:05d}.{file_format}', file_format)
+
+
+def write_partitioned(
+    conn: duckdb.DuckDBPyConnection,
+    transactions: pd.DataFrame,
+    events: pd.DataFrame,
+    output_dir: Path,
+    part: int,
+    file_format: str
+):
+    """Write one batch of transactions and events into their monthly partitions"""
+    write_monthly(conn, TRANSACTIONS_SQL, transactions,
+                  transactions['Date'].to_numpy().astype('datetime64[M]'),
+                  output_dir / 'transactions', part, file_format)
+    write_monthly(conn, EVENTS_SQL, events,
+                  events['event_timestamp'].to_numpy().astype('datetime64[M]'),
+                  output_dir / 'events', part, file_format)
+
+
+def write_users(conn: duckdb.DuckDBPyConnection, users: pd.DataFrame, output_dir: Path, part: int, file_format: str):
+    """Write one batch of users to users/part-NNNNN.*"""
+    (output_dir / 'users').mkdir(parents=True, exist_ok=True)
+    write_file(conn, USERS_SQL, users, output_dir / 'users' / f'part-{part:05d}.{file_format}', file_format)
+
+
+def publish(staging: Path, output_dir: Path):
+    """Move every file or directory written to staging into output_dir, replacing what was there,
+    and drop the raw tables' outputs in the other format"""
+    written = {path.name for path in staging.iterdir()}
+    for table in RAW_TABLES:
+        for stale in (output_dir / table, output_dir / f'{table}.csv'):
+            if stale.name in written:
+                continue
+            if stale.is_dir():
+                shutil.rmtree(stale)
+            elif stale.exists():
+                stale.unlink()
+
+    for path in sorted(staging.iterdir()):
+        target = output_dir / path.name
+        if target.is_dir():
+            shutil.rmtree(target)
+        # Same filesystem: the new file or directory appears in one rename
+        os.replace(path, target)
+
+
+def chunk_rng(seed: int, stream: int, chunk: int) -> np.random.Generator:
+    """Independent, reproducible generator per (stream, chunk) so chunks never depend on each other"""
+    return np.random.default_rng([seed, stream, chunk])
+
+
+def chunks(total: int, chunk_size: int):
+    """(chunk index, first row offset, rows) for each fixed-size chunk"""
+    for index, start in enumerate(range(0, total, chunk_size)):
+        yield index, start, min(chunk_size, total - start)
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process (ru_maxrss is KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generate_in_memory(args, target_gmv: float, output_dir: Path, conn: duckdb.DuckDBPyConnection) -> dict:
+    """Generate everything at once; CSV goes to three flat files, Parquet to monthly partitions"""
+    rng = np.random.default_rng(args.seed)
+
+    print("📊 Generating users...")
+    users = generate_users(rng, args.users)
+
+    print("💳 Generating transactions...")
+    transactions = generate_transactions(rng, args.transactions, args.users, target_gmv=target_gmv)
+
+    print("📱 Generating user events...")
+    events = generate_events(rng, transactions)
+
+    # DuckDB formats ids and writes in parallel while keeping row order
+    print("💾 Saving files...")
+    if args.format == 'csv':
+        write_file(conn, USERS_SQL, users, output_dir / 'users.csv', 'csv')
+        write_file(conn, TRANSACTIONS_SQL, transactions, output_dir / 'transactions.csv', 'csv')
+        write_file(conn, EVENTS_SQL, events, output_dir / 'events.csv', 'csv')
+    else:
+        write_users(conn, users, output_dir, 0, args.format)
+        write_partitioned(conn, transactions, events, output_dir, 0, args.format)
+
+    completed = transactions['Status'] == 'Completed'
+    return {
+        'users': len(users),
+        'transactions': len(transactions),
+        'events': len(events),
+        'gmv': transactions.loc[completed, 'Amount'].sum(),
+        'amount': transactions['Amount'].sum()
+    }
+
+
+def generate_streaming(args, target_gmv: float, output_dir: Path, conn: duckdb.DuckDBPyConnection) -> dict:
+    """Generate and write fixed-size chunks into monthly partitions; memory is bounded by --chunk-size"""
+    if args.calibration == 'two-pass':
+        # Pass 1: replay only the amount draws of every chunk to get the exact completed total
+        print("🧮 Calibrating GMV (pass 1 of 2)...")
+        completed_total = 0.0
+        for index, _, size in chunks(args.transactions, args.chunk_size):
+            _, amount, status = draw_amounts(chunk_rng(args.seed, 1, index), size)
+            completed_total += amount[status == 0].sum()
+    else:
+        completed_total = args.transactions * expected_completed_amount()
+    scaling_factor = target_gmv / completed_total
+
+    print("📊 Generating users...")
+    for index, start, size in chunks(args.users, args.chunk_size):
+        users = generate_users(chunk_rng(args.seed, 0, index), size)
+        users['user_id'] += start
+        write_users(conn, users, output_dir, index, args.format)
+
+    print(f"💳 Generating transactions and events in chunks of {args.chunk_size:,}...")
+    summary = {'users': args.users, 'transactions': 0, 'events': 0, 'gmv': 0.0, 'amount': 0.0}
+    for index, start, size in chunks(args.transactions, args.chunk_size):
+        rng = chunk_rng(args.seed, 1, index)
+        transactions = generate_transactions(
+            rng, size, args.users, scaling_factor=scaling_factor, first_id=start + 1
         )
-        
-        events.append({
-            'event_id': f'EVT{event_id:06d}',
-            'user_id': f'USER{txn["Customer_ID"]:04d}',
-            'event_type': np.random.choice(EVENT_TYPES),
-            'event_timestamp': event_time
-        })
-        event_id += 1
-
-events_df = pd.DataFrame(events)
-
-# Save to CSV
-print("💾 Saving files...")
-users.to_csv('data/raw/users.csv', index=False)
-transactions_df.to_csv('data/raw/transactions.csv', index=False)
-events_df.to_csv('data/raw/events.csv', index=False)
-
-# Print summary
-print("\n✅ Data generation complete!")
-print(f"📊 Summary:")
-print(f"   Users: {len(users):,}")
-print(f"   Transactions: {len(transactions_df):,}")
-print(f"   Events: {len(events_df):,}")
-print(f"   Total GMV: ${transactions_df[transactions_df['Status'] == 'Completed']['Amount'].sum():,.2f}")
-print(f"   Average Transaction: ${transactions_df['Amount'].mean():,.2f}")
-print(f"\n📁 Files saved to data/raw/")
-print(f"   - users.csv ({len(users):,} rows)")
-print(f"   - transactions.csv ({len(transactions_df):,} rows)")
-print(f"   - events.csv ({len(events_df):,} rows)")
+        events = generate_events(rng, transactions, first_id=summary['events'] + 1)
+
+        write_partitioned(conn, transactions, events, output_dir, index, args.format)
+
+        completed = transactions['Status'] == 'Completed'
+        summary['transactions'] += len(transactions)
+        summary['events'] += len(events)
+        summary['gmv'] += transactions.loc[completed, 'Amount'].sum()
+        summary['amount'] += transactions['Amount'].sum()
+
+    return summary
+
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=NUM_USERS)
+    parser.add_argument('--transactions', type=int, default=TARGET_TRANSACTIONS)
+    parser.add_argument('--target-gmv', type=float, default=None,
+                        help='Completed GMV to calibrate to (default: $68.2M per 224,614 transactions)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output-dir', default='data/raw')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet',
+                        help='parquet: typed, zstd-compressed monthly partitions (read by the staging models); '
+                             "csv: flat <table>.csv files, or CSV monthly partitions with --chunk-size "
+                             "(dbt --vars '{raw_format: csv}')")
+    parser.add_argument('--chunk-size', type=int, default=0,
+                        help='Stream in chunks of this many transactions into monthly partitions (0 = all in memory)')
+    parser.add_argument('--calibration', choices=['two-pass', 'analytic'], default='two-pass',
+                        help='Streaming GMV calibration: exact (replays amount draws) or expected value (single pass)')
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Keep the average ticket size when scaling the transaction count
+    target_gmv = args.target_gmv or TARGET_GMV * args.transactions / TARGET_TRANSACTIONS
+    started = time.perf_counter()
+
+    print("🚀 Generating SuperApp synthetic data...")
+    conn = duckdb.connect()
+    staging = Path(tempfile.mkdtemp(prefix='.staging-', dir=output_dir))
+    try:
+        if args.chunk_size:
+            summary = generate_streaming(args, target_gmv, staging, conn)
+        else:
+            summary = generate_in_memory(args, target_gmv, staging, conn)
+        publish(staging, output_dir)
+    finally:
+        conn.close()
+        shutil.rmtree(staging, ignore_errors=True)
+
+    # Print summary
+    print("\n✅ Data generation complete!")
+    print(f"📊 Summary:")
+    print(f"   Users: {summary['users']:,}")
+    print(f"   Transactions: {summary['transactions']:,}")
+    print(f"   Events: {summary['events']:,}")
+    print(f"   Total GMV: ${summary['gmv']:,.2f}")
+    print(f"   Average Transaction: ${summary['amount'] / summary['transactions']:,.2f}")
+    print(f"   Seed: {args.seed} ({time.perf_counter() - started:.1f}s, peak memory {peak_memory_mb():,.0f} MB)")
+    print(f"\n📁 Files saved to {output_dir}/")
+    if args.chunk_size or args.format != 'csv':
+        print(f"   - users/part-*.{args.format}")
+        print(f"   - transactions/month=YYYY-MM/part-*.{args.format}")
+        print(f"   - events/month=YYYY-MM/part-*.{args.format}")
+    else:
+        print(f"   - users.csv ({summary['users']:,} rows)")
+        print(f"   - transactions.csv ({summary['transactions']:,} rows)")
+        print(f"   - events.csv ({summary['events']:,} rows)")
@@ -9,11 +9,23 @@
     )
 }}
 
+-- Only users that are new or whose checked columns differ from their current
+-- snapshot row are fed in; with hard deletes ignored (the default), users left
+-- out are simply kept as they are, so dbt's snapshot merge only sees changes
 select
-    user_id,
-    user_segment,
-    country,
-    registration_date
-from {{ ref('stg_users') }}
+    s.user_id,
+    s.user_segment,
+    s.country,
+    s.registration_date
+from {{ ref('stg_users') }} s
+{% if adapter.get_relation(this.database, this.schema, this.identifier) %}
+where not exists (
+    select 1 from {{ this }} t
+    where t.user_id = s.user_id
+      and t.dbt_valid_to is null
+      and t.user_segment is not distinct from s.user_segment
+      and t.country is not distinct from s.country
+)
+{% endif %}
 
 {% endsnapshot %}
@@ -0,0 +1,88 @@
+"""
+Micro-batcher dispatch, batch limits and error propagation.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from api.batching import MicroBatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_rows_are_scored_together_and_answered_in_order():
+    calls = []
+
+    def score(X):
+        calls.append(len(X))
+        return X.sum(axis=1)
+
+    async def main():
+        batcher = MicroBatcher('churn', score, max_batch_size=64, max_wait_ms=50)
+        batcher.start()
+        try:
+            rows = [np.array([[i, 10.0 * i]]) for i in range(20)]
+            return await asyncio.gather(*(batcher.submit(row) for row in rows)), batcher
+        finally:
+            await batcher.stop()
+
+    results, batcher = run(main())
+    assert results == [11.0 * i for i in range(20)]
+    assert calls == [20]
+    assert batcher.metrics()['batches'] == 1
+    assert batcher.max_seen_batch_size == 20
+
+
+def test_batches_never_exceed_max_batch_size():
+    calls = []
+
+    def score(X):
+        calls.append(len(X))
+        return X[:, 0]
+
+    async def main():
+        batcher = MicroBatcher('segment', score, max_batch_size=8, max_wait_ms=50)
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(np.array([[i]])) for i in range(30)))
+        finally:
+            await batcher.stop()
+
+    assert run(main()) == list(range(30))
+    assert max(calls) == 8
+    assert sum(calls) == 30
+
+
+def test_score_error_reaches_every_caller_and_batcher_keeps_running():
+    def score(X):
+        if (X < 0).any():
+            raise ValueError('negative feature')
+        return X[:, 0]
+
+    async def main():
+        batcher = MicroBatcher('forecast', score, max_wait_ms=20)
+        batcher.start()
+        try:
+            failed = await asyncio.gather(
+                batcher.submit(np.array([[1.0]])),
+                batcher.submit(np.array([[-1.0]])),
+                return_exceptions=True
+            )
+            recovered = await batcher.submit(np.array([[2.0]]))
+            return failed, recovered
+        finally:
+            await batcher.stop()
+
+    failed, recovered = run(main())
+    assert all(isinstance(e, ValueError) and str(e) == 'negative feature' for e in failed)
+    assert recovered == 2.0
+
+
+def test_submit_requires_a_started_batcher():
+    batcher = MicroBatcher('churn', lambda X: X)
+    with pytest.raises(RuntimeError, match='not running'):
+        run(batcher.submit(np.zeros((1, 2))))
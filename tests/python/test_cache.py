@@ -0,0 +1,77 @@
+"""
+Prediction cache keys, TTL expiry, LRU eviction and invalidation.
+"""
+
+import numpy as np
+import pytest
+
+from api import cache as cache_module
+from api.cache import PredictionCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_keys_depend_on_model_version_and_exact_row():
+    X = np.array([[1.0, 2.0], [1.0, 2.0], [1.0, np.nextafter(2.0, 3.0)]])
+    keys = PredictionCache.keys('churn', 'v1', X)
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2]
+    assert PredictionCache.keys('churn', 'v2', X[:1])[0] != keys[0]
+    assert PredictionCache.keys('segment', 'v1', X[:1])[0] != keys[0]
+    # Integer and float rows with the same values share a key
+    assert PredictionCache.keys('churn', 'v1', np.array([[1, 2]]))[0] == keys[0]
+
+
+def test_get_many_reports_hits_and_missing_positions(clock):
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    keys = PredictionCache.keys('churn', 'v1', np.arange(6.0).reshape(3, 2))
+    cache.put_many([keys[0], keys[2]], [0.1, 0.3])
+
+    values, missing = cache.get_many(keys)
+    assert values == [0.1, None, 0.3]
+    assert missing == [1]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    keys = PredictionCache.keys('churn', 'v1', np.ones((1, 3)))
+    cache.put_many(keys, [0.5])
+
+    clock[0] += 59.9
+    assert cache.get_many(keys) == ([0.5], [])
+    # A hit does not extend the entry's lifetime
+    clock[0] += 0.1
+    assert cache.get_many(keys) == ([None], [0])
+    assert cache.expirations == 1
+    assert cache.metrics()['size'] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = PredictionCache(max_size=2, ttl_seconds=60)
+    a, b, c = PredictionCache.keys('churn', 'v1', np.arange(3.0).reshape(3, 1))
+    cache.put_many([a, b], [1, 2])
+    cache.get_many([a])
+    cache.put_many([c], [3])
+
+    assert cache.get_many([a, b, c]) == ([1, None, 3], [1])
+    assert cache.evictions == 1
+
+
+def test_invalidate_drops_only_that_model(clock):
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    X = np.zeros((1, 2))
+    churn = PredictionCache.keys('churn', 'v1', X)
+    segment = PredictionCache.keys('segment', 'v1', X)
+    cache.put_many(churn + segment, [0.2, 3])
+
+    cache.invalidate('churn')
+    assert cache.get_many(churn) == ([None], [0])
+    assert cache.get_many(segment) == ([3], [])
+    assert cache.invalidations == 1
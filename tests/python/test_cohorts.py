@@ -0,0 +1,126 @@
+"""
+Cohort engine counts vs a brute-force count over the same retention rows.
+"""
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from models_ml import cohorts
+from models_ml.cohorts import build, load_engine
+
+PRODUCTS = ['bnpl', 'food_delivery', 'ride_hailing']
+
+
+@pytest.fixture(scope='module')
+def retention():
+    """Random users (some with NULL attributes) and their distinct active months per product"""
+    rng = np.random.default_rng(7)
+    n_users = 300
+    users = pd.DataFrame({
+        'user_id': [f"U{i:05d}" for i in rng.permutation(n_users)],
+        'country': rng.choice(['UAE', 'KSA', 'Egypt', None], n_users),
+        'user_segment': rng.choice(['vip', 'regular', 'new'], n_users)
+    })
+
+    rows = []
+    for user_id in users['user_id']:
+        for product in rng.choice(PRODUCTS, rng.integers(1, 3), replace=False):
+            cohort = pd.Timestamp('2023-01-01') + pd.DateOffset(months=int(rng.integers(0, 12)))
+            # Offset 0 (activation) plus a random subset of later months
+            offsets = np.r_[0, np.flatnonzero(rng.random(14) < 0.3) + 1]
+            rows += [(user_id, product, cohort, int(k)) for k in offsets]
+    facts = pd.DataFrame(rows, columns=['user_id', 'product', 'cohort_month', 'months_since_activation'])
+    return users, facts
+
+
+@pytest.fixture(scope='module')
+def db_path(retention, tmp_path_factory):
+    users, facts = retention
+    path = tmp_path_factory.mktemp('cohorts') / 'dev.duckdb'
+    with duckdb.connect(str(path)) as conn:
+        conn.execute("CREATE SCHEMA main_marts")
+        conn.execute("CREATE TABLE main_marts.dim_users AS SELECT * FROM users")
+        conn.execute("""
+            CREATE TABLE main_marts.fct_retention AS
+            SELECT user_id, product, cohort_month::DATE AS cohort_month, months_since_activation FROM facts
+        """)
+    return str(path)
+
+
+def brute_force(users, facts, product, **filters):
+    """count(distinct user_id) per cohort_month x months_since_activation"""
+    users = users.fillna({'country': 'Unknown'})
+    for name, values in filters.items():
+        users = users[users[name].isin(np.atleast_1d(values))]
+    rows = facts[(facts['product'] == product) & facts['user_id'].isin(users['user_id'])]
+    return rows.pivot_table(
+        index='cohort_month', columns='months_since_activation',
+        values='user_id', aggfunc='nunique', fill_value=0
+    )
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'country': 'UAE'},
+    {'country': 'Unknown'},
+    {'country': ['KSA', 'Egypt'], 'user_segment': 'vip'}
+])
+@pytest.mark.parametrize('product', PRODUCTS)
+def test_matrix_matches_brute_force_count(retention, db_path, product, filters):
+    engine = build(db_path)
+    expected = brute_force(*retention, product, **filters)
+
+    got = engine.matrix(product, **filters)
+    # The engine keeps cohorts and offsets that are empty under a filter; the brute force drops them
+    got = got.loc[:, (got != 0).any()]
+    got = got[(got != 0).any(axis=1)]
+    np.testing.assert_array_equal(got.index.values, expected.index.values)
+    np.testing.assert_array_equal(got.columns.values, expected.columns.values)
+    np.testing.assert_array_equal(got.values, expected.values)
+
+
+def test_cell_returns_the_users_of_one_cell(retention, db_path):
+    users, facts = retention
+    engine = build(db_path)
+    cohort_month, offset = facts.loc[facts['product'] == 'bnpl', ['cohort_month', 'months_since_activation']].iloc[0]
+
+    in_cell = facts[(facts['product'] == 'bnpl') & (facts['cohort_month'] == cohort_month)
+                    & (facts['months_since_activation'] == offset)]
+    vip = users.loc[users['user_segment'] == 'vip', 'user_id']
+    codes = engine.cell('bnpl', cohort_month, offset, user_segment='vip')
+
+    assert np.all(np.diff(codes) > 0)
+    assert sorted(engine.user_ids[codes]) == sorted(set(in_cell['user_id']) & set(vip))
+    assert len(engine.cell('bnpl', '1999-01', 0)) == 0
+
+
+def test_retention_is_nan_for_months_not_reached(db_path):
+    engine = build(db_path)
+    rates = engine.retention('bnpl')
+    ages = engine.last_month - cohorts.to_months(rates.index)
+    for age, row in zip(ages, rates.values):
+        assert row[0] == 1.0
+        assert np.isnan(row[age + 1:]).all()
+
+
+def test_unknown_product_and_attribute_raise(db_path):
+    engine = build(db_path)
+    with pytest.raises(ValueError, match='Unknown product'):
+        engine.matrix('crypto')
+    with pytest.raises(ValueError, match='Unknown attribute'):
+        engine.matrix('bnpl', city='Dubai')
+
+
+def test_disk_cache_round_trips_the_engine(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(cohorts, '_ENGINES', {})
+    built = load_engine(db_path, tmp_path)
+    assert built.source == 'duckdb'
+    assert len(list(tmp_path.glob('cohorts-*.npz'))) == 1
+
+    monkeypatch.setattr(cohorts, '_ENGINES', {})
+    cached = load_engine(db_path, tmp_path)
+    assert cached.source == 'cache'
+    for product in PRODUCTS:
+        pd.testing.assert_frame_equal(cached.matrix(product, country='UAE'), built.matrix(product, country='UAE'))
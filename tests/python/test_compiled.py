@@ -0,0 +1,125 @@
+"""
+Folded vs unfolded compiled models.
+A folded artifact must score every row exactly like the compiled
+scaler + model it was derived from, including rows sitting on (and one
+float next to) each split threshold in raw and scaled space.
+"""
+
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from models_ml.compiled import (
+    export_kmeans,
+    export_random_forest,
+    fold_scaler,
+    from_ordered,
+    load_compiled,
+    to_ordered
+)
+
+
+def training_data(seed=0, n_rows=400, n_features=4):
+    """Features on very different scales, so folded thresholds are far from the scaled ones"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features)) * np.array([1e-3, 1.0, 250.0, 1e6])[:n_features] + 7.0
+    y = X[:, 0] * 1e3 - X[:, 1] + (X[:, 2] > 7.0) + rng.normal(scale=0.1, size=n_rows)
+    return X, y
+
+
+def edge_rows(X, model):
+    """Rows with one feature set to each split threshold and its float neighbours.
+
+    Thresholds come from the unfolded model mapped back to raw space and from
+    the folded model itself, so both sides of every rounding boundary are hit.
+    """
+    internal = model['unfolded'].left >= 0
+    features = model['unfolded'].feature[internal]
+    scaled = model['unfolded'].threshold[internal].astype(np.float64)
+    candidates = [
+        model['unfolded'].mean[features] + scaled * model['unfolded'].scale[features],
+        model['folded'].threshold[internal]
+    ]
+
+    rows = []
+    for values in candidates:
+        for i, (feature, value) in enumerate(zip(features, values)):
+            for edge in (np.nextafter(value, -np.inf), value, np.nextafter(value, np.inf)):
+                row = X[i % len(X)].copy()
+                row[feature] = edge
+                rows.append(row)
+    return np.array(rows)
+
+
+def compile_pair(tmp_path, export, fitted, scaler, X):
+    """Export, fold and load both the compiled and the folded artifact"""
+    compiled_path = tmp_path / 'model_compiled.npz'
+    folded_path = tmp_path / 'model_folded.npz'
+    export(fitted, scaler, compiled_path)
+    unfolded = load_compiled(compiled_path)
+    fold_scaler(compiled_path, folded_path, X, unfolded.reference_output(X))
+    return {'unfolded': unfolded, 'folded': load_compiled(folded_path)}
+
+
+def test_ordered_keys_round_trip_and_sort():
+    values = np.array([-np.finfo(np.float64).max, -1.5, -5e-324, -0.0, 0.0, 5e-324, 1.0, 1e300])
+    keys = to_ordered(values)
+    assert np.all(np.diff(keys) >= 0)
+    np.testing.assert_array_equal(from_ordered(keys), values)
+    # Adjacent floats get adjacent keys
+    assert to_ordered(np.nextafter(1.0, 2.0)) - to_ordered(1.0) == 1
+
+
+def test_random_forest_fold_matches_scaler_and_model(tmp_path):
+    X, y = training_data()
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestRegressor(n_estimators=8, max_depth=6, random_state=0)
+    forest.fit(scaler.transform(X), y)
+    model = compile_pair(tmp_path, export_random_forest, forest, scaler, X)
+
+    rows = np.vstack([X, edge_rows(X, model)])
+    expected = forest.predict(scaler.transform(rows))
+    np.testing.assert_allclose(model['unfolded'].predict(rows), expected, rtol=1e-12)
+    # Folding changes only where thresholds live, never which leaf a row reaches
+    np.testing.assert_array_equal(model['folded'].leaf_values(rows), model['unfolded'].leaf_values(rows))
+
+
+def test_xgboost_fold_matches_scaler_and_model(tmp_path):
+    xgb = pytest.importorskip('xgboost')
+    from models_ml.compiled import export_xgboost_classifier
+
+    X, y = training_data(seed=1)
+    labels = (y > np.median(y)).astype(int)
+    scaler = StandardScaler().fit(X)
+    classifier = xgb.XGBClassifier(n_estimators=10, max_depth=4, tree_method='hist', random_state=0)
+    classifier.fit(scaler.transform(X), labels)
+    model = compile_pair(tmp_path, export_xgboost_classifier, classifier, scaler, X)
+
+    rows = np.vstack([X, edge_rows(X, model)])
+    expected = classifier.predict_proba(scaler.transform(rows))[:, 1]
+    np.testing.assert_allclose(model['unfolded'].predict_proba(rows)[:, 1], expected, rtol=1e-6)
+    np.testing.assert_array_equal(model['folded'].leaf_values(rows), model['unfolded'].leaf_values(rows))
+
+
+def test_kmeans_fold_matches_scaler_and_model(tmp_path):
+    X, _ = training_data(seed=2)
+    scaler = StandardScaler().fit(X)
+    kmeans = KMeans(n_clusters=4, n_init=3, random_state=0).fit(scaler.transform(X))
+    model = compile_pair(tmp_path, export_kmeans, kmeans, scaler, X)
+
+    np.testing.assert_array_equal(model['folded'].predict(X), kmeans.predict(scaler.transform(X)))
+
+
+def test_folded_artifact_rejects_a_different_source(tmp_path):
+    X, y = training_data()
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestRegressor(n_estimators=2, max_depth=3, random_state=0).fit(scaler.transform(X), y)
+    compile_pair(tmp_path, export_random_forest, forest, scaler, X)
+
+    # Re-export a different model over the compiled artifact the folded one came from
+    other = RandomForestRegressor(n_estimators=2, max_depth=3, random_state=1).fit(scaler.transform(X), y)
+    export_random_forest(other, scaler, tmp_path / 'model_compiled.npz')
+    with pytest.raises(ValueError, match='not folded from'):
+        load_compiled(tmp_path / 'model_folded.npz').verify(source=tmp_path / 'model_compiled.npz')
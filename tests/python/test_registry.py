@@ -0,0 +1,87 @@
+"""
+Model registry lazy loading and the two-check hot reload.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from api import registry as registry_module
+from api.registry import ModelRegistry, ModelSpec, fingerprint
+from models_ml.compiled import CompiledKMeans
+
+COMPILED = 'kmeans_compiled.npz'
+
+
+def write_artifact(directory, centroids, mtime):
+    """A compiled K-Means artifact with a distinct mtime (the fingerprint is mtime + size)"""
+    path = directory / COMPILED
+    np.savez(path, kind=np.array('kmeans'), mean=np.zeros(2), scale=np.ones(2), centroids=np.asarray(centroids, float))
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the registry module"""
+    now = [1000.0]
+    monkeypatch.setattr(registry_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def spec(tmp_path):
+    (tmp_path / 'feature_names.txt').write_text('x\ny\n')
+    write_artifact(tmp_path, [[0, 0], [10, 10]], mtime=1_000_000_000)
+    return ModelSpec('segment', tmp_path, 'kmeans.pkl', COMPILED, 'kmeans_folded.npz')
+
+
+def test_version_without_loading_is_the_file_fingerprint(spec, clock):
+    registry = ModelRegistry([spec], model_format='compiled', mmap=False, check_interval=5)
+    assert registry.version('segment') == fingerprint(spec)
+    assert registry.loaded() == {}
+
+    loaded = registry.get('segment')
+    assert isinstance(loaded.model, CompiledKMeans)
+    assert loaded.feature_columns == ('x', 'y')
+    assert registry.version('segment') == loaded.version
+
+
+def test_changed_files_reload_only_after_two_checks(spec, clock):
+    registry = ModelRegistry([spec], model_format='compiled', mmap=False, check_interval=5)
+    first = registry.get('segment')
+    write_artifact(spec.directory, [[0, 0], [1, 1], [20, 20]], mtime=2_000_000_000)
+
+    # Within the interval the files are not even looked at
+    clock[0] += 4
+    assert registry.get('segment') is first
+    # First sighting of the new fingerprint: keep serving while writes settle
+    clock[0] += 1
+    assert registry.get('segment') is first
+    clock[0] += 5
+    second = registry.get('segment')
+
+    assert second is not first
+    assert second.version == fingerprint(spec)
+    assert len(second.model.centroids) == 3
+    assert registry.reloads == 1
+
+
+def test_failed_reload_keeps_previous_version_until_files_change_again(spec, clock):
+    registry = ModelRegistry([spec], model_format='compiled', mmap=False, check_interval=5)
+    first = registry.get('segment')
+    (spec.directory / COMPILED).write_bytes(b'half-written')
+
+    for _ in range(3):
+        clock[0] += 5
+        assert registry.get('segment') is first
+    # Tried once, not on every later check
+    assert registry.reload_errors == 1
+    assert registry.reloads == 0
+
+    write_artifact(spec.directory, [[5, 5], [6, 6]], mtime=3_000_000_000)
+    for _ in range(2):
+        clock[0] += 5
+        loaded = registry.get('segment')
+    assert loaded is not first
+    assert registry.reloads == 1